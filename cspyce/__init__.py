@@ -137,7 +137,9 @@ except ImportError as err:
         print("Set environment variable 'CSPICE_DEVELOPMENT' to '1' to ignore this error")
         raise err
 
+from cspyce.cspyce1 import pool_generation
 from cspyce.spice_cell import SpiceCell, SPICE_CELL_INT, SPICE_CELL_DOUBLE
+from cspyce.gf_batch import gftfov_batch, gfoclt_batch, gfsep_batch
 
 
 # A set of keywords listing options set globally across the cspyce functions
@@ -0,0 +1,251 @@
+################################################################################
+# cspyce/aio.py
+#
+# An asyncio front end for cspyce.
+#
+# CSPICE calls block, and calling them on the event loop thread stalls every
+# other coroutine. AsyncSpice runs them on a dedicated worker instead: by
+# default a single thread, or any executor with a submit() method, such as a
+# cspyce.parallel.Executor, to run SPICE in a separate process.
+#
+# Many concurrent requests for the same function usually differ only in their
+# floating-point arguments, e.g., spkezr calls for one target and observer at
+# many times. AsyncSpice collects such requests for a short batching window and
+# makes a single call to the "_vector" version of the function, with the
+# floating-point arguments stacked. Each caller receives its own slice of the
+# result. If the vector call raises an exception, the requests of the batch are
+# repeated one at a time, so that each caller receives its own result or
+# exception.
+#
+# Usage:
+#   aspice = AsyncSpice(window=0.002)
+#   (state, lt) = await aspice.spkezr('MARS', et, 'J2000', 'LT+S', 'EARTH')
+#   rotmat = await aspice.call(cspyce.pxform, 'J2000', 'IAU_MARS', et)
+################################################################################
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import cspyce
+from cspyce.parallel import _call_by_name
+
+class AsyncSpice:
+    """A coroutine interface to cspyce that runs calls on a worker and
+    coalesces concurrent scalar requests into vector calls.
+    """
+
+    def __init__(self, executor=None, window=0.002, max_batch=4096):
+        """Constructor.
+
+        Inputs:
+            executor    the executor that runs the calls. It must have a
+                        submit() method returning a concurrent.futures.Future
+                        and must run one call at a time, e.g., a
+                        cspyce.parallel.Executor with processes=1. Default is a
+                        dedicated thread.
+            window      time in seconds to wait for more requests to join a
+                        batch.
+            max_batch   maximum number of requests in a batch; a full batch is
+                        submitted immediately.
+        """
+
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+                                        max_workers=1,
+                                        thread_name_prefix='cspyce-aio')
+        self.window = window
+        self.max_batch = max_batch
+
+        # Pending requests, keyed by (vector function name, fixed arguments).
+        # Each value is a list of (args, asyncio.Future) tuples.
+        self._pending = {}
+
+        # Statistics
+        self.requests = 0
+        self.batches = 0
+
+    def __getattr__(self, name):
+        """A coroutine version of the cspyce function of the given name."""
+
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        func = getattr(cspyce, name)
+        if not callable(func):
+            raise AttributeError(name)
+
+        async def coroutine(*args, **keywords):
+            return await self.call(func, *args, **keywords)
+
+        coroutine.__name__ = name
+        return coroutine
+
+    async def call(self, func, *args, **keywords):
+        """Call a cspyce function on the worker and return its result.
+
+        Requests that can be coalesced are those with positional arguments
+        only, for functions with a "_vector" version, in which every
+        floating-point argument has the shape of a single item and every other
+        argument is hashable. Other requests are submitted on their own.
+
+        Inputs:
+            func        a cspyce function or its name.
+            args, keywords
+                        the arguments to the function.
+
+        Returns:        the value returned by the function. The values from a
+                        coalesced request are NumPy scalars or arrays.
+        """
+
+        if isinstance(func, str):
+            func = getattr(cspyce, func)
+
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+
+        key = None if keywords else _batch_key(func, args)
+        if key is None:
+            future = self.executor.submit(_call_by_name, func.__name__,
+                                          args, keywords)
+            return await asyncio.wrap_future(future)
+
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((args, future))
+
+        if len(batch) >= self.max_batch:
+            self._flush(key)
+        elif len(batch) == 1:
+            loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    async def aclose(self):
+        """Submit all pending requests and shut down the default worker."""
+
+        for key in list(self._pending):
+            self._flush(key)
+
+        if self._own_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    ############################################################################
+    # Support methods
+    ############################################################################
+
+    def _flush(self, key):
+        """Submit the pending batch for a key, if any."""
+
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+
+        self.batches += 1
+        (vname, scalar_name, float_indices) = key[:3]
+        requests = [args for (args, _) in batch]
+        future = self.executor.submit(_run_batch, vname, scalar_name,
+                                      float_indices, requests)
+        future = asyncio.wrap_future(future)
+        future.add_done_callback(lambda f: _resolve(batch, f))
+
+################################################################################
+# Support functions
+################################################################################
+
+def _batch_key(func, args):
+    """The key under which a request is coalesced, or None if it cannot be."""
+
+    vfunc = func.vector
+    if '_vector' not in vfunc.__name__:
+        return None
+
+    from cspyce.array_support import array_version
+    array_version(vfunc)                    # defines INPUT_ITEMS
+
+    if len(args) != len(vfunc.ARGNAMES):
+        return None
+
+    float_indices = []
+    fixed = []
+    for (k, arg) in enumerate(args):
+        item = vfunc.INPUT_ITEMS.get(k)
+        if item is None:
+            try:
+                hash(arg)
+            except TypeError:
+                return None
+            fixed.append(arg)
+            continue
+
+        if 0 in item or np.shape(arg) != item:
+            return None
+        float_indices.append(k)
+
+    if not float_indices:
+        return None
+
+    return (vfunc.__name__, func.__name__, tuple(float_indices), tuple(fixed))
+
+def _run_batch(vname, scalar_name, float_indices, requests):
+    """Run a batch of requests as one vector call.
+
+    Returns:        a list containing a tuple (True, value) or (False,
+                    exception) for each request.
+    """
+
+    args = list(requests[0])
+    for k in float_indices:
+        args[k] = np.array([request[k] for request in requests],
+                           dtype=np.float64)
+
+    try:
+        results = _call_by_name(vname, args, {})
+    except Exception:
+        # Repeat the requests one at a time, so that each one gets its own
+        # result or exception
+        outcomes = []
+        for request in requests:
+            try:
+                outcomes.append((True, _call_by_name(scalar_name, request, {})))
+            except Exception as error:
+                outcomes.append((False, error))
+        return outcomes
+
+    if isinstance(results, (list, tuple)):
+        return [(True, [result[i] for result in results])
+                for i in range(len(requests))]
+
+    return [(True, results[i]) for i in range(len(requests))]
+
+def _resolve(batch, future):
+    """Deliver the outcomes of a batch to the waiting callers."""
+
+    if future.cancelled():
+        for (_, waiter) in batch:
+            waiter.cancel()
+        return
+
+    error = future.exception()
+    for (k, (_, waiter)) in enumerate(batch):
+        if waiter.done():
+            continue
+        if error is not None:
+            waiter.set_exception(error)
+            continue
+
+        (ok, value) = future.result()[k]
+        if ok:
+            waiter.set_result(value)
+        else:
+            waiter.set_exception(value)
+
+################################################################################
@@ -165,6 +165,10 @@ def define_body_aliases(*items):
     else:
         cspyce1.boddef(name, code)
 
+    # The aliases change the results of the alias versions of bodn2c, bodc2n,
+    # and bods2c, even when boddef is not called
+    cspyce1._pool_changed()
+
 def define_frame_aliases(*items):
     """Define a list of items (integer codes or strings) as aliases of the same
     coordinate frame.
@@ -227,6 +231,9 @@ def define_frame_aliases(*items):
             cspyce1.FRAME_CODE_OVERRIDES[name] = code
             cspyce1.FRAME_CODE_OVERRIDES[key ] = code
 
+        # The overrides change the results of frmnam and namfrm
+        cspyce1._pool_changed()
+
 def _as_key(name):
     """Convert names to upper case and replace duplicated spaces with one;
     return ints unchanged.
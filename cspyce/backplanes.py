@@ -0,0 +1,189 @@
+################################################################################
+# cspyce/backplanes.py
+#
+# Image backplanes: the surface geometry seen by every pixel of an instrument.
+#
+# For each pixel direction, the intercept point on the target is found with
+# sincpt_vector, which supports both ellipsoid and DSK shape models. Then
+# illumf_vector gives the illumination angles at each intercept point, and
+# reclat_vector its planetocentric longitude and latitude. The pixels are
+# processed in chunks of fixed size, so memory use stays bounded for frames of
+# any size, and the chunks can optionally be distributed across worker
+# processes that have the same kernels loaded.
+#
+# The flag and error versions of the cspyce functions are called explicitly,
+# so that a pixel that misses the target is flagged rather than raising an
+# exception, regardless of use_errors() or use_flags().
+#
+# Usage:
+#   planes = backplanes('CASSINI_ISS_NAC', et, 'ENCELADUS', 'IAU_ENCELADUS',
+#                       'CASSINI', shape=(1024,1024), processes=None)
+#   planes['incidence']     # (1024,1024) array of incidence angles in radians
+################################################################################
+
+import numpy as np
+
+import cspyce
+from cspyce import parallel
+
+# Names of the backplanes returned, and the shape of each pixel's value
+PLANES = (('found', ()),
+          ('intercept', (3,)),
+          ('range', ()),
+          ('longitude', ()),
+          ('latitude', ()),
+          ('radius', ()),
+          ('incidence', ()),
+          ('emission', ()),
+          ('phase', ()),
+          ('visible', ()),
+          ('lit', ()))
+
+def backplanes(inst, et, target, fixref, obsrvr, shape=None, dvecs=None,
+               method='DSK/UNPRIORITIZED', abcorr='CN+S', ilusrc='SUN',
+               chunk=65536, processes=0):
+    """Compute the backplanes of an image.
+
+    Inputs:
+        inst        name or ID code of the instrument.
+        et          epoch of the observation, in TDB seconds.
+        target      name of the target body.
+        fixref      body-fixed frame of the target.
+        obsrvr      name of the observing body.
+        shape       (lines, samples) of a pixel grid spanning the instrument's
+                    rectangular field of view, as returned by fov_directions().
+                    Ignored if dvecs is given.
+        dvecs       optional array of pixel directions in the instrument frame,
+                    of shape (..., 3). Use this for any other pixel geometry.
+        method      computation method for sincpt and illumf, e.g.,
+                    "ELLIPSOID" or "DSK/UNPRIORITIZED".
+        abcorr      aberration correction flag.
+        ilusrc      name of the illumination source.
+        chunk       maximum number of pixels processed per call.
+        processes   number of worker processes to use; 0 to compute every chunk
+                    in this process; None to use one per CPU.
+
+    Returns:        a dictionary of arrays, each with the shape of the pixel
+                    grid, or of the grid plus an axis of 3 for "intercept":
+                        found       True where the pixel intercepts the target.
+                        intercept   intercept point in the body-fixed frame.
+                        range       distance from the observer to the intercept.
+                        longitude   planetocentric longitude, radians.
+                        latitude    planetocentric latitude, radians.
+                        radius      distance of the intercept from the center.
+                        incidence   incidence angle, radians.
+                        emission    emission angle, radians.
+                        phase       phase angle, radians.
+                        visible     True where the intercept is visible.
+                        lit         True where the intercept is illuminated.
+                    Floating-point values are NaN and booleans are False where
+                    the pixel misses the target.
+    """
+
+    (_, dref, _, _) = cspyce.getfov.error(_instid(inst))
+    if dvecs is None:
+        if shape is None:
+            raise ValueError('either shape or dvecs must be given')
+        dvecs = fov_directions(inst, shape)
+
+    dvecs = np.asarray(dvecs, dtype=np.float64)
+    grid_shape = dvecs.shape[:-1]
+    dvecs = dvecs.reshape(-1, 3)
+
+    arglist = [(method, target, ilusrc, et, fixref, abcorr, obsrvr, dref,
+                dvecs[start:start + chunk])
+               for start in range(0, len(dvecs), chunk)]
+    if processes == 0:
+        results = [_backplane_chunk(*args) for args in arglist]
+    else:
+        results = parallel.run_in_processes(_backplane_chunk, arglist,
+                                            processes)
+
+    planes = {}
+    for (k, (name, item_shape)) in enumerate(PLANES):
+        if results:
+            values = np.concatenate([result[k] for result in results])
+        else:
+            values = np.empty((0,) + item_shape)
+        planes[name] = values.reshape(grid_shape + item_shape)
+
+    return planes
+
+def fov_directions(inst, shape):
+    """The direction of the center of every pixel in a grid spanning the
+    rectangular field of view of an instrument, in the instrument frame.
+
+    The grid is that of a pinhole camera whose image plane is perpendicular to
+    the boresight. Lines run from the first FOV boundary vector toward the
+    fourth, and samples from the first toward the second, as the boundary
+    vectors are listed by getfov.
+
+    Inputs:
+        inst        name or ID code of the instrument.
+        shape       (lines, samples) of the pixel grid.
+
+    Returns:        an array of shape (lines, samples, 3).
+    """
+
+    (fovshape, _, bsight, bounds) = cspyce.getfov.error(_instid(inst))
+    bounds = np.asarray(bounds, dtype=np.float64)
+    if len(bounds) != 4:
+        raise ValueError('instrument %s has a %s field of view; pixel '
+                         'directions must be given explicitly'
+                         % (inst, fovshape))
+
+    # Project the corners onto the image plane at unit distance
+    bsight = np.asarray(bsight, dtype=np.float64)
+    bsight = bsight / np.linalg.norm(bsight)
+    corners = bounds / (bounds @ bsight)[:, np.newaxis]
+
+    (lines, samples) = shape
+    v = (np.arange(lines) + 0.5) / lines
+    u = (np.arange(samples) + 0.5) / samples
+    return (corners[0]
+            + v[:, np.newaxis, np.newaxis] * (corners[3] - corners[0])
+            + u[np.newaxis, :, np.newaxis] * (corners[1] - corners[0]))
+
+################################################################################
+# Support functions
+################################################################################
+
+def _instid(inst):
+    if isinstance(inst, str):
+        return cspyce.bods2c.error(inst)
+
+    return int(inst)
+
+def _backplane_chunk(method, target, ilusrc, et, fixref, abcorr, obsrvr, dref,
+                     dvecs):
+    """The backplane values for one chunk of pixel directions, as a list of
+    arrays in the order of PLANES.
+    """
+
+    count = len(dvecs)
+    intercept = np.full((count, 3), np.nan)
+    (range_, radius, longitude, latitude, incidence, emission,
+     phase) = (np.full(count, np.nan) for _ in range(7))
+    visible = np.zeros(count, dtype=bool)
+    lit = np.zeros(count, dtype=bool)
+
+    (spoint, _, srfvec, found) = cspyce.sincpt_vector.flag(method, target, et,
+                                                           fixref, abcorr,
+                                                           obsrvr, dref, dvecs)
+    found = np.asarray(found, dtype=bool).reshape(count)
+    hits = np.flatnonzero(found)
+    if len(hits):
+        spoint = np.asarray(spoint).reshape(count, 3)[hits]
+        srfvec = np.asarray(srfvec).reshape(count, 3)[hits]
+        intercept[hits] = spoint
+        range_[hits] = np.linalg.norm(srfvec, axis=-1)
+        (radius[hits], longitude[hits],
+         latitude[hits]) = cspyce.reclat_vector.error(spoint)
+        (_, _, phase[hits], incidence[hits], emission[hits], visible[hits],
+         lit[hits]) = cspyce.illumf_vector.flag(method, target, ilusrc, et,
+                                                fixref, abcorr, obsrvr, spoint)
+
+    return [found, intercept, range_, longitude, latitude, radius, incidence,
+            emission, phase, visible, lit]
+
+################################################################################
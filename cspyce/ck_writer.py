@@ -0,0 +1,216 @@
+################################################################################
+# cspyce/ck_writer.py
+#
+# A streaming writer for type 3 CK files.
+#
+# ckw03 writes one segment from arrays of quaternions, angular velocities, and
+# interpolation interval starts held in memory. CkWriter accepts an attitude
+# history in chunks of any size, as rotation matrices or quaternions, and
+# writes it as a series of type 3 segments, each cut at a configurable number
+# of records. Only the records of the current segment are held in memory.
+#
+# Rotation matrices are converted to quaternions with m2q_vector. A new
+# interpolation interval is started wherever the spacing between records
+# exceeds a gap threshold, so that SPICE never interpolates across a data gap.
+# Adjacent segments share the record at which they are cut, unless the cut
+# falls at a gap, so the coverage of the file has no holes other than the gaps
+# in the data.
+#
+# Usage:
+#   with CkWriter('attitude.bc', -82000, 'J2000', max_gap=1000.) as writer:
+#       for (sclkdp, cmats, avvs) in telemetry_chunks():
+#           writer.write(sclkdp, cmats=cmats, avvs=avvs)
+################################################################################
+
+import os
+
+import numpy as np
+
+import cspyce
+
+# If no gap threshold is given, a gap is a spacing greater than this multiple of
+# the median spacing of the first records written
+GAP_FACTOR = 3.
+
+class CkWriter:
+    """A writer that streams an attitude history into the segments of a type 3
+    CK file.
+    """
+
+    def __init__(self, path, inst, ref='J2000', avflag=True, max_records=100000,
+                 max_gap=None, segid=None, append=False, ifname=None,
+                 ncomch=0):
+        """Constructor; open the CK file.
+
+        Inputs:
+            path        path to the CK file.
+            inst        NAIF ID code of the instrument or structure.
+            ref         name of the reference frame.
+            avflag      True if the records include angular velocity.
+            max_records maximum number of records per segment.
+            max_gap     spacing in SCLK ticks between records above which a new
+                        interpolation interval is started. If None, it is
+                        GAP_FACTOR times the median spacing of the first chunk
+                        of records written.
+            segid       segment identifier; default is "CK_WRITER_TYPE_3".
+            append      True to add segments to an existing CK file.
+            ifname      internal file name of a new file; default is the file
+                        name.
+            ncomch      number of characters to reserve for comments in a new
+                        file.
+        """
+
+        if max_records < 2:
+            raise ValueError('max_records must be at least 2')
+
+        self.path = str(path)
+        self.inst = inst
+        self.ref = ref
+        self.avflag = bool(avflag)
+        self.max_records = max_records
+        self.max_gap = max_gap
+        self.segid = segid or 'CK_WRITER_TYPE_3'
+        self.segments = 0
+
+        # Buffered records of the current segment; _new_interval is True where
+        # a record starts an interpolation interval
+        self._sclkdp = np.empty(0)
+        self._quats = np.empty((0, 4))
+        self._avvs = np.empty((0, 3))
+        self._new_interval = np.empty(0, dtype=bool)
+        self._last_sclkdp = -np.inf
+
+        # True if the first buffered record was already written as the last
+        # record of the previous segment
+        self._shared = False
+
+        if append:
+            self.handle = cspyce.dafopw(self.path)
+        else:
+            ifname = ifname or os.path.basename(self.path)
+            self.handle = cspyce.ckopn(self.path, ifname[:60], ncomch)
+
+    def write(self, sclkdp, cmats=None, avvs=None, quats=None):
+        """Add a chunk of the attitude history.
+
+        Inputs:
+            sclkdp      array of encoded SCLK times, strictly increasing and
+                        later than all the times written previously.
+            cmats       array of shape (n,3,3) of the C-matrices, which rotate
+                        vectors from the reference frame to the instrument
+                        frame. Either cmats or quats must be given.
+            avvs        array of shape (n,3) of angular velocities, in the
+                        reference frame, in radians per second. Required if
+                        avflag is True.
+            quats       array of shape (n,4) of SPICE quaternions, as an
+                        alternative to cmats.
+        """
+
+        sclkdp = np.asarray(sclkdp, dtype=np.float64).ravel()
+        count = len(sclkdp)
+        if count == 0:
+            return
+
+        if quats is None:
+            if cmats is None:
+                raise ValueError('either cmats or quats must be given')
+            cmats = np.asarray(cmats, dtype=np.float64).reshape(-1, 3, 3)
+            quats = cspyce.m2q_vector(cmats)
+
+        quats = np.asarray(quats, dtype=np.float64).reshape(-1, 4)
+        if self.avflag:
+            if avvs is None:
+                raise ValueError('avvs are required when avflag is True')
+            avvs = np.asarray(avvs, dtype=np.float64).reshape(-1, 3)
+        else:
+            avvs = np.zeros((count, 3))
+
+        if len(quats) != count or len(avvs) != count:
+            raise ValueError('numbers of times, rotations, and angular '
+                             'velocities differ')
+        if sclkdp[0] <= self._last_sclkdp or np.any(np.diff(sclkdp) <= 0.):
+            raise ValueError('times must be strictly increasing')
+
+        # Mark the records that follow a gap, including the first record of
+        # this chunk if it follows a gap after the previous chunk
+        previous = np.concatenate([[self._last_sclkdp], sclkdp[:-1]])
+        spacing = sclkdp - previous
+        if self.max_gap is None and count > 1:
+            self.max_gap = GAP_FACTOR * np.median(spacing[1:])
+
+        new_interval = (spacing > self.max_gap) if self.max_gap else \
+                       np.zeros(count, dtype=bool)
+        if len(self._sclkdp) == 0 and self.segments == 0:
+            new_interval[0] = True
+
+        self._last_sclkdp = sclkdp[-1]
+        self._sclkdp = np.concatenate([self._sclkdp, sclkdp])
+        self._quats = np.concatenate([self._quats, quats])
+        self._avvs = np.concatenate([self._avvs, avvs])
+        self._new_interval = np.concatenate([self._new_interval, new_interval])
+
+        # Write full segments, keeping at least one record for the next one
+        while len(self._sclkdp) > self.max_records:
+            self._write_segment(self.max_records)
+
+    def write_from(self, chunks):
+        """Add every chunk from an iterable. Each chunk is a tuple
+        (sclkdp, cmats) or (sclkdp, cmats, avvs) of arguments to write().
+        """
+
+        for chunk in chunks:
+            self.write(*chunk)
+
+    def close(self):
+        """Write the final segment and close the file."""
+
+        if self.handle is None:
+            return
+
+        try:
+            if len(self._sclkdp) > 1 or (len(self._sclkdp) == 1
+                                         and not self._shared):
+                self._write_segment(len(self._sclkdp))
+        finally:
+            cspyce.ckcls(self.handle)
+            self.handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    ############################################################################
+    # Support methods
+    ############################################################################
+
+    def _write_segment(self, count):
+        """Write the first count buffered records as a segment."""
+
+        sclkdp = self._sclkdp[:count]
+        starts = sclkdp[self._new_interval[:count]]
+        if len(starts) == 0 or starts[0] != sclkdp[0]:
+            starts = np.concatenate([[sclkdp[0]], starts])
+
+        cspyce.ckw03(self.handle, sclkdp[0], sclkdp[-1], self.inst, self.ref,
+                     self.avflag, self.segid, sclkdp, self._quats[:count],
+                     self._avvs[:count], len(starts), starts)
+        self.segments += 1
+
+        # The next segment begins with the last record written, unless the
+        # record that follows it starts a new interval anyway
+        keep = count - 1
+        if count < len(self._sclkdp) and self._new_interval[count]:
+            keep = count
+
+        self._shared = (keep == count - 1)
+
+        self._sclkdp = self._sclkdp[keep:]
+        self._quats = self._quats[keep:]
+        self._avvs = self._avvs[keep:]
+        self._new_interval = self._new_interval[keep:].copy()
+        if len(self._new_interval):
+            self._new_interval[0] = True
+
+################################################################################
@@ -0,0 +1,143 @@
+################################################################################
+# cspyce/comments.py
+#
+# Streaming access to the comment areas of DAF and DAS files.
+#
+# The functions dafec and dasec read the entire comment area of a file into one
+# list, and dafac and dasac require the caller to build one list of every line
+# to be added. Comment areas can run to megabytes, so the functions here read
+# comments lazily, one buffer of lines at a time, and write comments from any
+# iterable of lines, sending them to SPICE in buffers of fixed size.
+#
+# Usage:
+#   for line in file_comments('kernel.bsp'):    # no need to open the file
+#       ...
+#   handle = cspyce.dafopw('kernel.bsp')
+#   with open('comments.txt') as f:
+#       dafac_lines(handle, f)                  # lines are read as needed
+#   cspyce.dafcls(handle)
+################################################################################
+
+import os
+
+import cspyce
+import cspyce.cspyce0 as cspyce0
+
+# Number of lines passed to dafac or dasac per call
+BUFSIZE = 1000
+
+def dafec_lines(handle):
+    """Generator that yields the comment lines of a DAF, one at a time.
+
+    SPICE keeps track of the position of the read internally. If dafec is
+    called for a different handle before the generator is exhausted, the next
+    read starts over at the beginning of the comment area, so the generator
+    should be consumed before comments are read from another file.
+
+    Inputs:
+        handle      handle of a DAF opened for read access.
+    """
+
+    return _comment_lines(cspyce0.dafec, handle)
+
+def dasec_lines(handle):
+    """Generator that yields the comment lines of a DAS file, one at a time.
+
+    As with dafec_lines, the generator should be consumed before comments are
+    read from another file.
+
+    Inputs:
+        handle      handle of a DAS file opened for read access.
+    """
+
+    return _comment_lines(cspyce0.dasec, handle)
+
+def dafac_lines(handle, lines, bufsize=BUFSIZE):
+    """Append comment lines to a DAF from any iterable.
+
+    Inputs:
+        handle      handle of a DAF opened for write access.
+        lines       an iterable of strings, such as a list or an open text file.
+                    Trailing newlines are removed; a single string is split
+                    into lines.
+        bufsize     maximum number of lines passed to SPICE per call.
+
+    Returns:        the number of lines added.
+    """
+
+    return _add_comments(cspyce0.dafac, handle, lines, bufsize)
+
+def dasac_lines(handle, lines, bufsize=BUFSIZE):
+    """Append comment lines to a DAS file from any iterable.
+
+    Inputs:
+        handle      handle of a DAS file opened for write access.
+        lines       an iterable of strings, such as a list or an open text file.
+                    Trailing newlines are removed; a single string is split
+                    into lines.
+        bufsize     maximum number of lines passed to SPICE per call.
+
+    Returns:        the number of lines added.
+    """
+
+    return _add_comments(cspyce0.dasac, handle, lines, bufsize)
+
+def file_comments(path):
+    """Generator that yields the comment lines of a binary kernel file, given
+    its path. The file is opened for read access and closed when the generator
+    is exhausted or discarded.
+
+    Inputs:
+        path        path to a DAF or DAS file.
+    """
+
+    path = os.fspath(path)
+    (arch, _) = cspyce.getfat(path)
+    if arch == 'DAF':
+        (opener, closer, reader) = (cspyce.dafopr, cspyce.dafcls, dafec_lines)
+    elif arch == 'DAS':
+        (opener, closer, reader) = (cspyce.dasopr, cspyce.dascls, dasec_lines)
+    else:
+        raise ValueError('not a DAF or DAS file: ' + path)
+
+    handle = opener(path)
+    try:
+        yield from reader(handle)
+    finally:
+        closer(handle)
+
+################################################################################
+# Support functions
+################################################################################
+
+def _comment_lines(extractor, handle):
+    """Yield the lines returned by repeated calls to dafec or dasec."""
+
+    while True:
+        (buffer, done) = extractor(handle)
+        yield from buffer
+        if done:
+            return
+
+def _add_comments(adder, handle, lines, bufsize):
+    """Pass lines to dafac or dasac in buffers of at most bufsize lines."""
+
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+
+    count = 0
+    buffer = []
+    for line in lines:
+        buffer.append(line.rstrip('\r\n'))
+        if len(buffer) >= bufsize:
+            adder(handle, buffer)
+            count += len(buffer)
+            buffer = []
+
+    if buffer:
+        adder(handle, buffer)
+        count += len(buffer)
+
+    return count
+
+################################################################################
@@ -0,0 +1,140 @@
+################################################################################
+# cspyce/conversions.py
+#
+# Tracing of the copies made when input arrays are converted.
+#
+# CSPICE needs its array inputs as C-contiguous arrays of the right type. An
+# input that is a list, has another dtype (e.g., float32), or is a
+# non-contiguous slice or Fortran-ordered array is silently copied before the
+# call. When tracing is enabled, each such copy is counted by function and
+# argument, with the number of bytes copied, and optionally reported as a
+# warning. Python and NumPy scalars are not counted.
+#
+# When tracing is disabled, the only cost is one test of a C pointer per array
+# argument.
+#
+# Usage:
+#   enable(warn=True, warn_bytes=1000000)  # warn about copies of 1 MB or more
+#   ...
+#   disable()
+#   report()
+#   stats()[('spkezr_vector', 'et')]       # ConversionStats(count, nbytes, ...)
+################################################################################
+
+import sys
+import threading
+import warnings
+from collections import namedtuple
+
+from cspyce import cspyce0
+
+ConversionStats = namedtuple('ConversionStats', ['count', 'nbytes',
+                                                 'reasons'])
+ConversionStats.__doc__ = """Conversion statistics of one function argument.
+
+    count       number of copies.
+    nbytes      total number of bytes copied.
+    reasons     dictionary of the number of copies by reason: "sequence" for a
+                non-array input, "dtype" for an array of another type, or
+                "contiguity" for an array that is not C-contiguous.
+    """
+
+class ConversionWarning(RuntimeWarning):
+    """Warning issued when an input array is copied."""
+    pass
+
+# Internal state
+_LOCK = threading.Lock()
+_STATS = {}                         # (function, argument) -> [count, nbytes,
+                                    #                          reasons]
+_ENABLED = False
+_WARN = False
+_WARN_BYTES = 0
+
+def enable(warn=False, warn_bytes=0):
+    """Start tracing the copies of input arrays.
+
+    Inputs:
+        warn        True to issue a ConversionWarning for each copy.
+        warn_bytes  minimum size of a copy in bytes for a warning.
+    """
+
+    global _ENABLED, _WARN, _WARN_BYTES
+
+    _WARN = warn
+    _WARN_BYTES = warn_bytes
+    cspyce0.set_conversion_tracer(_trace)
+    _ENABLED = True
+
+def disable():
+    """Stop tracing. The statistics collected so far are kept."""
+
+    global _ENABLED
+
+    cspyce0.set_conversion_tracer(None)
+    _ENABLED = False
+
+def is_enabled():
+    """True if tracing is enabled."""
+
+    return _ENABLED
+
+def reset():
+    """Discard all the statistics collected so far."""
+
+    with _LOCK:
+        _STATS.clear()
+
+def stats():
+    """Return the statistics collected so far.
+
+    Returns:        a dictionary of ConversionStats objects keyed by (function
+                    name, argument name).
+    """
+
+    with _LOCK:
+        return {key: ConversionStats(count, nbytes, dict(reasons))
+                for (key, (count, nbytes, reasons)) in _STATS.items()}
+
+def report(count=20, file=None):
+    """Print a table of the arguments with the most bytes copied.
+
+    Inputs:
+        count       number of arguments to list; None for all.
+        file        the file to write to; default is sys.stdout.
+    """
+
+    file = file or sys.stdout
+    items = sorted(stats().items(), key=lambda item: item[1].nbytes,
+                   reverse=True)
+    items = items[:count]
+
+    file.write('%-24s %-12s %10s %14s  %s\n'
+               % ('function', 'argument', 'copies', 'bytes', 'reasons'))
+    for ((func, arg), s) in items:
+        reasons = ', '.join('%s=%d' % item
+                            for item in sorted(s.reasons.items()))
+        file.write('%-24s %-12s %10d %14d  %s\n'
+                   % (func, arg, s.count, s.nbytes, reasons))
+
+################################################################################
+# Support functions
+################################################################################
+
+def _trace(func, arg, reason, nbytes):
+    """Called from C for every copy of an input array."""
+
+    with _LOCK:
+        entry = _STATS.get((func, arg))
+        if entry is None:
+            entry = _STATS[(func, arg)] = [0, 0, {}]
+        entry[0] += 1
+        entry[1] += nbytes
+        entry[2][reason] = entry[2].get(reason, 0) + 1
+
+    if _WARN and nbytes >= _WARN_BYTES:
+        warnings.warn('%s: argument "%s" copied (%s, %d bytes)'
+                      % (func, arg, reason, nbytes), ConversionWarning,
+                      stacklevel=2)
+
+################################################################################
@@ -0,0 +1,285 @@
+################################################################################
+# cspyce/coverage.py
+#
+# A persistent index of the time coverage of SPK, CK, and binary PCK files.
+#
+# Finding out what a set of kernels covers requires a call to spkobj, ckobj, or
+# pckfrm for every file, followed by a call to spkcov, ckcov, or pckcov for
+# every body or frame in it. With thousands of kernels, this can take minutes.
+# A CoverageIndex makes these calls only once per file. It saves the results to
+# disk, keyed by each file's path, size, and modification time, so a file only
+# needs to be scanned again after it changes.
+#
+# Usage:
+#   index = CoverageIndex('coverage.json')  # loads any saved index
+#   index.update()                          # scans new or changed kernels
+#   index.save()
+#   intervals = index.coverage('SPK', 699)  # merged (n,2) array of intervals
+#   files = index.sources('SPK', 699, et)   # files that cover the given time
+################################################################################
+
+import json
+import os
+
+import numpy as np
+
+import cspyce
+from cspyce import windows
+
+KINDS = ('SPK', 'CK', 'PCK')
+
+class CoverageIndex:
+    """An index of the time coverage of SPK, CK, and binary PCK files.
+
+    For each file, the index holds the coverage intervals of every body (SPK),
+    structure (CK), or frame class (PCK) in the file. Coverage times are TDB
+    seconds. CK coverage is converted to TDB at the "INTERVAL" level, so the
+    SCLK kernels and the leapseconds kernel must be loaded when CK files are
+    scanned.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        """Constructor.
+
+        Inputs:
+            path        optional path of a file in which the index is saved. If
+                        the file exists, the saved index is loaded.
+        """
+
+        self.path = path
+        self.files = {}         # file path -> file entry
+        self._merged = {}       # cache of (kind, id) -> merged intervals
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    ############################################################################
+    # Scanning
+    ############################################################################
+
+    def update(self, files=None):
+        """Add new or changed files to the index.
+
+        Inputs:
+            files       list of SPK, CK, or binary PCK file paths to index. If
+                        None, all such kernels currently loaded via furnsh are
+                        indexed.
+
+        Returns:        the list of files that were scanned. Files that are
+                        already in the index and have not changed since are
+                        skipped.
+        """
+
+        if files is None:
+            files = loaded_files()
+        else:
+            files = [(os.fspath(f), None) for f in files]
+
+        scanned = []
+        for (file, kind) in files:
+            key = _file_key(file)
+            entry = self.files.get(key['path'])
+            if entry is not None and entry['size'] == key['size'] \
+                                 and entry['mtime'] == key['mtime']:
+                continue
+
+            if kind is None:
+                (arch, kind) = cspyce.getfat(file)
+                if arch != 'DAF':
+                    raise ValueError('not a binary kernel file: ' + file)
+
+            entry = dict(key)
+            entry['kind'] = kind
+            entry['coverage'] = _scan(file, kind)
+            self.files[key['path']] = entry
+            scanned.append(file)
+
+        if scanned:
+            self._merged.clear()
+
+        return scanned
+
+    def remove(self, file):
+        """Remove a file from the index."""
+
+        if self.files.pop(os.path.realpath(file), None) is not None:
+            self._merged.clear()
+
+    def prune(self):
+        """Remove files that no longer exist or that have changed since they
+        were indexed.
+        """
+
+        for path in list(self.files):
+            entry = self.files[path]
+            if not os.path.exists(path):
+                self.remove(path)
+                continue
+
+            key = _file_key(path)
+            if entry['size'] != key['size'] or entry['mtime'] != key['mtime']:
+                self.remove(path)
+
+    ############################################################################
+    # Queries
+    ############################################################################
+
+    def ids(self, kind):
+        """The sorted list of IDs of the given kind in the index."""
+
+        kind = kind.upper()
+        ids = set()
+        for entry in self.files.values():
+            if entry['kind'] == kind:
+                ids |= set(entry['coverage'])
+
+        return sorted(ids)
+
+    def coverage(self, kind, idcode):
+        """The merged coverage of one ID across all the files in the index, as
+        an (n,2) array of intervals.
+
+        Inputs:
+            kind        "SPK", "CK", or "PCK".
+            idcode      body ID for SPK; structure ID for CK; frame class ID for
+                        PCK. A name is converted to an ID via bods2c.
+        """
+
+        kind = kind.upper()
+        idcode = _idcode(idcode)
+        merged = self._merged.get((kind, idcode))
+        if merged is None:
+            intervals = [entry['coverage'][idcode]
+                         for entry in self.files.values()
+                         if (entry['kind'] == kind
+                             and idcode in entry['coverage'])]
+            if intervals:
+                merged = windows.wnvald(np.concatenate(intervals))
+            else:
+                merged = np.empty((0, 2))
+
+            self._merged[(kind, idcode)] = merged
+
+        return merged
+
+    def sources(self, kind, idcode, et=None):
+        """The files that cover an ID, optionally at a given time.
+
+        Inputs:
+            kind        "SPK", "CK", or "PCK".
+            idcode      body ID, structure ID, or frame class ID, or a body
+                        name.
+            et          optional time in TDB seconds. If given, only the files
+                        that cover this time are returned.
+
+        Returns:        the list of file paths, in the order they were indexed.
+        """
+
+        kind = kind.upper()
+        idcode = _idcode(idcode)
+        files = []
+        for (path, entry) in self.files.items():
+            if entry['kind'] != kind or idcode not in entry['coverage']:
+                continue
+
+            if et is not None:
+                intervals = entry['coverage'][idcode]
+                inside = (intervals[:, 0] <= et) & (et <= intervals[:, 1])
+                if not np.any(inside):
+                    continue
+
+            files.append(path)
+
+        return files
+
+    ############################################################################
+    # Persistence
+    ############################################################################
+
+    def save(self, path=None):
+        """Save the index as a JSON file."""
+
+        path = path or self.path
+        files = {}
+        for (file, entry) in self.files.items():
+            entry = dict(entry)
+            entry['coverage'] = {str(k): v.tolist()
+                                 for (k, v) in entry['coverage'].items()}
+            files[file] = entry
+
+        # Write to a temporary file first, so a saved index is never partial
+        temp = path + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump({'version': self.VERSION, 'files': files}, f)
+        os.replace(temp, path)
+
+    def load(self, path=None):
+        """Load a saved index, replacing the current contents."""
+
+        path = path or self.path
+        with open(path) as f:
+            saved = json.load(f)
+
+        self.files = {}
+        self._merged.clear()
+        if saved.get('version') != self.VERSION:
+            return
+
+        for (file, entry) in saved['files'].items():
+            entry['coverage'] = {int(k): np.array(v, dtype=np.float64)
+                                                .reshape(-1, 2)
+                                 for (k, v) in entry['coverage'].items()}
+            self.files[file] = entry
+
+################################################################################
+# Support functions
+################################################################################
+
+def loaded_files():
+    """The list of (path, kind) for every SPK, CK, and binary PCK file loaded by
+    furnsh, including those loaded via a meta-kernel.
+    """
+
+    kinds = ' '.join(KINDS)
+    files = []
+    for k in range(cspyce.ktotal(kinds)):
+        (file, kind, _, _) = cspyce.kdata.error(k, kinds)
+        files.append((file, kind))
+
+    return files
+
+def _file_key(file):
+    """The path, size, and modification time of a file."""
+
+    path = os.path.realpath(file)
+    stat = os.stat(path)
+    return {'path': path, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+def _idcode(idcode):
+    if isinstance(idcode, str):
+        return cspyce.bods2c.error(idcode)
+
+    return int(idcode)
+
+def _scan(file, kind):
+    """The coverage of every ID in one file, as a dictionary of (n,2) arrays."""
+
+    if kind == 'SPK':
+        ids = cspyce.spkobj(file)
+        covers = [cspyce.spkcov(file, idcode) for idcode in ids]
+    elif kind == 'CK':
+        ids = cspyce.ckobj(file)
+        covers = [cspyce.ckcov(file, idcode, False, 'INTERVAL', 0., 'TDB')
+                  for idcode in ids]
+    elif kind == 'PCK':
+        ids = cspyce.pckfrm(file)
+        covers = [cspyce.pckcov(file, idcode) for idcode in ids]
+    else:
+        raise ValueError('not an SPK, CK, or binary PCK file: ' + file)
+
+    return {int(idcode): cover.as_intervals().copy()
+            for (idcode, cover) in zip(ids, covers)}
+
+################################################################################
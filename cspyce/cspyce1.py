@@ -7,6 +7,7 @@
 # Used internally by cspyce; not intended for direct import.
 ################################################################################
 import numpy as np
+import os
 import textwrap
 from contextlib import contextmanager
 
@@ -22,6 +23,11 @@ from cspyce.cspyce1_info import \
 import __main__
 INTERACTIVE = not hasattr(__main__, '__file__')
 
+# A child process created by fork() must not inherit the SPICE lock in a state
+# held by a thread of the parent
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=cspyce0.reinitialize_spice_lock)
+
 ################################################################################
 # GET/SET handling
 ################################################################################
@@ -727,16 +733,112 @@ def invert_vector_error(m1):
 
     return inverses
 
+################################################################################
+# Kernel pool generation counter. Every function that loads or unloads kernels
+# or writes to the kernel pool increments it, even if the call fails part way.
+# So does timdef("SET", ...), because it changes the results of str2et.
+# Cached results that depend on the pool (see cspyce.memoize) are valid only
+# while the generation is unchanged. Calls made directly to cspyce0 bypass the
+# counter. Each function in POOL_LISTENERS is called with the new generation
+# number after every change (see cspyce.pool).
+################################################################################
+
+POOL_GENERATION = 0
+POOL_LISTENERS = []
+
+# If not None, the cspyce.kernel_cache.KernelCache used by furnsh and unload
+KERNEL_CACHE = None
+
+def pool_generation():
+    """Return the current kernel pool generation number."""
+
+    return POOL_GENERATION
+
+def _pool_changed():
+    global POOL_GENERATION
+    POOL_GENERATION += 1
+    for listener in tuple(POOL_LISTENERS):
+        listener(POOL_GENERATION)
+
+def furnsh(file):
+    try:
+        if KERNEL_CACHE is None:
+            cspyce0.furnsh(file)
+        else:
+            KERNEL_CACHE.furnsh(file)
+    finally:
+        _pool_changed()
+
+def unload(file):
+    try:
+        if KERNEL_CACHE is None:
+            cspyce0.unload(file)
+        else:
+            KERNEL_CACHE.unload(file)
+    finally:
+        _pool_changed()
+
+def kclear():
+    try:
+        cspyce0.kclear()
+    finally:
+        _pool_changed()
+
+def clpool():
+    try:
+        cspyce0.clpool()
+    finally:
+        _pool_changed()
+
+def ldpool(fname):
+    try:
+        cspyce0.ldpool(fname)
+    finally:
+        _pool_changed()
+
+def lmpool(cvals):
+    try:
+        cspyce0.lmpool(cvals)
+    finally:
+        _pool_changed()
+
+def pdpool(name, dvals):
+    try:
+        cspyce0.pdpool(name, dvals)
+    finally:
+        _pool_changed()
+
+def pipool(name, ivals):
+    try:
+        cspyce0.pipool(name, ivals)
+    finally:
+        _pool_changed()
+
+def boddef(name, code):
+    try:
+        cspyce0.boddef(name, code)
+    finally:
+        _pool_changed()
+
+def dvpool(name):
+    try:
+        cspyce0.dvpool(name)
+    finally:
+        _pool_changed()
+
 ################################################################################
 # This is the one function that takes an array of strings as input. This fix
 # allows it to work in a sensible way if a single input string is provided.
 ################################################################################
 
 def pcpool(name, cvals):
-    if isinstance(cvals, str):
-        cspyce0.pcpool(name, [cvals])
-    else:
-        cspyce0.pcpool(name, cvals)
+    try:
+        if isinstance(cvals, str):
+            cspyce0.pcpool(name, [cvals])
+        else:
+            cspyce0.pcpool(name, cvals)
+    finally:
+        _pool_changed()
 
 ################################################################################
 # These wrappers on the comment readers dafec and dasec ensure that the entire
@@ -859,7 +961,8 @@ def hx2dp(string):
     return [0. if error else number, error, errmsg]
 
 ################################################################################
-# Handle "GET"/"SET" inputs to timdef().
+# Handle "GET"/"SET" inputs to timdef(). A change to the time defaults also
+# counts as a change to the kernel pool, so memoized str2et results are dropped.
 ################################################################################
 
 def timdef(action='', item='', value=''):
@@ -874,7 +977,13 @@ def timdef(action='', item='', value=''):
             item = action
             action = 'SET'
 
-    return cspyce0.timdef(action, item, value)
+    if action == 'GET':
+        return cspyce0.timdef(action, item, value)
+
+    try:
+        return cspyce0.timdef(action, item, value)
+    finally:
+        _pool_changed()
 
 ################################################################################
 # Prepare for the possible use of aliases
@@ -0,0 +1,268 @@
+################################################################################
+# cspyce/daf.py
+#
+# A read-only, pure-NumPy reader for DAF (Double precision Array File) files,
+# the binary format used by SPK, CK, and binary PCK kernels.
+#
+# The file is memory-mapped, and all data is returned as NumPy arrays or views
+# of the mapping. No SPICE routines or global state are used, so DafFile
+# objects can be used concurrently from any number of threads or processes.
+#
+# daf_summaries() returns the summaries of a file from a cache on disk, so that
+# scanning large sets of kernels repeatedly is fast.
+#
+# Layout of a DAF, in brief:
+#   Record 1 is the file record, holding ND and NI, the number of double and
+#   integer components of each segment summary, and the numbers of the first
+#   and last summary records.
+#   Summary records form a doubly linked list. Each one holds the next and
+#   previous record numbers and the number of summaries it contains, followed
+#   by the summaries themselves. Each summary packs its NI integers into the
+#   doubles following its ND doubles.
+#   Each summary record is immediately followed by a name record, holding the
+#   name of each segment summarized.
+#   Segment data is addressed by 1-based double precision word addresses.
+################################################################################
+
+import hashlib
+import os
+
+import numpy as np
+
+import cspyce
+
+RECORD_BYTES = 1024
+RECORD_DOUBLES = 128
+
+class DafFile:
+    """A memory-mapped, read-only DAF file."""
+
+    def __init__(self, path):
+        """Open a DAF file.
+
+        Inputs:
+            path        path to the file.
+        """
+
+        self.path = path
+        self._bytes = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self._bytes) < RECORD_BYTES:
+            raise ValueError('file is too short to be a DAF: ' + str(path))
+
+        record = self._bytes[:RECORD_BYTES].tobytes()
+        self.idword = record[:8].decode('latin-1').rstrip()
+        if not self.idword.startswith('DAF/') and self.idword != 'NAIF/DAF':
+            raise ValueError('not a DAF file: ' + str(path))
+
+        self.byteorder = _byteorder(record)
+        ints = np.frombuffer(record, dtype=self.byteorder + 'i4')
+        (self.nd, self.ni) = (int(ints[2]), int(ints[3]))
+        self.ifname = record[16:76].decode('latin-1').rstrip()
+        (self.fward, self.bward, self.free) = (int(x) for x in ints[19:22])
+
+        # Sizes in doubles of a summary, the packed integers, and a name
+        self.ss = self.nd + (self.ni + 1) // 2
+        self.nc = 8 * self.ss
+
+        usable = len(self._bytes) // 8 * 8
+        self._doubles = self._bytes[:usable].view(self.byteorder + 'f8')
+
+        self._dtype = np.dtype([('dc', np.float64, (self.nd,)),
+                                ('ic', np.int32, (self.ni,)),
+                                ('name', 'S%d' % self.nc)])
+
+    def read(self, begin, end):
+        """The doubles from address begin to address end, inclusive, as a view
+        of the file. Addresses are 1-based, as in SPICE.
+        """
+
+        return self._doubles[begin - 1:end]
+
+    def summaries(self):
+        """Every segment summary and name in the file, in file order.
+
+        Returns:        a structured array with a row for each segment and these
+                        fields:
+                            dc      the ND double precision components.
+                            ic      the NI integer components.
+                            name    the segment name, as bytes.
+        """
+
+        ints_per_summary = 2 * self.ss - 2 * self.nd
+        chunks = []
+        recno = self.fward
+        visited = set()
+        while recno > 0:
+            if recno in visited:
+                raise ValueError('summary records form a loop: ' + str(self.path))
+            visited.add(recno)
+
+            start = (recno - 1) * RECORD_DOUBLES
+            control = self._doubles[start:start + 3]
+            (next_recno, count) = (int(control[0]), int(control[2]))
+
+            # Summaries as rows of doubles; the integers are views of the same
+            # bytes, in the file's byte order
+            words = self._doubles[start + 3:start + 3 + count * self.ss]
+            words = words.reshape(count, self.ss)
+            ints = words[:, self.nd:].view(self.byteorder + 'i4')
+            ints = ints.reshape(count, ints_per_summary)[:, :self.ni]
+
+            offset = recno * RECORD_BYTES
+            names = self._bytes[offset:offset + count * self.nc]
+
+            chunk = np.empty(count, dtype=self._dtype)
+            chunk['dc'] = words[:, :self.nd]
+            chunk['ic'] = ints
+            chunk['name'] = names.view('S%d' % self.nc)
+            chunks.append(chunk)
+
+            recno = next_recno
+
+        if not chunks:
+            return np.empty(0, dtype=self._dtype)
+
+        summaries = np.concatenate(chunks)
+        summaries['name'] = np.char.rstrip(summaries['name'])
+        return summaries
+
+    def close(self):
+        """Release the memory mapping."""
+
+        self._doubles = None
+        self._bytes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+################################################################################
+# Cached summaries
+################################################################################
+
+# In-memory cache of path -> ((size, mtime), summaries)
+_SUMMARY_CACHE = {}
+
+def summary_cache_dir():
+    """The directory in which summaries are cached on disk. It is given by the
+    environment variable CSPYCE_CACHE_DIR, or else is the "cspyce" subdirectory
+    of the user's cache directory, $XDG_CACHE_HOME or ~/.cache.
+
+    The directory belongs to one user. A directory that other users can write
+    to, such as the system's temporary directory, would let them plant false
+    summaries for the user's files.
+    """
+
+    directory = os.getenv('CSPYCE_CACHE_DIR')
+    if not directory:
+        base = (os.getenv('XDG_CACHE_HOME')
+                or os.path.join(os.path.expanduser('~'), '.cache'))
+        directory = os.path.join(base, 'cspyce')
+
+    return directory
+
+def daf_summaries(path, cache=True):
+    """Every segment summary and name in a DAF file, as returned by
+    DafFile.summaries().
+
+    The result is cached, both in memory and on disk in summary_cache_dir(),
+    keyed by the file's path, size, and modification time. Repeated calls for
+    an unchanged file do not read the file again.
+
+    Inputs:
+        path        path to the DAF file.
+        cache       False to ignore and bypass the on-disk cache.
+    """
+
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+
+    cached = _SUMMARY_CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    cache_file = None
+    if cache:
+        digest = hashlib.sha1(path.encode('utf-8')).hexdigest()
+        cache_file = os.path.join(summary_cache_dir(), digest + '.npz')
+        summaries = _read_cache(cache_file, path, key)
+        if summaries is not None:
+            _SUMMARY_CACHE[path] = (key, summaries)
+            return summaries
+
+    with DafFile(path) as daf:
+        summaries = daf.summaries()
+
+    _SUMMARY_CACHE[path] = (key, summaries)
+    if cache_file:
+        _write_cache(cache_file, path, key, summaries)
+
+    return summaries
+
+def loaded_daf_summaries(kinds='SPK CK PCK'):
+    """The summaries of every DAF kernel loaded via furnsh.
+
+    Inputs:
+        kinds       the kinds of kernel to include, as accepted by ktotal.
+
+    Returns:        a dictionary of summary arrays, keyed by file path, in load
+                    order.
+    """
+
+    result = {}
+    for k in range(cspyce.ktotal(kinds)):
+        (file, _, _, _) = cspyce.kdata.error(k, kinds)
+        result[file] = daf_summaries(file)
+
+    return result
+
+def _read_cache(cache_file, path, key):
+    """The summaries saved in a cache file, or None if the file is missing, is
+    unreadable, or does not match the key.
+    """
+
+    try:
+        with np.load(cache_file) as saved:
+            if str(saved['path']) != path or tuple(saved['key']) != key:
+                return None
+            return saved['summaries']
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _write_cache(cache_file, path, key, summaries):
+    """Save summaries to a cache file. Failure to write is not an error."""
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), mode=0o700, exist_ok=True)
+        temp = '%s.%d.tmp' % (cache_file, os.getpid())
+        with open(temp, 'wb') as f:
+            np.savez(f, path=np.array(path), key=np.array(key, dtype=np.int64),
+                     summaries=summaries)
+        os.replace(temp, cache_file)
+    except OSError:
+        pass
+
+################################################################################
+# Support functions
+################################################################################
+
+def _byteorder(record):
+    """The NumPy byte order character for the numbers in a DAF."""
+
+    bff = record[88:96].decode('latin-1')
+    if bff == 'LTL-IEEE':
+        return '<'
+    if bff == 'BIG-IEEE':
+        return '>'
+    if bff.strip('\0 '):
+        raise ValueError('unsupported DAF binary format: ' + bff)
+
+    # Older files lack the format string; use whichever order gives a sensible
+    # value of ND
+    nd = np.frombuffer(record[8:12], dtype='<i4')[0]
+    return '<' if 0 < nd <= 124 else '>'
+
+################################################################################
@@ -0,0 +1,143 @@
+################################################################################
+# cspyce/das.py
+#
+# Bulk readers for DAS (Direct Access Segregated) files.
+#
+# The functions dasrdd, dasrdi, and dasrdc allocate and return a new array for
+# every range read, and dasrdc also decodes every record into a Python string.
+# The functions here instead fill arrays provided by the caller, directly from
+# C, with no intermediate copies and no per-record decoding. Character data is
+# returned as raw bytes. Large address ranges can also be streamed in chunks of
+# fixed size.
+################################################################################
+
+import numpy as np
+
+import cspyce
+import cspyce.cspyce0 as cspyce0
+
+# Data types by type letter, in the order returned by daslla
+DAS_DTYPES = {'C': np.dtype(np.uint8),
+              'D': np.dtype(np.double),
+              'I': np.dtype(np.int32)}
+
+def dasrdd_into(handle, first, data):
+    """Read doubles from a DAS file into an array.
+
+    Inputs:
+        handle      handle of the DAS file.
+        first       address of the first double to read.
+        data        a writeable, contiguous array of float64. It receives one
+                    value per element, starting at address first.
+
+    Returns:        data.
+    """
+
+    cspyce0.dasrdd_inplace(handle, first, data)
+    return data
+
+def dasrdi_into(handle, first, data):
+    """Read integers from a DAS file into an array.
+
+    Inputs:
+        handle      handle of the DAS file.
+        first       address of the first integer to read.
+        data        a writeable, contiguous array of int32. It receives one
+                    value per element, starting at address first.
+
+    Returns:        data.
+    """
+
+    cspyce0.dasrdi_inplace(handle, first, data)
+    return data
+
+def dasrdc_into(handle, first, data):
+    """Read characters from a DAS file into an array of bytes.
+
+    Inputs:
+        handle      handle of the DAS file.
+        first       address of the first character to read.
+        data        a writeable, contiguous array of uint8, or of fixed-width
+                    byte strings (dtype "S<n>"). The characters fill the array's
+                    memory in order, one byte per address, so an array of n
+                    strings of width w receives n*w characters as n records.
+                    No decoding is done.
+
+    Returns:        data.
+    """
+
+    if data.dtype.kind == 'S':
+        cspyce0.dasrdc_inplace(handle, first, data.view(np.uint8))
+    else:
+        cspyce0.dasrdc_inplace(handle, first, data)
+
+    return data
+
+def dasrd_array(handle, kind, first, last, out=None):
+    """Read a range of DAS addresses of one data type in a single call.
+
+    Inputs:
+        handle      handle of the DAS file.
+        kind        "D" for doubles, "I" for integers, or "C" for characters.
+        first       first address to read.
+        last        last address to read.
+        out         optional array to fill; if not provided, a new array is
+                    allocated. It must have at least last - first + 1 elements.
+                    For characters, it can also be an array of fixed-width
+                    byte strings with at least last - first + 1 bytes in all.
+
+    Returns:        the array of values; characters are returned as uint8.
+    """
+
+    kind = kind.upper()
+    count = last - first + 1
+    if out is None:
+        out = np.empty(count, dtype=DAS_DTYPES[kind])
+    elif not out.flags.c_contiguous:
+        raise ValueError('output array must be contiguous')
+
+    # Strings are filled byte by byte, one byte per address
+    if out.dtype.kind == 'S':
+        out = out.reshape(-1).view(np.uint8)
+
+    if out.size < count:
+        raise ValueError('output array has %d elements; %d are required'
+                         % (out.size, count))
+
+    out = out.reshape(-1)[:count]
+
+    return _READERS[kind](handle, first, out)
+
+def dasrd_chunks(handle, kind, first=1, last=None, chunk=1 << 16, reuse=False):
+    """Generator that streams a range of DAS addresses in chunks.
+
+    Inputs:
+        handle      handle of the DAS file.
+        kind        "D" for doubles, "I" for integers, or "C" for characters.
+        first       first address to read; default 1.
+        last        last address to read; default is the last address of this
+                    data type in the file.
+        chunk       number of elements per chunk.
+        reuse       if True, every chunk is read into the same buffer, so each
+                    array yielded is only valid until the next one is read.
+                    This avoids allocating memory for each chunk.
+
+    Yields:         a tuple (address, array) for each chunk, where address is
+                    the address of the first element of the array.
+    """
+
+    kind = kind.upper()
+    if last is None:
+        (lastc, lastd, lasti) = cspyce.daslla(handle)
+        last = {'C': lastc, 'D': lastd, 'I': lasti}[kind]
+
+    buffer = np.empty(chunk, dtype=DAS_DTYPES[kind]) if reuse else None
+    for address in range(first, last + 1, chunk):
+        stop = min(address + chunk - 1, last)
+        yield (address, dasrd_array(handle, kind, address, stop, buffer))
+
+_READERS = {'C': dasrdc_into,
+            'D': dasrdd_into,
+            'I': dasrdi_into}
+
+################################################################################
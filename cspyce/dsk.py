@@ -0,0 +1,144 @@
+################################################################################
+# cspyce/dsk.py
+#
+# Bulk extraction of the shape models in DSK type 2 segments.
+#
+# Reading a plate model with dskv02 and dskp02 takes one call per "room"
+# vertices or plates, each returning a new array. For models of millions of
+# plates, this means thousands of calls and copies. The functions here read the
+# vertices and plates of a segment directly from the underlying DAS file into
+# NumPy arrays, using the bulk readers in cspyce.das. The output arrays can be
+# memory-mapped files, and a model too large for memory can also be streamed
+# in chunks.
+#
+# Within a type 2 segment, the integer data begins with NV and NP, the numbers
+# of vertices and plates, and the plates themselves begin at integer IXPLAT.
+# The double precision data begins with the DSK descriptor, and the vertices
+# themselves begin at double IXVERT. The addresses of each are relative to the
+# base addresses in the segment's DLA descriptor.
+################################################################################
+
+import numpy as np
+
+import cspyce
+from cspyce import das
+from cspyce.record_support import as_record
+
+# Offsets within a type 2 segment, from the SPICE include file dsk02.inc
+IXPLAT = 11             # first plate in the integer data
+IXVERT = 35             # first vertex in the double precision data
+
+def dsk02_mesh(handle, dladsc, vertices=None, plates=None, filename=None):
+    """The complete vertex and plate arrays of a DSK type 2 segment.
+
+    Inputs:
+        handle      handle of a DSK file opened for read access.
+        dladsc      DLA descriptor of the segment.
+        vertices    optional float64 array of shape (nv,3) to fill.
+        plates      optional int32 array of shape (np,3) to fill.
+        filename    optional path prefix. If given, and vertices or plates is
+                    not provided, that array is written to a memory-mapped
+                    file "<filename>_vertices.npy" or "<filename>_plates.npy",
+                    which can be reopened via numpy.load(..., mmap_mode='r').
+
+    Returns:        a tuple (vertices, plates). The plates contain 1-based
+                    vertex indices, as returned by dskp02.
+    """
+
+    (nv, np_) = cspyce.dskz02(handle, dladsc)
+    (dfirst, ifirst) = _addresses(handle, dladsc)
+
+    vertices = _output(vertices, nv, np.float64, filename, '_vertices.npy')
+    plates = _output(plates, np_, np.int32, filename, '_plates.npy')
+
+    das.dasrd_array(handle, 'D', dfirst, dfirst + 3 * nv - 1,
+                    vertices.reshape(-1))
+    das.dasrd_array(handle, 'I', ifirst, ifirst + 3 * np_ - 1,
+                    plates.reshape(-1))
+
+    if isinstance(vertices, np.memmap):
+        vertices.flush()
+    if isinstance(plates, np.memmap):
+        plates.flush()
+
+    return (vertices, plates)
+
+def dsk02_vertex_chunks(handle, dladsc, chunk=1 << 20, reuse=False):
+    """Generator that streams the vertices of a DSK type 2 segment in chunks.
+
+    Inputs:
+        handle      handle of a DSK file opened for read access.
+        dladsc      DLA descriptor of the segment.
+        chunk       number of vertices per chunk.
+        reuse       if True, every chunk is read into the same buffer, so each
+                    array yielded is only valid until the next one is read.
+
+    Yields:         a tuple (start, array) for each chunk, where start is the
+                    1-based index of the first vertex and array has shape
+                    (n,3).
+    """
+
+    (nv, _) = cspyce.dskz02(handle, dladsc)
+    (dfirst, _) = _addresses(handle, dladsc)
+    return _chunks(handle, 'D', dfirst, nv, chunk, reuse)
+
+def dsk02_plate_chunks(handle, dladsc, chunk=1 << 20, reuse=False):
+    """Generator that streams the plates of a DSK type 2 segment in chunks.
+
+    Inputs:
+        handle      handle of a DSK file opened for read access.
+        dladsc      DLA descriptor of the segment.
+        chunk       number of plates per chunk.
+        reuse       if True, every chunk is read into the same buffer, so each
+                    array yielded is only valid until the next one is read.
+
+    Yields:         a tuple (start, array) for each chunk, where start is the
+                    1-based index of the first plate and array has shape (n,3).
+    """
+
+    (_, np_) = cspyce.dskz02(handle, dladsc)
+    (_, ifirst) = _addresses(handle, dladsc)
+    return _chunks(handle, 'I', ifirst, np_, chunk, reuse)
+
+################################################################################
+# Support functions
+################################################################################
+
+def _addresses(handle, dladsc):
+    """The DAS addresses of the first vertex and the first plate of a type 2
+    segment.
+    """
+
+    dsktype = int(cspyce.dskgd(handle, dladsc).dtype_)
+    if dsktype != 2:
+        raise ValueError('DSK segment has type %d; type 2 is required'
+                         % dsktype)
+
+    dladsc = as_record('SpiceDLADescr', dladsc)
+    return (int(dladsc.dbase) + IXVERT, int(dladsc.ibase) + IXPLAT)
+
+def _output(array, count, dtype, filename, suffix):
+    """Validate an output array of shape (count,3), or create a new one."""
+
+    if array is None:
+        if filename is None:
+            return np.empty((count, 3), dtype=dtype)
+        return np.lib.format.open_memmap(str(filename) + suffix, mode='w+',
+                                         dtype=dtype, shape=(count, 3))
+
+    if (array.shape != (count, 3) or array.dtype != dtype
+                                  or not array.flags.c_contiguous):
+        raise ValueError('output array must be contiguous, with shape (%d, 3) '
+                         'and dtype %s' % (count, np.dtype(dtype).name))
+
+    return array
+
+def _chunks(handle, kind, first, count, chunk, reuse):
+    """Yield (start, array) for chunks of rows of three values."""
+
+    last = first + 3 * count - 1
+    for (address, values) in das.dasrd_chunks(handle, kind, first, last,
+                                              3 * chunk, reuse):
+        yield ((address - first) // 3 + 1, values.reshape(-1, 3))
+
+################################################################################
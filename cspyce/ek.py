@@ -0,0 +1,309 @@
+################################################################################
+# cspyce/ek.py
+#
+# Columnar access to EK tables.
+#
+# After a query by ekfind, reading the results with ekgd, ekgi, and ekgc takes
+# one call per column, row, and element. The functions here instead fill a
+# NumPy array for each column, looping over the rows in C, so a column costs
+# one call per element index rather than one call per value. Large result sets
+# can also be streamed in chunks of rows.
+#
+# In the other direction, write_ek_table writes NumPy columns to an EK file via
+# the fast-load routines ekifld, ekacld/ekacli/ekaclc, and ekffld, inferring
+# the column declarations from the arrays.
+#
+# Usage:
+#   columns = ekfetch('SELECT TIME, COUNT, NAME FROM EVENTS WHERE COUNT > 0')
+#   columns['COUNT']        # masked int32 array, masked where null
+#   for chunk in ekfetch_chunks(query, chunk=100000):
+#       ...                 # a dictionary of columns for each chunk of rows
+#   write_ek_table('events.bes', 'EVENTS', {'TIME': et, 'COUNT': counts},
+#                  time_columns=['TIME'], indexed=['TIME'])
+################################################################################
+
+import numpy as np
+
+import cspyce
+import cspyce.cspyce0 as cspyce0
+
+# EK data types, as returned by ekpsel and ekcii
+EK_CHR  = 0
+EK_DP   = 1
+EK_INT  = 2
+EK_TIME = 3
+
+# String width used for character columns of variable length
+DEFAULT_WIDTH = 256
+
+def ekfetch(query, masked=True, width=None):
+    """Run an EK query and return its results as NumPy arrays, one per column.
+
+    Inputs:
+        query       EK query. Every item in the SELECT clause must be a column.
+        masked      if True, each column is returned as a masked array, masked
+                    where values are null or where an array-valued entry has
+                    fewer elements than the longest entry. If False, these
+                    values are zero or empty.
+        width       width for the strings of character columns of variable
+                    length; default is 256.
+
+    Returns:        a dictionary of arrays keyed by column name, in the order
+                    of the SELECT clause. If two columns have the same name, the
+                    table name is prefixed, as in "TABLE.COLUMN". Numeric and
+                    time columns are float64 or int32, and character columns
+                    are byte strings. A column whose entries are arrays has
+                    shape (rows, elements); otherwise, its shape is (rows,).
+    """
+
+    nmrows = cspyce.ekfind.error(query)
+    columns = _select_columns(query, width)
+    return _fetch_rows(columns, 0, nmrows, masked)
+
+def ekfetch_chunks(query, chunk=65536, masked=True, width=None):
+    """Generator that runs an EK query and yields its results in chunks of
+    rows, as dictionaries of arrays in the format returned by ekfetch.
+
+    The query results are held by SPICE, so no other EK query can be made until
+    the generator is exhausted.
+
+    Inputs:
+        query       EK query. Every item in the SELECT clause must be a column.
+        chunk       maximum number of rows per chunk.
+        masked      True to return masked arrays, as for ekfetch.
+        width       width for the strings of character columns of variable
+                    length.
+    """
+
+    nmrows = cspyce.ekfind.error(query)
+    columns = _select_columns(query, width)
+    for first in range(0, nmrows, chunk):
+        yield _fetch_rows(columns, first, min(chunk, nmrows - first), masked)
+
+def write_ek_table(path, table, columns, segment_rows=100000, append=False,
+                   time_columns=(), indexed=(), ifname=None, ncomch=0):
+    """Write NumPy columns to an EK file as a table, using fast load.
+
+    Inputs:
+        path        path to the EK file.
+        table       name of the table.
+        columns     the column data, as a dictionary of arrays keyed by column
+                    name or as a structured array. Every column must have the
+                    same number of rows. Float arrays become DOUBLE PRECISION
+                    columns, integer and boolean arrays become INTEGER columns,
+                    and string arrays become CHARACTER columns of the maximum
+                    string length. A 2-D array becomes a column whose entries
+                    are arrays of fixed size. The masked values of a masked
+                    array are written as nulls.
+        segment_rows
+                    maximum number of rows per segment; longer tables are split
+                    into multiple segments.
+        append      True to add segments to an existing file; False to create a
+                    new file.
+        time_columns
+                    names of float columns to declare as TIME columns.
+        indexed     names of columns to index.
+        ifname      internal file name of a new file; default is the table name.
+        ncomch      number of characters to reserve for comments in a new file.
+
+    Returns:        the number of segments written.
+    """
+
+    columns = _as_columns(columns)
+    nrows = {len(values) for values in columns.values()}
+    if len(nrows) > 1:
+        raise ValueError('columns have different numbers of rows')
+    nrows = nrows.pop() if nrows else 0
+
+    names = list(columns)
+    time_columns = _column_names(time_columns, names, 'time_columns')
+    indexed = _column_names(indexed, names, 'indexed')
+    decls = [_declaration(name, values, name in time_columns, name in indexed)
+             for (name, values) in columns.items()]
+
+    if append:
+        handle = cspyce.ekopw(path)
+    else:
+        handle = cspyce.ekopn(path, ifname or table, ncomch)
+
+    segments = 0
+    try:
+        for first in range(0, nrows, segment_rows):
+            count = min(segment_rows, nrows - first)
+            (segno, rcptrs) = cspyce.ekifld(handle, table, count, names, decls)
+            for (name, values) in columns.items():
+                _add_column(handle, segno, name, values[first:first + count],
+                            rcptrs)
+
+            cspyce.ekffld(handle, segno, rcptrs)
+            segments += 1
+    finally:
+        cspyce.ekcls(handle)
+
+    return segments
+
+################################################################################
+# Support functions
+################################################################################
+
+def _select_columns(query, width):
+    """The (key, selidx, dtype, width) of each column in the SELECT clause."""
+
+    (_, _, xtypes, xclass, tabs, cols) = cspyce.ekpsel.error(query)
+    for (k, xc) in enumerate(xclass):
+        if xc != 0:
+            raise ValueError('item %d of the SELECT clause is not a column'
+                             % (k + 1))
+
+    columns = []
+    for (selidx, (xtype, table, column)) in enumerate(zip(xtypes, tabs, cols)):
+        key = column
+        if cols.count(column) > 1:
+            key = table + '.' + column
+
+        strlen = 0
+        if xtype == EK_CHR:
+            strlen = _strlen(table, column)
+            if strlen <= 0:
+                strlen = width or DEFAULT_WIDTH
+
+        columns.append((key, selidx, int(xtype), strlen))
+
+    return columns
+
+def _strlen(table, column):
+    """The declared string length of a character column, or -1 if it has
+    variable length.
+    """
+
+    for cindex in range(cspyce.ekccnt(table)):
+        (name, _, _, strlen, _, _, _) = cspyce.ekcii(table, cindex)
+        if name == column:
+            return strlen
+
+    return -1
+
+def _as_columns(columns):
+    """A dictionary of column arrays from a dictionary or structured array."""
+
+    if isinstance(columns, np.ndarray) and columns.dtype.names:
+        columns = {name: columns[name] for name in columns.dtype.names}
+
+    result = {}
+    for (name, values) in columns.items():
+        if not isinstance(values, np.ndarray):
+            values = np.asarray(values)
+        if values.dtype.kind == 'U':
+            values = np.char.encode(values, 'latin-1')
+        result[name.upper()] = values
+
+    return result
+
+def _column_names(names, columns, option):
+    """The set of upper-case column names given for an option of
+    write_ek_table; each must be one of the columns.
+    """
+
+    names = {name.upper() for name in names}
+    unknown = names - set(columns)
+    if unknown:
+        raise ValueError('%s lists unknown columns: %s'
+                         % (option, ', '.join(sorted(unknown))))
+
+    return names
+
+def _declaration(name, values, is_time, is_indexed):
+    """The EK column declaration for an array."""
+
+    kind = values.dtype.kind
+    if kind == 'f':
+        datatype = 'TIME' if is_time else 'DOUBLE PRECISION'
+    elif kind in 'iub':
+        datatype = 'INTEGER'
+    elif kind == 'S':
+        datatype = 'CHARACTER*(%d)' % max(values.dtype.itemsize, 1)
+    else:
+        raise ValueError('unsupported dtype for EK column %s: %s'
+                         % (name, values.dtype))
+
+    if is_time and kind != 'f':
+        raise ValueError('TIME column %s must be floating-point' % name)
+
+    decl = 'DATATYPE = ' + datatype
+    if values.ndim > 1:
+        decl += ', SIZE = %d' % int(np.prod(values.shape[1:]))
+    decl += ', INDEXED = ' + ('TRUE' if is_indexed else 'FALSE')
+    decl += ', NULLS_OK = ' + ('TRUE' if np.ma.is_masked(values) else 'FALSE')
+    return decl
+
+def _add_column(handle, segno, name, values, rcptrs):
+    """Add one column of a segment via ekacld, ekacli, or ekaclc."""
+
+    nrows = len(values)
+    nulls = np.ma.getmaskarray(values).reshape(nrows, -1).any(axis=-1)
+    if np.ma.isMaskedArray(values):
+        values = values.filled(values.dtype.type())
+
+    size = int(np.prod(values.shape[1:]))
+    entszs = np.full(nrows, size, dtype=np.int32)
+    nlflgs = nulls.astype(np.int32)
+
+    kind = values.dtype.kind
+    if kind == 'f':
+        cspyce.ekacld(handle, segno, name, values.ravel(), entszs, nlflgs,
+                      rcptrs)
+    elif kind == 'S':
+        strings = [value.decode('latin-1') for value in values.ravel()]
+        cspyce.ekaclc(handle, segno, name, strings, entszs, nlflgs, rcptrs)
+    else:
+        ints = values.ravel()
+        if len(ints) and (ints.min() < -2**31 or ints.max() >= 2**31):
+            raise ValueError('values of EK column %s overflow int32' % name)
+        cspyce.ekacli(handle, segno, name, ints.astype(np.int32), entszs,
+                      nlflgs, rcptrs)
+
+def _fetch_rows(columns, first, nrows, masked):
+    """Read rows first to first + nrows - 1 of each column."""
+
+    results = {}
+    for (key, selidx, xtype, strlen) in columns:
+        counts = np.empty(nrows, dtype=np.int32)
+        cspyce0.eknelt_inplace(selidx, first, counts)
+        nelts = max(int(counts.max()), 1) if nrows else 1
+
+        if xtype == EK_CHR:
+            dtype = np.dtype('S%d' % strlen)
+        elif xtype == EK_INT:
+            dtype = np.dtype(np.int32)
+        else:
+            dtype = np.dtype(np.float64)
+
+        # Element-major, so that each element index fills a contiguous row
+        values = np.zeros((nelts, nrows), dtype=dtype)
+        nulls = np.zeros((nelts, nrows), dtype=np.uint8)
+        for elment in range(nelts):
+            if xtype == EK_CHR:
+                cspyce0.ekgc_inplace(selidx, first, elment,
+                                     values[elment].view(np.uint8),
+                                     nulls[elment])
+            elif xtype == EK_INT:
+                cspyce0.ekgi_inplace(selidx, first, elment, values[elment],
+                                     nulls[elment])
+            else:
+                cspyce0.ekgd_inplace(selidx, first, elment, values[elment],
+                                     nulls[elment])
+
+        if nelts > 1:
+            (values, nulls) = (np.ascontiguousarray(values.T), nulls.T)
+        else:
+            (values, nulls) = (values[0], nulls[0])
+        if masked:
+            values = np.ma.MaskedArray(values, mask=(nulls != 0))
+        else:
+            values[nulls != 0] = dtype.type()
+
+        results[key] = values
+
+    return results
+
+################################################################################
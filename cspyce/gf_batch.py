@@ -0,0 +1,349 @@
+################################################################################
+# cspyce/gf_batch.py
+#
+# Batch versions of the GF searches gftfov, gfoclt, and gfsep. Each one runs the
+# same search for a list of targets over a common confinement window and
+# returns a dictionary of result windows, keyed by target.
+#
+# The CSPICE searches cannot share state with one another, so each target still
+# requires its own GF search. However, for gftfov and gfoclt, a quick vectorized
+# pre-scan on a time grid shared by all the targets identifies where each
+# target could possibly satisfy the condition. The observer geometry (the
+# instrument boresight or the position of the occulting body) is computed only
+# once for the grid. Each GF search is then confined to the candidate intervals
+# of its target, and skipped entirely if there are none.
+#
+# The pre-scan compares directions computed without the stellar aberration
+# correction of the FOV geometry, so each condition is relaxed by an angular
+# tolerance, ANGLE_TOLERANCE, which exceeds the largest aberration angle of any
+# solar system observer. A grazing event can still be missed if its angular
+# extent changes by more than that between grid samples; use prescan=False or a
+# smaller step in that case.
+#
+# The explicit error versions of the cspyce functions are used throughout, so
+# the results do not depend on use_errors() or use_flags(), in this process or
+# in any worker process.
+#
+# Optionally, the searches can also be distributed across worker processes.
+################################################################################
+
+import numpy as np
+
+import cspyce
+from cspyce import parallel
+from cspyce.spice_cell import SpiceCell, SPICE_CELL_DOUBLE
+
+# Angular tolerance in radians added to the pre-scan conditions. The stellar
+# aberration angle is at most v/c, about 1e-4 for the Earth and 2e-4 for a
+# spacecraft at 60 km/s.
+ANGLE_TOLERANCE = 3.e-4
+
+def gftfov_batch(inst, targets, tshape, tframe, abcorr, obsrvr, step, cnfine,
+                 room=20000, prescan=True, processes=0):
+    """Run gftfov for each target in a list.
+
+    Inputs:
+        inst        name of the instrument.
+        targets     list of target names.
+        tshape      shape of the targets, "POINT" or "ELLIPSOID"; either a
+                    single value or a list with one value per target.
+        tframe      body-fixed frame of the targets; either a single value or a
+                    list with one value per target.
+        abcorr      aberration correction flag.
+        obsrvr      name of the observing body.
+        step        step size in seconds for the GF search.
+        cnfine      confinement window, as a SpiceCell or an array of intervals.
+        room        size of each result window.
+        prescan     True to use a vectorized pre-scan to confine each search.
+        processes   number of worker processes to use; 0 to run all searches in
+                    this process; None to use one per CPU.
+
+    Returns:        a dictionary of result windows, keyed by target.
+    """
+
+    targets = list(targets)
+    tshapes = _as_list(tshape, len(targets))
+    tframes = _as_list(tframe, len(targets))
+    cnfine = _as_window(cnfine)
+
+    windows = [cnfine] * len(targets)
+    if prescan:
+        times, interval_ids = _grid(cnfine, step)
+        axes, halfangle = _fov_axes(inst, times)
+        for (k, (target, shape)) in enumerate(zip(targets, tshapes)):
+            radius = _body_radius(target, shape)
+            if radius is None:
+                continue
+
+            (dirs, dists) = _directions(target, times, abcorr, obsrvr)
+            excess = (_separation(dirs, axes) - halfangle
+                      - np.arcsin(np.minimum(radius / dists, 1.)))
+            windows[k] = _candidate_window(times, interval_ids, excess)
+
+    arglist = [('gftfov', (inst, target, shape, frame, abcorr, obsrvr, step,
+                           window, room))
+               for (target, shape, frame, window)
+               in zip(targets, tshapes, tframes, windows)]
+    return _run_searches(targets, arglist, processes)
+
+def gfoclt_batch(occtyp, front, fshape, fframe, backs, bshape, bframe, abcorr,
+                 obsrvr, step, cnfine, room=2000, prescan=True, processes=0):
+    """Run gfoclt for a single front body and each back body in a list.
+
+    Inputs:
+        occtyp      type of occultation.
+        front       name of the occulting body.
+        fshape      shape of the occulting body.
+        fframe      body-fixed frame of the occulting body.
+        backs       list of names of occulted bodies.
+        bshape      shape of the occulted bodies; either a single value or a
+                    list with one value per body.
+        bframe      body-fixed frame of the occulted bodies; either a single
+                    value or a list with one value per body.
+        abcorr      aberration correction flag.
+        obsrvr      name of the observing body.
+        step        step size in seconds for the GF search.
+        cnfine      confinement window, as a SpiceCell or an array of intervals.
+        room        size of each result window.
+        prescan     True to use a vectorized pre-scan to confine each search.
+        processes   number of worker processes to use; 0 to run all searches in
+                    this process; None to use one per CPU.
+
+    Returns:        a dictionary of result windows, keyed by occulted body.
+    """
+
+    backs = list(backs)
+    bshapes = _as_list(bshape, len(backs))
+    bframes = _as_list(bframe, len(backs))
+    cnfine = _as_window(cnfine)
+
+    windows = [cnfine] * len(backs)
+    front_radius = _body_radius(front, fshape) if prescan else None
+    if front_radius is not None:
+        times, interval_ids = _grid(cnfine, step)
+        (front_dirs, front_dists) = _directions(front, times, abcorr, obsrvr)
+        front_angles = np.arcsin(np.minimum(front_radius / front_dists, 1.))
+        for (k, (back, shape)) in enumerate(zip(backs, bshapes)):
+            radius = _body_radius(back, shape)
+            if radius is None:
+                continue
+
+            (dirs, dists) = _directions(back, times, abcorr, obsrvr)
+            excess = (_separation(dirs, front_dirs) - front_angles
+                      - np.arcsin(np.minimum(radius / dists, 1.)))
+            windows[k] = _candidate_window(times, interval_ids, excess)
+
+    arglist = [('gfoclt', (occtyp, front, fshape, fframe, back, shape, frame,
+                           abcorr, obsrvr, step, window, room))
+               for (back, shape, frame, window)
+               in zip(backs, bshapes, bframes, windows)]
+    return _run_searches(backs, arglist, processes)
+
+def gfsep_batch(targ1, shape1, frame1, targs2, shape2, frame2, abcorr, obsrvr,
+                relate, refval, adjust, step, nintvls, cnfine, room=2000,
+                processes=0):
+    """Run gfsep for a single first target and each second target in a list.
+
+    The conditions that gfsep supports include local and absolute extrema,
+    which cannot be bounded by a pre-scan, so every search covers the entire
+    confinement window.
+
+    Inputs:
+        targ1       name of the first body.
+        shape1      shape of the first body.
+        frame1      body-fixed frame of the first body.
+        targs2      list of names of second bodies.
+        shape2      shape of the second bodies; either a single value or a list
+                    with one value per body.
+        frame2      body-fixed frame of the second bodies; either a single value
+                    or a list with one value per body.
+        abcorr      aberration correction flag.
+        obsrvr      name of the observing body.
+        relate      relational operator.
+        refval      reference value in radians.
+        adjust      adjustment value for absolute extrema searches.
+        step        step size in seconds for the GF search.
+        nintvls     workspace window interval count.
+        cnfine      confinement window, as a SpiceCell or an array of intervals.
+        room        size of each result window.
+        processes   number of worker processes to use; 0 to run all searches in
+                    this process; None to use one per CPU.
+
+    Returns:        a dictionary of result windows, keyed by second body.
+    """
+
+    targs2 = list(targs2)
+    shapes2 = _as_list(shape2, len(targs2))
+    frames2 = _as_list(frame2, len(targs2))
+    cnfine = _as_window(cnfine)
+
+    arglist = [('gfsep', (targ1, shape1, frame1, targ2, shape, frame, abcorr,
+                          obsrvr, relate, refval, adjust, step, nintvls,
+                          cnfine, room))
+               for (targ2, shape, frame) in zip(targs2, shapes2, frames2)]
+    return _run_searches(targs2, arglist, processes)
+
+################################################################################
+# Support functions
+################################################################################
+
+def _as_list(value, count):
+    """Repeat a single string value count times; otherwise return a list."""
+
+    if isinstance(value, str):
+        return count * [value]
+
+    value = list(value)
+    if len(value) != count:
+        raise ValueError('expected %d values, found %d' % (count, len(value)))
+
+    return value
+
+def _as_window(window):
+    """Return the confinement window as an (n,2) array of intervals."""
+
+    if isinstance(window, SpiceCell):
+        return window.as_intervals().copy()
+
+    return np.asarray(window, dtype=np.float64).reshape(-1, 2)
+
+def _grid(intervals, step):
+    """Return a time grid spanning the intervals with the given step, along with
+    the index of the interval containing each time.
+    """
+
+    times = []
+    interval_ids = []
+    for (k, (start, stop)) in enumerate(intervals):
+        count = max(int(np.ceil((stop - start) / step)), 1)
+        times.append(np.linspace(start, stop, count + 1))
+        interval_ids.append(np.full(count + 1, k))
+
+    if not times:
+        return (np.empty(0), np.empty(0, dtype=int))
+
+    return (np.concatenate(times), np.concatenate(interval_ids))
+
+def _body_radius(body, shape):
+    """The maximum radius of an extended body or zero for a point; None if it
+    is unknown, in which case the pre-scan must be skipped.
+    """
+
+    shape = shape.upper().strip()
+    if shape == 'POINT':
+        return 0.
+
+    try:
+        return float(np.max(cspyce.bodvrd.error(body, 'RADII')))
+    except Exception:
+        cspyce.reset()
+        return None
+
+def _directions(target, times, abcorr, obsrvr):
+    """The J2000 unit vectors toward a target and its distances at the grid
+    times.
+    """
+
+    (pos, _) = cspyce.spkpos_vector.error(target, times, 'J2000', abcorr,
+                                          obsrvr)
+    dists = np.sqrt(np.sum(pos**2, axis=-1))
+    return (pos / dists[:, np.newaxis], dists)
+
+def _separation(dirs1, dirs2):
+    """Angular separation between corresponding unit vectors."""
+
+    cross = np.cross(dirs1, dirs2)
+    dot = np.sum(dirs1 * dirs2, axis=-1)
+    return np.arctan2(np.sqrt(np.sum(cross**2, axis=-1)), dot)
+
+def _fov_axes(inst, times):
+    """The J2000 boresight of an instrument at the grid times, and the maximum
+    angle between the boresight and the boundary of the FOV.
+    """
+
+    instid = cspyce.bods2c.error(inst)
+    (_, frame, bsight, bounds) = cspyce.getfov.error(instid)
+    bsight = np.asarray(bsight) / np.linalg.norm(bsight)
+    bounds = np.asarray(bounds)
+    bounds = bounds / np.linalg.norm(bounds, axis=-1)[:, np.newaxis]
+    halfangle = np.max(_separation(bounds, np.broadcast_to(bsight,
+                                                           bounds.shape)))
+
+    rotmats = cspyce.pxform_vector.error(frame, 'J2000', times)
+    axes = np.einsum('nij,j->ni', rotmats, bsight)
+    return (axes, halfangle)
+
+def _candidate_window(times, interval_ids, excess):
+    """The window of times where the condition "excess <= 0" might be satisfied,
+    given samples of excess on the grid.
+
+    A sample is kept if its excess is within ANGLE_TOLERANCE plus twice the
+    change to either of its neighbors within the same interval, which allows
+    for a crossing of zero between samples. Each kept sample is then widened to
+    include both neighbors.
+    """
+
+    same = interval_ids[1:] == interval_ids[:-1]
+    change = np.where(same, np.abs(np.diff(excess)), 0.)
+    margin = np.zeros(len(times))
+    margin[:-1] = change
+    margin[1:] = np.maximum(margin[1:], change)
+
+    keep = excess <= 2. * margin + ANGLE_TOLERANCE
+    widened = keep.copy()
+    widened[:-1] |= keep[1:] & same
+    widened[1:] |= keep[:-1] & same
+
+    # Locate the runs of kept samples within each interval
+    breaks = np.ones(len(times) + 1, dtype=bool)
+    breaks[1:-1] = ~same | (widened[1:] != widened[:-1])
+    edges = np.flatnonzero(breaks)
+    starts = edges[:-1]
+    stops = edges[1:] - 1
+    runs = widened[starts]
+
+    return np.stack([times[starts[runs]], times[stops[runs]]], axis=-1)
+
+def _search(name, args):
+    """Run one GF search and return its result as an (n,2) array.
+
+    Any window among the arguments is given as an array of intervals and is
+    converted to a SpiceCell here. This function can run in a worker process.
+    """
+
+    args = [_as_cell(arg) if isinstance(arg, np.ndarray) else arg
+            for arg in args]
+    result = getattr(cspyce, name).error(*args)
+    return result.as_intervals().copy()
+
+def _as_cell(intervals):
+    cell = SpiceCell(typeno=SPICE_CELL_DOUBLE, size=max(2 * len(intervals), 2))
+    cell.append(intervals.ravel())
+    return cell
+
+def _run_searches(targets, arglist, processes):
+    """Run the GF searches, skipping any with an empty confinement window, and
+    return a dictionary of SpiceCell results keyed by target.
+    """
+
+    windows = {}
+    todo = []
+    for (target, (name, args)) in zip(targets, arglist):
+        if any(isinstance(arg, np.ndarray) and len(arg) == 0 for arg in args):
+            windows[target] = np.empty((0, 2))
+        else:
+            todo.append((target, (name, args)))
+
+    if processes == 0:
+        results = [_search(*search) for (_, search) in todo]
+    else:
+        results = parallel.run_in_processes(_search,
+                                            [search for (_, search) in todo],
+                                            processes)
+
+    for ((target, _), result) in zip(todo, results):
+        windows[target] = result
+
+    return {target: _as_cell(windows[target]) for target in targets}
+
+################################################################################
@@ -0,0 +1,265 @@
+################################################################################
+# cspyce/instrument.py
+#
+# Call counts and timing of cspyce functions.
+#
+# When instrumentation is enabled, every function returned by
+# cspyce.get_all_funcs() is replaced by a wrapper that counts its calls and
+# records the distribution of their durations. This includes the flag, error,
+# vector, array, and alias versions, because the links between versions (e.g.,
+# cspyce.bodvrd.error) lead to the wrappers as well. The functions of the SWIG
+# extension module _cspyce0 are also wrapped, so the time spent inside CSPICE
+# and the typemaps can be separated from the time spent in the Python layers
+# above them.
+#
+# When instrumentation is disabled, the original functions are put back, so
+# there is no cost at all.
+#
+# Enable instrumentation after importing cspyce.arrays or cspyce.aliases if
+# they are used; versions defined later are not wrapped. Times of cspyce calls
+# made by other cspyce functions are included in the times of the outer calls.
+#
+# Usage:
+#   enable()
+#   ...
+#   disable()
+#   report()                            # prints the most costly functions
+#   stats()['spkezr'].overhead          # seconds spent outside _cspyce0
+################################################################################
+
+import bisect
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import cspyce
+from cspyce import _cspyce0
+
+# Upper limits of the histogram bins, in seconds. The last bin is unbounded.
+BIN_LIMITS = (1.e-6, 3.e-6, 1.e-5, 3.e-5, 1.e-4, 3.e-4, 1.e-3, 3.e-3,
+              1.e-2, 3.e-2, 0.1, 0.3, 1., 3., 10.)
+
+FunctionStats = namedtuple('FunctionStats', ['calls', 'total', 'inner',
+                                             'overhead', 'histogram'])
+FunctionStats.__doc__ = """Call statistics of one function.
+
+    calls       number of calls.
+    total       total time in seconds.
+    inner       time in seconds spent inside _cspyce0 functions.
+    overhead    total - inner, the time spent in the Python layers.
+    histogram   tuple of call counts, binned by duration using BIN_LIMITS.
+    """
+
+# Internal state
+_LOCK = threading.Lock()
+_LOCAL = threading.local()          # per-thread time inside _cspyce0
+_ENTRY_STATS = {}                   # function name -> _Stats
+_INNER_STATS = {}                   # _cspyce0 function name -> _Stats
+_SAVED_CSPYCE0 = None               # replaced items of _cspyce0.__dict__;
+                                    # None when disabled
+
+def enable():
+    """Start counting and timing calls to cspyce functions."""
+
+    global _SAVED_CSPYCE0
+
+    if _SAVED_CSPYCE0 is not None:
+        return
+
+    # Wrap every cspyce function, then connect the wrappers to each other
+    wrappers = {}
+    for func in _all_functions():
+        wrappers[id(func)] = _entry_wrapper(func)
+
+    for wrapper in wrappers.values():
+        for (key, value) in wrapper.ORIGINAL.__dict__.items():
+            wrapper.__dict__[key] = wrappers.get(id(value), value)
+
+    for (name, value) in list(cspyce.__dict__.items()):
+        if id(value) in wrappers:
+            cspyce.__dict__[name] = wrappers[id(value)]
+
+    # Wrap the functions of the extension module
+    _SAVED_CSPYCE0 = {}
+    for (name, value) in list(_cspyce0.__dict__.items()):
+        if (callable(value) and not isinstance(value, type)
+                and not name.startswith(('_', 'SWIG'))
+                and not name.endswith('_swigregister')):
+            _SAVED_CSPYCE0[name] = value
+            _cspyce0.__dict__[name] = _inner_wrapper(name, value)
+
+def disable():
+    """Stop counting and timing calls; restore the original functions.
+
+    The statistics collected so far are kept.
+    """
+
+    global _SAVED_CSPYCE0
+
+    if _SAVED_CSPYCE0 is None:
+        return
+
+    _cspyce0.__dict__.update(_SAVED_CSPYCE0)
+
+    # Names may have been switched to other versions, e.g., by use_errors()
+    for (name, value) in list(cspyce.__dict__.items()):
+        original = getattr(value, 'ORIGINAL', None)
+        if original is not None:
+            cspyce.__dict__[name] = original
+
+    _SAVED_CSPYCE0 = None
+
+def is_enabled():
+    """True if instrumentation is enabled."""
+
+    return _SAVED_CSPYCE0 is not None
+
+def reset():
+    """Discard all the statistics collected so far."""
+
+    with _LOCK:
+        _ENTRY_STATS.clear()
+        _INNER_STATS.clear()
+
+def stats(inner=False):
+    """Return the statistics collected so far.
+
+    Inputs:
+        inner       True for the statistics of the _cspyce0 functions; False
+                    for those of the cspyce functions.
+
+    Returns:        a dictionary of FunctionStats objects keyed by function
+                    name.
+    """
+
+    with _LOCK:
+        source = _INNER_STATS if inner else _ENTRY_STATS
+        return {name: s.freeze() for (name, s) in source.items()}
+
+def report(count=20, sort='total', inner=False, file=None):
+    """Print a table of the functions with the highest cost.
+
+    Inputs:
+        count       number of functions to list; None for all.
+        sort        the FunctionStats field to sort by, e.g., "total", "calls",
+                    or "overhead".
+        inner       True to list the _cspyce0 functions instead.
+        file        the file to write to; default is sys.stdout.
+    """
+
+    file = file or sys.stdout
+    items = sorted(stats(inner).items(),
+                   key=lambda item: getattr(item[1], sort), reverse=True)
+    items = items[:count]
+
+    file.write('%-24s %10s %12s %12s %12s %12s\n'
+               % ('function', 'calls', 'total (s)', 'inner (s)', 'python (s)',
+                  'mean (us)'))
+    for (name, s) in items:
+        file.write('%-24s %10d %12.6f %12.6f %12.6f %12.3f\n'
+                   % (name, s.calls, s.total, s.inner, s.overhead,
+                      1.e6 * s.total / max(s.calls, 1)))
+
+class instrumented:
+    """Context manager that enables instrumentation within a block."""
+
+    def __enter__(self):
+        self.was_enabled = is_enabled()
+        enable()
+        return self
+
+    def __exit__(self, *args):
+        if not self.was_enabled:
+            disable()
+
+################################################################################
+# Support functions
+################################################################################
+
+class _Stats:
+    """Accumulated statistics of one function."""
+
+    __slots__ = ('calls', 'total', 'inner', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.
+        self.inner = 0.
+        self.histogram = [0] * (len(BIN_LIMITS) + 1)
+
+    def add(self, elapsed, inner):
+        self.calls += 1
+        self.total += elapsed
+        self.inner += inner
+        self.histogram[bisect.bisect_left(BIN_LIMITS, elapsed)] += 1
+
+    def freeze(self):
+        return FunctionStats(self.calls, self.total, self.inner,
+                             self.total - self.inner, tuple(self.histogram))
+
+def _all_functions():
+    """Every cspyce function and every version reachable from one."""
+
+    found = {}
+    pending = list(cspyce.get_all_funcs(cspyce.__dict__).values())
+    while pending:
+        func = pending.pop()
+        if id(func) in found:
+            continue
+
+        found[id(func)] = func
+        pending += [value for value in vars(func).values()
+                    if callable(value) and hasattr(value, 'SIGNATURE')]
+
+    return list(found.values())
+
+def _entry_wrapper(func):
+    """A wrapper that records the calls of a cspyce function."""
+
+    name = func.__name__
+    perf_counter = time.perf_counter
+
+    def wrapper(*args, **keywords):
+        inner0 = getattr(_LOCAL, 'inner', 0.)
+        start = perf_counter()
+        try:
+            return func(*args, **keywords)
+        finally:
+            elapsed = perf_counter() - start
+            inner = getattr(_LOCAL, 'inner', 0.) - inner0
+            with _LOCK:
+                stats = _ENTRY_STATS.get(name)
+                if stats is None:
+                    stats = _ENTRY_STATS[name] = _Stats()
+                stats.add(elapsed, inner)
+
+    wrapper.__name__ = name
+    wrapper.__qualname__ = name
+    wrapper.__doc__ = func.__doc__
+    wrapper.ORIGINAL = func
+    return wrapper
+
+def _inner_wrapper(name, func):
+    """A wrapper that records the calls of a _cspyce0 function."""
+
+    perf_counter = time.perf_counter
+
+    def wrapper(*args, **keywords):
+        start = perf_counter()
+        try:
+            return func(*args, **keywords)
+        finally:
+            elapsed = perf_counter() - start
+            _LOCAL.inner = getattr(_LOCAL, 'inner', 0.) + elapsed
+            with _LOCK:
+                stats = _INNER_STATS.get(name)
+                if stats is None:
+                    stats = _INNER_STATS[name] = _Stats()
+                stats.add(elapsed, elapsed)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+################################################################################
@@ -0,0 +1,284 @@
+################################################################################
+# cspyce/kernel_cache.py
+#
+# A binary cache of the contents of text kernels, for faster furnsh.
+#
+# Every furnsh of a text kernel makes CSPICE read and tokenize the file again,
+# in every process. When a KernelCache is enabled with use_kernel_cache(), the
+# first furnsh of each text kernel proceeds as usual, and the pool variables it
+# assigns are then saved in a NumPy .npz file named by the SHA-1 hash of the
+# kernel's contents; the file is read without unpickling anything. Later calls
+# to furnsh for a file with the same contents write the saved variables straight
+# into the kernel pool.
+#
+# To preserve the bookkeeping of CSPICE, a cached load also furnishes a small
+# "stub" text kernel from the cache directory, which assigns nothing. The stub,
+# rather than the original file, appears in the results of kdata and ktotal;
+# KernelCache.source() returns the original path. Calls to unload with the
+# original path unload the stub, as well as the original if it is loaded too.
+# Because CSPICE rebuilds the kernel pool from the remaining text kernels
+# whenever a text kernel is unloaded, the cache then repeats that rebuild
+# itself, in load order, restoring the saved variables of each remaining stub.
+#
+# Only text kernels with a "KPL/" identification word are cached. Metakernels
+# and binary kernels are loaded as usual. A kernel that uses "+=" is never
+# cached, because its result depends on the prior contents of the pool.
+#
+# Usage:
+#   use_kernel_cache('~/.cspyce/kernel_cache')
+#   cspyce.furnsh('pck00010.tpc')       # parsed on first use, cached after
+#   ...
+#   use_kernel_cache(None)              # back to ordinary furnsh
+################################################################################
+
+import hashlib
+import os
+import re
+
+import numpy as np
+
+import cspyce.cspyce1 as cspyce1
+from cspyce import cspyce0
+from cspyce.pool import _read_variables, _write_variables
+
+# Strings in a text kernel, which might contain "="
+_STRING = re.compile(r"'[^']*'")
+
+# The name and operator of each assignment in a text kernel
+_ASSIGNMENT = re.compile(r"([^\s=(),']+)\s*(\+?=)")
+
+def use_kernel_cache(directory):
+    """Enable or disable the use of a text kernel cache by furnsh and unload.
+
+    Kernels already loaded from the cache remain loaded after the cache is
+    disabled, but their variables will be lost if any text kernel is unloaded
+    afterward. It is best to call kclear() before disabling the cache.
+
+    Inputs:
+        directory   the directory of the cache files, which is created if
+                    necessary; None to disable the cache.
+
+    Returns:        the new KernelCache object, or None.
+    """
+
+    if directory is None:
+        cspyce1.KERNEL_CACHE = None
+    else:
+        cspyce1.KERNEL_CACHE = KernelCache(directory)
+
+    return cspyce1.KERNEL_CACHE
+
+class KernelCache:
+    """A cache of the variables assigned by text kernels."""
+
+    VERSION = 2
+
+    def __init__(self, directory):
+        """Constructor.
+
+        Inputs:
+            directory   the directory of the cache files, which is created if
+                        necessary.
+        """
+
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.sources = {}       # stub path -> original path
+        self.variables = {}     # stub path -> dictionary of variables
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def furnsh(self, file):
+        """Load a kernel, using the cache if possible."""
+
+        path = os.fspath(file)
+        (arch, ftype) = cspyce0.getfat(path)
+        if arch != 'KPL' or ftype == 'MK':
+            self._furnsh(path)
+            return
+
+        with open(path, 'rb') as f:
+            contents = f.read()
+
+        digest = hashlib.sha1(contents).hexdigest()
+        cache_path = os.path.join(self.directory, digest + '.npz')
+        variables = self._read_cache(cache_path)
+
+        # Not cacheable
+        if variables is False:
+            self._furnsh(path)
+            return
+
+        # Not cached yet
+        if variables is None:
+            self.misses += 1
+            self._furnsh(path)
+
+            names = _assigned_names(contents)
+            if names is None or not all(cspyce0.dtpool(name)[0]
+                                        for name in names):
+                variables = False
+            else:
+                variables = _read_variables(names)
+
+            self._write_cache(cache_path, variables)
+            return
+
+        # Load from the cache
+        self.hits += 1
+        stub = os.path.join(self.directory,
+                            digest + '_' + os.path.basename(path))
+        if not os.path.exists(stub):
+            with open(stub, 'w') as f:
+                f.write('KPL/%s\n\nStub of a cached text kernel; source is\n'
+                        '%s\n\n\\begindata\n\\begintext\n' % (ftype, path))
+
+        # Loading a text kernel that is already loaded unloads it first; that
+        # might be the stub or the original, loaded before it was cached
+        loaded = [file for file in (stub, path) if self._is_text_loaded(file)]
+        for file in loaded:
+            cspyce0.unload(file)
+        if loaded:
+            self._rebuild_pool()
+
+        _write_variables(variables)
+        cspyce0.furnsh(stub)
+        self.sources[stub] = path
+        self.variables[stub] = variables
+
+    def unload(self, file):
+        """Unload a kernel, or the stub that was loaded in its place."""
+
+        path = os.fspath(file)
+        targets = [stub for (stub, source) in self.sources.items()
+                   if source == path and self._is_loaded(stub)]
+        if not targets or self._is_loaded(path):
+            targets.append(path)
+
+        rebuild = any(self._is_text_loaded(target) for target in targets)
+        for target in targets:
+            cspyce0.unload(target)
+
+        if rebuild:
+            self._rebuild_pool()
+
+    def source(self, file):
+        """The path of the original kernel, given a path from kdata."""
+
+        return self.sources.get(file, file)
+
+    ############################################################################
+    # Support methods
+    ############################################################################
+
+    def _furnsh(self, path):
+        """Load a kernel without the cache."""
+
+        # Loading a text kernel that is already loaded unloads it first
+        rebuild = self._is_text_loaded(path)
+        cspyce0.furnsh(path)
+        if rebuild:
+            self._rebuild_pool()
+
+    def _rebuild_pool(self):
+        """Rebuild the kernel pool from the loaded text kernels, if any of them
+        is a stub.
+        """
+
+        files = [cspyce0.kdata(k, 'TEXT')[0]
+                 for k in range(cspyce0.ktotal('TEXT'))]
+        if not any(file in self.variables for file in files):
+            return
+
+        cspyce0.clpool()
+        for file in files:
+            if file in self.variables:
+                _write_variables(self.variables[file])
+            else:
+                cspyce0.ldpool(file)
+
+    @staticmethod
+    def _is_loaded(file):
+        return bool(cspyce0.kinfo(file)[-1])
+
+    @staticmethod
+    def _is_text_loaded(file):
+        (filtyp, _, _, found) = cspyce0.kinfo(file)
+        return bool(found) and filtyp in ('TEXT', 'META')
+
+    def _read_cache(self, cache_path):
+        """The saved variables; False if the kernel cannot be cached; None if
+        there is no usable cache file.
+        """
+
+        try:
+            with np.load(cache_path, allow_pickle=False) as saved:
+                if int(saved['version']) != self.VERSION:
+                    return None
+                if not bool(saved['cacheable']):
+                    return False
+
+                variables = {}
+                for (k, name) in enumerate(saved['names']):
+                    values = saved['value%d' % k]
+                    if values.dtype.kind == 'U':
+                        values = [str(value) for value in values]
+                    variables[str(name)] = values
+
+                return variables
+        except (OSError, KeyError, ValueError, EOFError):
+            return None
+
+    def _write_cache(self, cache_path, variables):
+        """Save the variables, replacing the cache file atomically. Failure to
+        write is not an error.
+        """
+
+        arrays = {'version': np.array(self.VERSION),
+                  'cacheable': np.array(variables is not False)}
+        if variables is not False:
+            arrays['names'] = np.array(list(variables), dtype=np.str_)
+            for (k, values) in enumerate(variables.values()):
+                arrays['value%d' % k] = np.array(values)
+
+        try:
+            temp_path = cache_path + '.%d.tmp' % os.getpid()
+            with open(temp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+
+################################################################################
+# Support functions
+################################################################################
+
+def _assigned_names(contents):
+    """The names of the variables assigned in a text kernel, in order; None if
+    the kernel uses "+=" or assigns nothing.
+    """
+
+    names = {}
+    in_data = False
+    for line in contents.decode('latin-1').splitlines():
+        stripped = line.strip()
+        if stripped == '\\begindata':
+            in_data = True
+            continue
+        if stripped == '\\begintext':
+            in_data = False
+            continue
+        if not in_data:
+            continue
+
+        for (name, operator) in _ASSIGNMENT.findall(_STRING.sub('', line)):
+            if operator == '+=':
+                return None
+            names[name] = None
+
+    return list(names) or None
+
+################################################################################
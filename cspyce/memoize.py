@@ -0,0 +1,258 @@
+################################################################################
+# cspyce/memoize.py
+#
+# Optional caching of results from kernel pool lookups.
+#
+# Functions such as bodvrd, namfrm, getfov, and gdpool are often called again
+# and again with the same arguments, and each call repeats a search of the
+# kernel pool. The memoize() function replaces the selected cspyce functions
+# with versions that keep their most recent results in a least-recently-used
+# cache. Every version of each function is replaced, including the versions
+# reached through links such as cspyce.bodvrd.error and cspyce.bodn2c.flag, and
+# each version has a cache of its own.
+#
+# Every cspyce function that loads or unloads kernels or writes to the kernel
+# pool increments the kernel pool generation number (see pool_generation()). A
+# cache is emptied whenever it sees that the generation has changed, so cached
+# results are never stale. Calls to timdef() that set a time default also
+# increment it, because they change the results of str2et, and so do calls to
+# define_body_aliases() and define_frame_aliases(). Changes made by calling
+# cspyce0 directly are not seen.
+#
+# Calls with unhashable arguments, such as NumPy arrays, are passed through to
+# the original function. Exceptions are never cached. Arrays in the results are
+# copied, so a caller can modify them safely.
+#
+# Because the links between versions lead to the cached versions, a later call
+# to use_errors(), use_flags(), use_vectors(), or use_scalars() selects another
+# cached version.
+#
+# Usage:
+#   memoize()                           # all functions in MEMOIZABLE
+#   memoize('bodvrd', cspyce.getfov, maxsize=1000)
+#   cache_info()['bodvrd']              # CacheInfo(hits, misses, size, maxsize)
+#   unmemoize()
+################################################################################
+
+import threading
+from collections import namedtuple, OrderedDict
+
+import numpy as np
+
+import cspyce
+import cspyce.cspyce1 as cspyce1
+
+# The functions whose results depend only on their arguments and the contents of
+# the kernel pool
+MEMOIZABLE = ('bodvrd', 'bodvcd', 'str2et', 'namfrm', 'frmnam', 'cidfrm',
+              'frinfo', 'getfov', 'gdpool', 'gipool', 'gcpool', 'tkfram',
+              'bodn2c', 'bodc2n', 'bods2c')
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'size', 'maxsize'])
+
+def memoize(*funcs, maxsize=256):
+    """Replace the listed cspyce functions or names of functions with versions
+    that cache their results. If the list is empty, apply this operation to all
+    the functions in MEMOIZABLE.
+
+    Inputs:
+        funcs       cspyce functions or names of functions. Each must be in
+                    MEMOIZABLE.
+        maxsize     the maximum number of results to cache for each function.
+    """
+
+    if maxsize < 1:
+        raise ValueError('maxsize must be positive')
+
+    for name in _get_names(funcs):
+        _unmemoize(name)
+
+        # Wrap every version, then connect the wrappers to each other
+        wrappers = {}
+        for func in _versions(cspyce.__dict__[name]):
+            wrappers[id(func)] = _memoized_version(func, maxsize)
+
+        for wrapper in wrappers.values():
+            for (key, value) in wrapper.MEMOIZED.__dict__.items():
+                if id(value) in wrappers:
+                    wrapper.__dict__[key] = wrappers[id(value)]
+
+        for (key, value) in list(cspyce.__dict__.items()):
+            if id(value) in wrappers:
+                cspyce.__dict__[key] = wrappers[id(value)]
+
+def unmemoize(*funcs):
+    """Restore the original versions of the listed cspyce functions or names of
+    functions. If the list is empty, apply this operation to all memoized
+    functions.
+    """
+
+    for name in _get_names(funcs):
+        _unmemoize(name)
+
+def cache_info():
+    """Return the cache statistics of the memoized functions.
+
+    Returns:        a dictionary keyed by function name. Each value is a
+                    CacheInfo named tuple (hits, misses, size, maxsize).
+    """
+
+    info = {}
+    for name in MEMOIZABLE:
+        func = cspyce.__dict__[name]
+        if hasattr(func, 'CACHE'):
+            info[name] = func.CACHE.info()
+
+    return info
+
+def cache_clear():
+    """Empty the caches of all memoized functions and reset their statistics."""
+
+    for name in MEMOIZABLE:
+        for func in _versions(cspyce.__dict__[name]):
+            if hasattr(func, 'CACHE'):
+                func.CACHE.clear()
+
+################################################################################
+# Support functions
+################################################################################
+
+class _Cache:
+    """A thread-safe LRU cache that empties itself when the kernel pool
+    generation changes.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.values = OrderedDict()
+            self.generation = cspyce1.POOL_GENERATION
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, len(self.values),
+                             self.maxsize)
+
+    def get(self, key):
+        """Return (True, value) if the key is cached; (False, generation)
+        otherwise.
+        """
+
+        with self.lock:
+            generation = cspyce1.POOL_GENERATION
+            if generation != self.generation:
+                self.values.clear()
+                self.generation = generation
+
+            if key in self.values:
+                self.values.move_to_end(key)
+                self.hits += 1
+                return (True, self.values[key])
+
+            self.misses += 1
+            return (False, generation)
+
+    def put(self, key, value, generation):
+        with self.lock:
+            # Skip results from a call that overlapped a change to the pool
+            if generation != cspyce1.POOL_GENERATION:
+                return
+
+            self.values[key] = value
+            self.values.move_to_end(key)
+            while len(self.values) > self.maxsize:
+                self.values.popitem(last=False)
+
+def _memoized_version(func, maxsize):
+    """A version of the function that caches its results."""
+
+    cache = _Cache(maxsize)
+
+    def wrapper(*args, **keywords):
+        key = (args, tuple(sorted(keywords.items())))
+        try:
+            (found, value) = cache.get(key)
+        except TypeError:                   # unhashable arguments
+            return func(*args, **keywords)
+
+        if found:
+            return _copy(value)
+
+        result = func(*args, **keywords)
+        cache.put(key, _copy(result), value)
+        return result
+
+    # Keep the attributes, so the links to other versions still work
+    wrapper.__dict__.update(func.__dict__)
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    wrapper.MEMOIZED = func
+    wrapper.CACHE = cache
+    return wrapper
+
+def _versions(func):
+    """Every version of a cspyce function reachable from it via the links
+    between versions.
+    """
+
+    found = {}
+    pending = [func]
+    while pending:
+        func = pending.pop()
+        if id(func) in found:
+            continue
+
+        found[id(func)] = func
+        pending += [value for value in vars(func).values()
+                    if callable(value) and hasattr(value, 'SIGNATURE')]
+
+    return list(found.values())
+
+def _unmemoize(name):
+    """Restore the original versions of the named function."""
+
+    memoized = {id(func): func.MEMOIZED
+                for func in _versions(cspyce.__dict__[name])
+                if hasattr(func, 'MEMOIZED')}
+
+    for (key, value) in list(cspyce.__dict__.items()):
+        if id(value) in memoized:
+            cspyce.__dict__[key] = memoized[id(value)]
+
+def _copy(value):
+    """A copy of a value in which every array or list is new."""
+
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value
+
+def _get_names(funcs):
+    """Convert a list of cspyce functions or names to a list of names in
+    MEMOIZABLE.
+    """
+
+    if not funcs:
+        return list(MEMOIZABLE)
+
+    names = []
+    for func in funcs:
+        name = func if isinstance(func, str) else func.__name__
+        if name.endswith('_error'):
+            name = name[:-len('_error')]
+        if name not in MEMOIZABLE:
+            raise ValueError('function cannot be memoized: ' + repr(name))
+        names.append(name)
+
+    return names
+
+################################################################################
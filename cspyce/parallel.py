@@ -0,0 +1,442 @@
+################################################################################
+# cspyce/parallel.py
+#
+# Support for running cspyce calls in worker processes.
+#
+# CSPICE keeps all of its state in global variables and is not thread-safe, so
+# the only route to multi-core throughput is to run independent calls in
+# separate processes. Each worker process starts by loading the same kernels
+# that are loaded in the parent process.
+#
+# Worker processes are started with the "forkserver" method, or "spawn" where
+# that is unavailable, never by a plain fork() of this process. In a build with
+# OpenMP (see README-developers.md), the vectorized loops run in threads, and
+# the OpenMP runtime does not survive a fork() once its threads have started.
+# As a result, workers do not inherit any other state of this process, such as
+# the effect of use_errors(); see the Executor class.
+#
+# The Executor class goes further. Calls that change the global state of cspyce
+# or CSPICE, such as furnsh, pdpool, boddef, define_body_aliases, erract, and
+# use_errors, are made through the Executor, which applies each one here and
+# records it. Every worker process replays the recorded calls when it starts,
+# so it reproduces the state of the parent. Vectorized functions can then be
+# evaluated across the workers, with the inputs split along their leading axes
+# and the results stitched back together.
+#
+# Usage:
+#   with Executor() as executor:
+#       executor.furnsh('cassini.tm')
+#       executor.define_body_aliases('SATURN BARYCENTER', 6)
+#       (spoint, trgepc, srfvec, found) = executor.map(cspyce.sincpt_vector,
+#                                   'DSK/UNPRIORITIZED', 'ENCELADUS', et,
+#                                   'IAU_ENCELADUS', 'CN+S', 'CASSINI',
+#                                   'CASSINI_ISS_NAC', dvecs)
+################################################################################
+
+import importlib
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import cspyce
+import cspyce.cspyce1 as cspyce1
+from cspyce.pool import pool_snapshot, pool_restore
+
+# Functions whose calls are recorded by an Executor and replayed in its workers
+STATE_FUNCTIONS = ('furnsh', 'unload', 'kclear', 'pdpool', 'pipool', 'pcpool',
+                   'boddef', 'define_body_aliases', 'define_frame_aliases',
+                   'erract', 'use_errors', 'use_flags', 'use_vectors',
+                   'use_scalars', 'use_arrays', 'use_aliases', 'use_noaliases')
+
+# Functions that are only available after importing cspyce.aliases or
+# cspyce.arrays
+_ALIAS_FUNCTIONS = ('define_body_aliases', 'define_frame_aliases',
+                    'use_aliases', 'use_noaliases')
+_ARRAY_FUNCTIONS = ('use_arrays',)
+
+def loaded_kernels():
+    """Return the list of kernel files loaded by furnsh, in the order in which
+    they were loaded.
+
+    Kernels that were loaded indirectly via a meta-kernel are not listed
+    separately; the meta-kernel itself is listed instead. A text kernel loaded
+    from a KernelCache is listed by its original path, not by its stub, because
+    worker processes do not share the cache.
+    """
+
+    cache = cspyce1.KERNEL_CACHE
+    kernels = []
+    for k in range(cspyce.ktotal('ALL')):
+        (file, _, srcfil, _) = cspyce.kdata.error(k, 'ALL')
+        if not srcfil:
+            kernels.append(cache.source(file) if cache else file)
+
+    return kernels
+
+def _initialize_worker(kernels):
+    """Worker process initializer; load the given list of kernels."""
+
+    cspyce.kclear()
+    for kernel in kernels:
+        cspyce.furnsh(kernel)
+
+def run_in_processes(func, arglist, processes=None):
+    """Evaluate func(*args) for each tuple of arguments in arglist, using a
+    pool of worker processes that have the same kernels loaded as this one.
+
+    The results are returned as a list, in the same order as arglist. The
+    function and its arguments must be picklable, so func must be defined at
+    the top level of a module. Any exception raised by a call is re-raised
+    here. The workers start with the default settings of cspyce and CSPICE, so
+    func should call explicit versions of cspyce functions, such as
+    cspyce.bodvrd.error, rather than rely on use_errors() or use_flags().
+
+    Inputs:
+        func        the function to call.
+        arglist     a list of argument tuples, one per call.
+        processes   the maximum number of worker processes; if None, the
+                    number of CPUs is used.
+    """
+
+    arglist = list(arglist)
+    if not arglist:
+        return []
+
+    kernels = loaded_kernels()
+    with ProcessPoolExecutor(max_workers=processes,
+                             mp_context=_mp_context(),
+                             initializer=_initialize_worker,
+                             initargs=(kernels,)) as executor:
+        futures = [executor.submit(func, *args) for args in arglist]
+        return [future.result() for future in futures]
+
+class Executor:
+    """A pool of worker processes that reproduce the cspyce state of this
+    process.
+
+    When the Executor is created, it records the current error action, the
+    kernels currently loaded, the contents of the kernel pool, including any
+    values written by pdpool, pipool, or pcpool, and the version of each cspyce
+    function selected by use_errors(), use_flags(), use_aliases(), and the
+    like. After that, every call that changes the state must be made through
+    the Executor, as in executor.furnsh(path) or executor.use_flags('bodn2c'),
+    for the workers to see it; the functions listed in STATE_FUNCTIONS are
+    available as methods. Each such call is applied in this process immediately
+    and recorded. Any workers already running are retired, and new workers
+    replay the full record on startup.
+
+    State that is not held in the kernel pool or in the cspyce namespace is not
+    captured when the Executor is created. In particular, bodies defined by
+    boddef() and aliases defined by define_body_aliases() or
+    define_frame_aliases() beforehand are unknown to the workers; make those
+    calls through the Executor instead.
+    """
+
+    def __init__(self, processes=None, chunk=None):
+        """Constructor.
+
+        Inputs:
+            processes   the maximum number of worker processes; if None, the
+                        number of CPUs is used.
+            chunk       the default number of leading-axis elements in each
+                        call made by map(); if None, the inputs are split
+                        evenly among the workers.
+        """
+
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk = chunk
+        self.calls = [('erract', ('SET', cspyce.erract('GET')), {})]
+        self.calls += [('furnsh', (kernel,), {}) for kernel in loaded_kernels()]
+        self.calls += [('pool_restore', (pool_snapshot(),), {}),
+                       ('_select_versions', (_selected_versions(),), {})]
+        self._pool = None
+
+    def __getattr__(self, name):
+        """A recording version of any function in STATE_FUNCTIONS."""
+
+        if name not in STATE_FUNCTIONS:
+            raise AttributeError("'Executor' object has no attribute '%s'"
+                                 % name)
+
+        def recorder(*args, **keywords):
+            return self.record(name, *args, **keywords)
+
+        recorder.__name__ = name
+        return recorder
+
+    def record(self, name, *args, **keywords):
+        """Call a state-changing cspyce function here and record the call for
+        replay in the workers.
+
+        Inputs:
+            name        name of the function, which must be in STATE_FUNCTIONS.
+            args, keywords
+                        arguments to the function. cspyce functions given as
+                        arguments, as to use_errors(), are recorded by name.
+
+        Returns:        the value returned by the function.
+        """
+
+        if name not in STATE_FUNCTIONS:
+            raise ValueError('not a recorded state function: ' + name)
+
+        args = tuple(_picklable(arg) for arg in args)
+        keywords = {key: _picklable(arg) for (key, arg) in keywords.items()}
+        result = _state_function(name)(*args, **keywords)
+
+        # A call to erract() or erract('GET') only queries the setting
+        query = (name == 'erract' and not args[1:]
+                 and (not args or args[0].upper().strip() == 'GET'))
+        if not query:
+            self.calls.append((name, args, keywords))
+            self._retire()
+
+        return result
+
+    def submit(self, func, *args, **keywords):
+        """Schedule func(*args, **keywords) in a worker and return a Future.
+
+        The function and its arguments must be picklable, so func must be a
+        cspyce function or defined at the top level of a module.
+        """
+
+        return self._get_pool().submit(func, *args, **keywords)
+
+    def map(self, func, *args, chunk=None, **keywords):
+        """Evaluate a vectorized cspyce function across the workers.
+
+        The floating-point inputs are broadcast together following the rules of
+        the "_array" functions, and the result is split along its leading axes
+        into chunks, one call of the "_vector" function per chunk. The results
+        are stitched back together and returned with the broadcast shape, as
+        the "_array" version of the function would return them.
+
+        Inputs:
+            func        a cspyce function or its name. Its "_vector" version is
+                        called in the workers.
+            args, keywords
+                        the arguments to the function.
+            chunk       the number of elements in each call; default is the
+                        chunk given to the constructor.
+
+        Returns:        the result of the function.
+        """
+
+        from cspyce.array_support import array_version
+
+        if isinstance(func, str):
+            func = cspyce.validate_func(func, cspyce.__dict__)
+        vfunc = func.vector
+        if '_vector' not in vfunc.__name__:
+            raise ValueError('%s has no vectorized version' % func.__name__)
+        array_version(vfunc)                # defines INPUT_ITEMS, RETURN_ITEMS
+
+        (args, keywords, shape) = _broadcast_inputs(vfunc, list(args),
+                                                    dict(keywords))
+        count = math.prod(shape)
+        if count <= 1:
+            result = vfunc(*args, **keywords)
+            return _stitch_results(vfunc, [result], shape)
+
+        chunk = chunk or self.chunk or -(-count // self.processes)
+        name = vfunc.__name__
+        futures = []
+        for start in range(0, count, chunk):
+            stop = min(start + chunk, count)
+            (cargs, ckeys) = _slice_inputs(vfunc, args, keywords, start, stop)
+            futures.append(self.submit(_call_by_name, name, cargs, ckeys))
+
+        results = [future.result() for future in futures]
+        return _stitch_results(vfunc, results, shape)
+
+    def close(self):
+        """Shut down the worker processes."""
+
+        self._retire()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _get_pool(self):
+        """The pool of workers, started if necessary."""
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                             mp_context=_mp_context(),
+                                             initializer=_replay_calls,
+                                             initargs=(list(self.calls),))
+        return self._pool
+
+    def _retire(self):
+        """Shut down the current workers, whose state is out of date."""
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+################################################################################
+# Support functions
+################################################################################
+
+def _mp_context():
+    """The multiprocessing context for worker processes; see the notes above.
+    """
+
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+def _state_function(name):
+    """The cspyce function for a name in STATE_FUNCTIONS, or one of the
+    functions below that reproduce the state captured by an Executor.
+    """
+
+    if name in ('pool_restore', '_select_versions'):
+        return globals()[name]
+
+    if name in _ALIAS_FUNCTIONS:
+        import cspyce.aliases
+    elif name in _ARRAY_FUNCTIONS:
+        import cspyce.arrays
+
+    return getattr(cspyce, name)
+
+def _selected_versions():
+    """The function name of the version selected for each name in the cspyce
+    namespace, where that differs from the name itself, and the optional
+    cspyce modules that define versions.
+    """
+
+    versions = {}
+    for (name, value) in cspyce.__dict__.items():
+        if (callable(value) and hasattr(value, 'SIGNATURE')
+                and value.__name__ != name):
+            versions[name] = value.__name__
+
+    modules = [module for module in ('cspyce.aliases', 'cspyce.arrays')
+               if module in sys.modules]
+    return (versions, modules)
+
+def _select_versions(selected):
+    """Select the function versions given by _selected_versions()."""
+
+    (versions, modules) = selected
+    for module in modules:
+        importlib.import_module(module)
+
+    funcs = cspyce.get_all_funcs(cspyce.__dict__)
+    for (name, version) in versions.items():
+        if version in funcs:
+            cspyce.__dict__[name] = funcs[version]
+
+def _picklable(arg):
+    """A cspyce function argument is replaced by its name."""
+
+    if callable(arg) and hasattr(arg, 'SIGNATURE'):
+        return arg.__name__
+    return arg
+
+def _replay_calls(calls):
+    """Worker process initializer; reproduce the state of the parent by
+    replaying its recorded calls.
+    """
+
+    cspyce.kclear()
+    for (name, args, keywords) in calls:
+        _state_function(name)(*args, **keywords)
+
+def _call_by_name(name, args, keywords):
+    """Call the cspyce function of the given name."""
+
+    func = getattr(cspyce, name, None)
+    if func is None:
+        func = cspyce.get_all_funcs(cspyce.__dict__)[name]
+    return func(*args, **keywords)
+
+def _broadcast_inputs(vfunc, args, keywords):
+    """Broadcast the floating-point inputs of a vector function together and
+    flatten their leading axes.
+
+    Returns:        (args, keywords, shape), where shape is the broadcast shape
+                    of the leading axes.
+    """
+
+    items = []
+    for indx in list(range(len(args))) + list(keywords):
+        item = vfunc.INPUT_ITEMS.get(indx)
+        if item is None:
+            continue
+
+        arg = np.asarray(args[indx] if isinstance(indx, int)
+                         else keywords[indx], dtype=np.float64)
+        rank = len(item)
+        if rank > arg.ndim:
+            raise ValueError('invalid array shape %s for input "%s" of %s'
+                             % (arg.shape, vfunc.ARGNAMES[indx]
+                                if isinstance(indx, int) else indx,
+                                vfunc.__name__))
+        items.append((indx, arg, rank))
+
+    shape = np.broadcast_shapes(*[arg.shape[:arg.ndim - rank]
+                                  for (_, arg, rank) in items])
+
+    for (indx, arg, rank) in items:
+        lead = arg.shape[:arg.ndim - rank]
+        if all(d == 1 for d in lead):
+            arg = arg.reshape(arg.shape[arg.ndim - rank:])
+        else:
+            arg = np.broadcast_to(arg, shape + arg.shape[arg.ndim - rank:])
+            arg = arg.reshape((-1,) + arg.shape[len(shape):])
+
+        if isinstance(indx, int):
+            args[indx] = arg
+        else:
+            keywords[indx] = arg
+
+    return (args, keywords, shape)
+
+def _slice_inputs(vfunc, args, keywords, start, stop):
+    """The inputs to a vector function for elements start to stop - 1 of the
+    flattened leading axes.
+    """
+
+    def sliced(indx, arg):
+        item = vfunc.INPUT_ITEMS.get(indx)
+        if item is None or np.ndim(arg) == len(item):
+            return arg
+        return np.ascontiguousarray(arg[start:stop])
+
+    args = [sliced(k, arg) for (k, arg) in enumerate(args)]
+    keywords = {key: sliced(key, arg) for (key, arg) in keywords.items()}
+    return (args, keywords)
+
+def _stitch_results(vfunc, results, shape):
+    """Concatenate the results of the chunked calls and restore the broadcast
+    shape of their leading axes.
+    """
+
+    multiple = isinstance(results[0], (list, tuple))
+    if not multiple:
+        results = [[result] for result in results]
+
+    stitched = []
+    for (k, item) in enumerate(vfunc.RETURN_ITEMS):
+        rank = len(item)
+        parts = [np.asarray(result[k]) for result in results]
+        parts = [part.reshape((-1,) + part.shape[part.ndim - rank:])
+                 for part in parts]
+        value = np.concatenate(parts)
+        stitched.append(value.reshape(shape + value.shape[1:]))
+
+    if multiple:
+        return stitched
+    return stitched[0]
+
+################################################################################
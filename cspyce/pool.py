@@ -0,0 +1,319 @@
+################################################################################
+# cspyce/pool.py
+#
+# Notification of changes to the kernel pool.
+#
+# Every cspyce function that loads or unloads kernels or writes to the kernel
+# pool increments the kernel pool generation number. A cache built on cspyce can
+# record the generation when it is filled and compare it later; the comparison
+# is a plain integer test, with no call to CSPICE.
+#
+# A PoolWatch narrows this down to a set of pool variables. It registers a
+# CSPICE watcher with swpool, but only calls cvpool to check the watcher after
+# the generation has changed. CSPICE offers no way here to delete a watcher, so
+# the agent of a released watch is kept and reused by the next watch on the
+# same set of variables; the number of agents does not grow as subscriptions
+# come and go.
+#
+# The subscribe() function registers a callback to be called after every change
+# to the pool or, optionally, after changes to selected variables.
+#
+# Changes made by calling cspyce0 directly are not seen.
+#
+# The pool_snapshot() function returns the entire contents of the kernel pool
+# as a dictionary, reading all the numeric values in a single call to C;
+# pool_restore() loads such a dictionary back into the pool, e.g., to warm up a
+# new process without parsing the text kernels again. pool_diff() compares two
+# snapshots.
+#
+# Usage:
+#   gen = generation()
+#   ...
+#   if generation() != gen:             # something changed
+#       ...
+#
+#   watch = PoolWatch(['BODY699_RADII', 'BODY699_POLE_RA'])
+#   if watch.changed():
+#       ...
+#
+#   subscription = subscribe(lambda gen: cache.clear(), names='BODY699_RADII')
+#   subscription.cancel()
+#
+#   snapshot = pool_snapshot()          # {name: array or list of strings}
+#   pool_restore(snapshot, clear=True)
+################################################################################
+
+import itertools
+import threading
+import warnings
+
+import numpy as np
+
+import cspyce
+import cspyce.cspyce1 as cspyce1
+from cspyce import cspyce0
+
+# Counter used to create unique agent names
+_AGENT_COUNTER = itertools.count(1)
+
+# Agents of released watches, keyed by the tuple of sorted variable names
+_FREE_AGENTS = {}
+_FREE_AGENTS_LOCK = threading.Lock()
+
+# Maximum number of names or string values returned by one call to gnpool or
+# gcpool; KERVALS in cspyce0.i
+_KERVALS = 40
+
+def generation():
+    """Return the current kernel pool generation number."""
+
+    return cspyce1.POOL_GENERATION
+
+class PoolWatch:
+    """A watch on one or more kernel pool variables."""
+
+    def __init__(self, names, agent=None):
+        """Constructor.
+
+        Inputs:
+            names       the name of a kernel pool variable or a list of names.
+            agent       optional name of the CSPICE agent. Default is a name
+                        beginning with "CSPYCE_WATCH_", either new or released
+                        by an earlier watch on the same variables.
+        """
+
+        if isinstance(names, str):
+            names = [names]
+
+        self.names = list(names)
+        self._generation = None
+        self._lock = threading.Lock()
+        self._key = None
+
+        if agent:
+            self.agent = agent
+            cspyce.swpool(self.agent, self.names)
+            return
+
+        # Reuse a released agent if possible
+        self._key = tuple(sorted(set(self.names)))
+        with _FREE_AGENTS_LOCK:
+            free = _FREE_AGENTS.get(self._key)
+            self.agent = free.pop() if free else None
+
+        if self.agent is None:
+            self.agent = 'CSPYCE_WATCH_%d' % next(_AGENT_COUNTER)
+            cspyce.swpool(self.agent, self.names)
+
+    def changed(self):
+        """True if any of the watched variables has been changed since the
+        previous call; True on the first call.
+
+        This makes a call to CSPICE only if the kernel pool generation has
+        changed since the previous call.
+        """
+
+        with self._lock:
+            gen = cspyce1.POOL_GENERATION
+            if gen == self._generation:
+                return False
+
+            first = self._generation is None
+            self._generation = gen
+            updated = bool(cspyce.cvpool(self.agent))
+            return updated or first
+
+    def release(self):
+        """Make the agent of this watch available to a later watch on the same
+        variables. The watch must not be used afterward. A watch with an agent
+        name given to the constructor keeps its agent.
+        """
+
+        with self._lock:
+            if self._key is None:
+                return
+
+            with _FREE_AGENTS_LOCK:
+                _FREE_AGENTS.setdefault(self._key, []).append(self.agent)
+            self._key = None
+
+class Subscription:
+    """A callback registered with subscribe()."""
+
+    def __init__(self, callback, names=None):
+        """Constructor; use subscribe() instead.
+
+        Inputs:
+            callback    function called with the new generation number.
+            names       optional name or list of names of pool variables. If
+                        given, the callback is only called after a change to
+                        one of these variables.
+        """
+
+        self.callback = callback
+        self.watch = None if names is None else PoolWatch(names)
+
+        # Consume the initial notification from swpool
+        if self.watch:
+            self.watch.changed()
+
+        cspyce1.POOL_LISTENERS.append(self)
+
+    def __call__(self, gen):
+        # The listeners may have been copied before a call to cancel()
+        if not self.active:
+            return
+
+        try:
+            if self.watch is None or self.watch.changed():
+                self.callback(gen)
+        except Exception as e:
+            # An exception here would hide the outcome of the pool function
+            warnings.warn('kernel pool subscriber raised %s: %s'
+                          % (type(e).__name__, e), RuntimeWarning)
+
+    @property
+    def active(self):
+        """True if this subscription has not been cancelled."""
+
+        return self in cspyce1.POOL_LISTENERS
+
+    def cancel(self):
+        """Stop calling the callback and release the watch, if any."""
+
+        try:
+            cspyce1.POOL_LISTENERS.remove(self)
+        except ValueError:
+            return
+
+        if self.watch:
+            self.watch.release()
+
+def subscribe(callback, names=None):
+    """Register a function to be called after changes to the kernel pool.
+
+    Inputs:
+        callback    function called with the new generation number.
+        names       optional name or list of names of kernel pool variables. If
+                    given, the callback is only called after a change to one of
+                    these variables; otherwise, it is called after every change
+                    to the pool or to the set of loaded kernels.
+
+    Returns:        a Subscription object. Call its cancel() method to stop
+                    the notifications.
+    """
+
+    return Subscription(callback, names)
+
+def pool_snapshot(template='*'):
+    """Return the contents of the kernel pool.
+
+    Inputs:
+        template    optional gnpool template to select the variables to
+                    include. Default is all variables.
+
+    Returns:        a dictionary keyed by variable name. Each value is a NumPy
+                    array of floats for a numeric variable or a list of strings
+                    for a string variable.
+    """
+
+    return _read_variables(_paged(cspyce0.gnpool, template))
+
+def pool_restore(snapshot, clear=False):
+    """Load the contents of a snapshot into the kernel pool.
+
+    The kernel pool generation is incremented once, and subscribers are
+    notified once, however many variables are written.
+
+    Inputs:
+        snapshot    a dictionary as returned by pool_snapshot().
+        clear       True to clear the kernel pool first. Note that this does not
+                    unload any kernels.
+    """
+
+    try:
+        if clear:
+            cspyce0.clpool()
+        _write_variables(snapshot)
+    finally:
+        cspyce1._pool_changed()
+
+def pool_diff(old, new):
+    """Compare two snapshots.
+
+    Returns:        a tuple (added, removed, changed), each a sorted list of
+                    variable names.
+    """
+
+    added   = sorted(set(new) - set(old))
+    removed = sorted(set(old) - set(new))
+    changed = sorted(name for name in set(old) & set(new)
+                     if not _same_values(old[name], new[name]))
+
+    return (added, removed, changed)
+
+################################################################################
+# Support functions
+################################################################################
+
+def _read_variables(names):
+    """A snapshot of the named kernel pool variables, which must exist."""
+
+    if not names:
+        return {}
+
+    (counts, values) = cspyce0.pool_numeric_values(names)
+
+    snapshot = {}
+    offset = 0
+    for (name, count) in zip(names, counts):
+        if count < 0:
+            snapshot[name] = _paged(cspyce0.gcpool, name)
+        else:
+            snapshot[name] = values[offset:offset + count].copy()
+            offset += count
+
+    return snapshot
+
+def _write_variables(snapshot):
+    """Write a snapshot to the kernel pool, without updating the generation."""
+
+    for (name, values) in snapshot.items():
+        if isinstance(values, str):
+            cspyce0.pcpool(name, [values])
+            continue
+
+        if len(values) and isinstance(values[0], str):
+            cspyce0.pcpool(name, list(values))
+            continue
+
+        values = np.asarray(values)
+        if values.dtype.kind in 'iu':
+            cspyce0.pipool(name, values.astype('int32'))
+        else:
+            cspyce0.pdpool(name, values.astype('float64'))
+
+def _paged(func, name):
+    """All the strings returned by gnpool or gcpool, one page at a time."""
+
+    results = []
+    while True:
+        (page, found) = func(name, len(results))
+        if not found:
+            return results
+
+        results += list(page)
+        if len(page) < _KERVALS:
+            return results
+
+def _same_values(a, b):
+    """True if two snapshot values are equal."""
+
+    a_is_str = len(a) > 0 and isinstance(a[0], str)
+    b_is_str = len(b) > 0 and isinstance(b[0], str)
+    if a_is_str or b_is_str:
+        return list(a) == list(b)
+
+    return np.array_equal(a, b)
+
+################################################################################
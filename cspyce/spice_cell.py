@@ -1,4 +1,6 @@
 import numbers
+import sys
+from multiprocessing import resource_tracker, shared_memory
 
 import numpy as np
 
@@ -42,6 +44,99 @@ class SpiceCell:
             return SpiceCell.create_spice_cell(my_type, record)
         return SpiceCell(data=record, typeno=my_type)
 
+    @staticmethod
+    def allocate_buffer(size, typeno=SPICE_CELL_DOUBLE):
+        """Return a zeroed buffer suitable for SpiceCell.from_buffer().
+
+        The buffer holds size elements after the leading control slots, so the
+        caller can fill buffer[SpiceCell.CONTROL_SIZE:] in place.
+        """
+        if typeno == SPICE_CELL_INT:
+            return np.zeros(size + SpiceCell.CONTROL_SIZE, dtype=np.int32)
+        if typeno == SPICE_CELL_DOUBLE:
+            return np.zeros(size + SpiceCell.CONTROL_SIZE, dtype=np.double)
+        raise ValueError(f"Bad type {typeno} passed to allocate_buffer")
+
+    @staticmethod
+    def from_buffer(buffer, card=None):
+        """Create a SpiceCell that uses an existing buffer without copying it.
+
+        The buffer must be a writeable, contiguous, one-dimensional array of
+        float64 or int32. Its first CONTROL_SIZE elements are reserved for use by
+        SPICE; the remainder holds the data of the cell. The cardinality defaults
+        to the full size of the cell.
+
+        The cell never resizes the buffer in place. If the cell needs to grow,
+        it moves its data to a new array and the caller's buffer is no longer
+        used.
+        """
+        if not isinstance(buffer, np.ndarray) or buffer.ndim != 1:
+            raise ValueError("buffer must be a one-dimensional array")
+        if not (buffer.flags.c_contiguous and buffer.flags.writeable):
+            raise ValueError("buffer must be contiguous and writeable")
+        if buffer.dtype == np.dtype(np.int32):
+            typeno = SPICE_CELL_INT
+        elif buffer.dtype == np.dtype(np.double):
+            typeno = SPICE_CELL_DOUBLE
+        else:
+            raise ValueError("buffer must have dtype float64 or int32")
+
+        size = len(buffer) - SpiceCell.CONTROL_SIZE
+        if size <= 0:
+            raise ValueError("buffer has no room beyond the control slots")
+        card = size if card is None else card
+
+        cell = SpiceCell.__new__(SpiceCell)
+        cell._header = np.zeros_like(SPICE_HEADER_PROTOTYPE)[0]
+        cell._header_address = cell._header.__array_interface__['data'][0]
+        cell._descriptor = buffer.dtype
+        cell._header._dtype = typeno
+        cell._header._length = 0
+        cell._header._card = 0
+        cell._header._isSet = True
+        cell._header._adjust = False
+        cell._header._init = False
+        cell._set_buffer(buffer, owned=False)
+        cell.card = card
+        return cell
+
+    @staticmethod
+    def create_shared(size, typeno=SPICE_CELL_DOUBLE):
+        """Create an empty SpiceCell backed by a new block of shared memory.
+
+        When the cell is pickled, for example to be passed to a worker process,
+        only the name of the shared memory block is sent, and the receiver
+        attaches to the same data. Note that each process has its own header,
+        so a change to the cardinality is not seen by the other processes. The
+        shared memory block is available as the cell's shared_memory attribute;
+        the creator is responsible for calling its unlink() method when it is no
+        longer needed.
+        """
+        descriptor = SpiceCell.allocate_buffer(1, typeno).dtype
+        nbytes = (size + SpiceCell.CONTROL_SIZE) * descriptor.itemsize
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        return _attach_shared_spice_cell(shm, typeno, size, 0)
+
+    def share(self):
+        """Return a copy of this cell backed by a new block of shared memory."""
+        cell = SpiceCell.create_shared(self.size, self._header._dtype.item())
+        cell.append(self.as_array())
+        return cell
+
+    @property
+    def shared_memory(self):
+        """The SharedMemory block holding this cell's data, or None."""
+        return self._shared_memory
+
+    def __reduce__(self):
+        typeno = self._header._dtype.item()
+        if self._shared_memory is not None:
+            return (_attach_shared_spice_cell,
+                    (self._shared_memory.name, typeno, self.size, self.card,
+                     _tracker_pid()))
+        return (_rebuild_spice_cell,
+                (typeno, self._header._length.item(), self.size, self.as_array().copy()))
+
     def __init__(self, data=None, typeno=None, size: int = 0, length: int = 0):
         if data is None:
             if typeno is None or size == 0 or (type == SPICE_CELL_DOUBLE and length == 0):
@@ -158,7 +253,13 @@ class SpiceCell:
         else:
             raise ValueError("cardinality must be between 0 and the size of the cell")
 
+    def reserve(self, size):
+        """Ensure that the cell has room for at least size elements."""
+        if size > self.size:
+            self.__grow_array(size)
+
     def as_array(self):
+        # This is a view of the cell's buffer, not a copy
         return self._user_data[0:self.card]
 
     def as_intervals(self):
@@ -173,12 +274,81 @@ class SpiceCell:
 
     def __grow_array(self, size, init=False):
         if init:
-            self._data = np.zeros(size + self.CONTROL_SIZE, dtype=self._descriptor)
-        else:
+            self._set_buffer(np.zeros(size + self.CONTROL_SIZE, dtype=self._descriptor),
+                             owned=True)
+        elif self._owns_buffer:
             self._data.resize(size + self.CONTROL_SIZE, refcheck=False)
-        self._user_data = self._data[6:]
+            self._set_buffer(self._data, owned=True)
+        else:
+            # Never resize a buffer that belongs to someone else
+            data = np.zeros(size + self.CONTROL_SIZE, dtype=self._descriptor)
+            card = min(size, self.card)
+            data[self.CONTROL_SIZE:self.CONTROL_SIZE + card] = self._user_data[:card]
+            self._set_buffer(data, owned=True)
+
+    def _set_buffer(self, data, owned):
+        size = len(data) - self.CONTROL_SIZE
+        self._data = data
+        self._owns_buffer = owned
+        self._shared_memory = None
+        self._user_data = self._data[self.CONTROL_SIZE:]
         self._header._size = size
         self._header._card = min(size, self._header._card)
         self._header._base = self._data.ctypes.data
         self._header._data = self._user_data.ctypes.data
         assert self._header._data - self._header._base == self.CONTROL_SIZE * self._descriptor.itemsize
+
+
+def _rebuild_spice_cell(typeno, length, size, data):
+    """Used by pickle to reconstruct a SpiceCell."""
+    cell = SpiceCell(typeno=typeno, size=size, length=length)
+    cell.append(data)
+    return cell
+
+
+def _attach_shared_spice_cell(shm, typeno, size, card, tracker=None):
+    """Used by pickle to attach a SpiceCell to its shared memory block.
+
+    The shm argument is either a SharedMemory object or the name of one. The
+    header pointers are rebuilt to point into this process's mapping of it. The
+    tracker argument is the process ID of the sender's resource tracker, if
+    known.
+    """
+    if isinstance(shm, str):
+        shm = _attach_shared_memory(shm, tracker)
+    descriptor = SpiceCell.allocate_buffer(1, typeno).dtype
+    buffer = np.ndarray((size + SpiceCell.CONTROL_SIZE,), dtype=descriptor,
+                        buffer=shm.buf)
+    cell = SpiceCell.from_buffer(buffer, card=card)
+    cell._shared_memory = shm
+    return cell
+
+
+def _attach_shared_memory(name, tracker):
+    """Attach to an existing shared memory block without taking ownership.
+
+    Before Python 3.13, attaching registers the block with this process's
+    resource tracker, which unlinks it, or warns about a leak, when it shuts
+    down, even though the block belongs to another process (CPython issue
+    82300). The registration is withdrawn unless this process shares the
+    sender's tracker, as every process started by multiprocessing does; in that
+    case, it was a repeat of the creator's own registration, and withdrawing it
+    would lose the creator's.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    shm = shared_memory.SharedMemory(name=name)
+    ours = _tracker_pid()
+    if tracker is not None and ours is not None and ours != tracker:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _tracker_pid():
+    """The process ID of this process's resource tracker; None if unknown.
+
+    A process started by spawn or forkserver inherits its parent's tracker
+    without knowing its process ID.
+    """
+    return getattr(resource_tracker._resource_tracker, '_pid', None)
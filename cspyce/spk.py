@@ -0,0 +1,188 @@
+################################################################################
+# cspyce/spk.py
+#
+# A read-only, pure-NumPy evaluator for SPK files containing Chebyshev segments.
+#
+# SpkEphemeris reads a list of SPK files via cspyce.daf and evaluates geometric
+# states, equivalent to those of spkgeo, for arrays of times at once. No SPICE
+# routines or global state are used, so an SpkEphemeris can be shared by any
+# number of threads, or opened independently in any number of processes.
+#
+# Supported segment types are 2 (Chebyshev position only) and 3 (Chebyshev
+# position and velocity), in the J2000 frame. These cover the planetary and
+# satellite ephemerides. For other segment types, use spkgeo.
+################################################################################
+
+import numpy as np
+
+from cspyce.daf import DafFile
+
+J2000 = 1
+SSB = 0
+
+class SpkSegment:
+    """One Chebyshev segment of an SPK file."""
+
+    def __init__(self, daf, summary):
+        (self.start, self.stop) = (float(x) for x in summary['dc'])
+        (self.target, self.center, self.frame, self.type,
+         begin, end) = (int(x) for x in summary['ic'])
+        self.name = summary['name'].decode('latin-1')
+
+        # An unsupported segment is only an error if it is actually needed
+        self.error = None
+        if self.type not in (2, 3):
+            self.error = ('unsupported SPK segment type %d in %s'
+                          % (self.type, daf.path))
+        elif self.frame != J2000:
+            self.error = ('unsupported SPK segment frame %d in %s'
+                          % (self.frame, daf.path))
+        if self.error:
+            return
+
+        # The segment ends with INIT, INTLEN, RSIZE, and N
+        data = daf.read(begin, end)
+        (self.init, self.intlen) = (float(data[-4]), float(data[-3]))
+        (rsize, count) = (int(data[-2]), int(data[-1]))
+
+        # Each record holds MID, RADIUS, and the coefficients of each component
+        self.records = data[:count * rsize].reshape(count, rsize)
+        components = 3 if self.type == 2 else 6
+        self.degree = (rsize - 2) // components - 1
+
+    def state(self, et):
+        """The (n,6) state of the target relative to the center at each time in
+        an array. The times must be within the segment.
+        """
+
+        if self.error:
+            raise ValueError(self.error)
+
+        index = np.floor((et - self.init) / self.intlen).astype(np.intp)
+        index = np.clip(index, 0, len(self.records) - 1)
+        records = self.records[index]
+        (mid, radius) = (records[:, 0], records[:, 1])
+        coefs = records[:, 2:].reshape(len(et), -1, self.degree + 1)
+
+        s = (et - mid) / radius
+        (t, dt) = _chebyshev(s, self.degree)
+
+        state = np.empty((len(et), 6))
+        state[:, :3] = np.einsum('nk,njk->nj', t, coefs[:, :3])
+        if self.type == 2:
+            state[:, 3:] = (np.einsum('nk,njk->nj', dt, coefs)
+                            / radius[:, np.newaxis])
+        else:
+            state[:, 3:] = np.einsum('nk,njk->nj', t, coefs[:, 3:])
+
+        return state
+
+class SpkEphemeris:
+    """Geometric states from a list of SPK files.
+
+    As in SPICE, files later in the list take precedence over earlier ones, and
+    within a file, later segments take precedence over earlier ones.
+    """
+
+    def __init__(self, paths):
+        """Constructor.
+
+        Inputs:
+            paths       list of SPK file paths, in load order.
+        """
+
+        self.files = [DafFile(path) for path in paths]
+        self.segments = {}      # target -> list of segments, highest priority
+                                # first
+        for daf in self.files:
+            for summary in daf.summaries():
+                segment = SpkSegment(daf, summary)
+                self.segments.setdefault(segment.target, []).insert(0, segment)
+
+    def state(self, target, et, observer=SSB):
+        """The geometric state of a target relative to an observer in J2000, as
+        returned by spkgeo.
+
+        Inputs:
+            target      ID code of the target.
+            et          time or array of times in TDB seconds.
+            observer    ID code of the observer; default is the solar system
+                        barycenter.
+
+        Returns:        an array of shape et.shape + (6,).
+        """
+
+        et = np.asarray(et, dtype=np.float64)
+        shape = et.shape
+        et = et.ravel()
+
+        (target_state, target_root) = self._state_wrt_root(target, et)
+        (observer_state, observer_root) = self._state_wrt_root(observer, et)
+        if np.any(target_root != observer_root):
+            raise IOError('insufficient ephemeris data to relate body %d to '
+                          'body %d' % (target, observer))
+
+        return (target_state - observer_state).reshape(shape + (6,))
+
+    def position(self, target, et, observer=SSB):
+        """The geometric position of a target relative to an observer in J2000.
+        """
+
+        return self.state(target, et, observer)[..., :3]
+
+    def _state_wrt_root(self, body, et):
+        """The state of a body relative to the root of its chain of centers, and
+        the ID of that root, at each time.
+
+        The chain ends at the first body that has no data for a given time,
+        which is normally the solar system barycenter.
+        """
+
+        state = np.zeros((len(et), 6))
+        centers = np.full(len(et), body)
+        todo = np.ones(len(et), dtype=bool)
+        for segment in self.segments.get(body, []):
+            mask = todo & (segment.start <= et) & (et <= segment.stop)
+            if np.any(mask):
+                state[mask] = segment.state(et[mask])
+                centers[mask] = segment.center
+                todo &= ~mask
+
+        roots = np.full(len(et), body)
+        for center in np.unique(centers[~todo]):
+            mask = ~todo & (centers == center)
+            (center_state, center_root) = self._state_wrt_root(int(center),
+                                                               et[mask])
+            state[mask] += center_state
+            roots[mask] = center_root
+
+        return (state, roots)
+
+    def close(self):
+        for daf in self.files:
+            daf.close()
+
+################################################################################
+# Support functions
+################################################################################
+
+def _chebyshev(s, degree):
+    """The Chebyshev polynomials T_0 to T_degree, and their derivatives, for an
+    array of values. Each is returned as an array of shape (n, degree+1).
+    """
+
+    t = np.empty((len(s), degree + 1))
+    dt = np.empty((len(s), degree + 1))
+    t[:, 0] = 1.
+    dt[:, 0] = 0.
+    if degree > 0:
+        t[:, 1] = s
+        dt[:, 1] = 1.
+
+    for k in range(2, degree + 1):
+        t[:, k] = 2. * s * t[:, k-1] - t[:, k-2]
+        dt[:, k] = 2. * t[:, k-1] + 2. * s * dt[:, k-1] - dt[:, k-2]
+
+    return (t, dt)
+
+################################################################################
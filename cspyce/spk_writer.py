@@ -0,0 +1,410 @@
+################################################################################
+# cspyce/spk_writer.py
+#
+# A streaming writer for SPK files.
+#
+# The SPK writers spkw02, spkw03, spkw09, and spkw13 each write one segment from
+# arrays held in memory. SpkWriter accepts a trajectory in chunks of any size,
+# for example from a generator or slices of a memory-mapped array, and writes
+# it as a series of segments, each one cut at a configurable number of states
+# or records and duration. Only the data for the current segment is held in
+# memory.
+#
+# Types 9 (Lagrange) and 13 (Hermite) store the states themselves. Adjacent
+# segments share the state at which they are cut, and each segment also
+# carries a few states beyond its coverage on either side, so interpolation
+# near the boundaries uses full windows. A short final segment also carries
+# enough states before its coverage to meet the minimum of its type.
+#
+# Types 2 and 3 (Chebyshev) are fitted to the states by least squares, one
+# record of fixed length at a time, as soon as enough states have arrived. For
+# type 3, the positions and velocities are fitted separately; for type 2, one
+# polynomial per component is fitted to both the positions and the velocities.
+# A record must contain enough states to determine its coefficients, or a
+# ValueError is raised. The last record before the end of the data can be
+# partial; it is fitted to the states of the last record length of data. A gap
+# between states longer than a record ends the segment, and the next segment
+# begins at the first state after the gap, so no record spans a gap.
+#
+# Usage:
+#   with SpkWriter('orbit.bsp', -999, 399, segtype=13, degree=7) as writer:
+#       for (et, states) in trajectory_chunks():
+#           writer.write(et, states)
+################################################################################
+
+import os
+
+import numpy as np
+
+import cspyce
+from cspyce.spk import _chebyshev
+
+SEGMENT_TYPES = (2, 3, 9, 13)
+
+class SpkWriter:
+    """A writer that streams a trajectory into the segments of an SPK file."""
+
+    def __init__(self, path, body, center, frame='J2000', segtype=13, degree=7,
+                 max_size=10000, max_duration=None, intlen=None, segid=None,
+                 append=False, ifname=None, ncomch=0):
+        """Constructor; open the SPK file.
+
+        Inputs:
+            path        path to the SPK file.
+            body        NAIF ID code of the body.
+            center      NAIF ID code of the center of motion.
+            frame       name of the reference frame.
+            segtype     SPK segment type: 9 or 13 to store the states; 2 or 3
+                        to store fitted Chebyshev records.
+            degree      degree of the interpolating (types 9 and 13) or
+                        Chebyshev (types 2 and 3) polynomials.
+            max_size    maximum number of states (types 9 and 13) or records
+                        (types 2 and 3) per segment.
+            max_duration
+                        optional maximum time span of a segment, in seconds.
+            intlen      length of each Chebyshev record, in seconds; required
+                        for types 2 and 3.
+            segid       segment identifier; default is "SPK_WRITER_TYPE_<n>".
+            append      True to add segments to an existing SPK file.
+            ifname      internal file name of a new file; default is the file
+                        name.
+            ncomch      number of characters to reserve for comments in a new
+                        file.
+        """
+
+        if segtype not in SEGMENT_TYPES:
+            raise ValueError('unsupported SPK segment type: %s' % segtype)
+        if segtype in (2, 3) and not intlen:
+            raise ValueError('intlen is required for SPK type %d' % segtype)
+        if max_size < 2:
+            raise ValueError('max_size must be at least 2')
+
+        self.path = str(path)
+        self.body = body
+        self.center = center
+        self.frame = frame
+        self.segtype = segtype
+        self.degree = degree
+        self.max_size = max_size
+        self.max_duration = max_duration
+        self.intlen = intlen
+        self.segid = segid or 'SPK_WRITER_TYPE_%d' % segtype
+        self.segments = 0
+
+        # Number of states carried beyond each end of a type 9 or 13 segment
+        self._pad = (degree + 1) // 2
+
+        # Buffered states; for types 9 and 13, the current segment begins at
+        # index self._start of the buffer
+        self._et = np.empty(0)
+        self._states = np.empty((0, 6))
+        self._start = 0
+        self._last_et = -np.inf
+
+        # For types 2 and 3, the start time of the next record to fit, and the
+        # fitted records of the current segment and their start time
+        self._btime = None
+        self._records = []
+        self._segment_btime = None
+
+        if append:
+            self.handle = cspyce.spkopa(self.path)
+        else:
+            ifname = ifname or os.path.basename(self.path)
+            self.handle = cspyce.spkopn(self.path, ifname[:60], ncomch)
+
+    def write(self, et, states):
+        """Add a chunk of the trajectory.
+
+        Inputs:
+            et          array of times in TDB seconds, strictly increasing and
+                        later than all the times written previously.
+            states      array of shape (n,6) of the states at those times.
+        """
+
+        et = np.asarray(et, dtype=np.float64).ravel()
+        states = np.asarray(states, dtype=np.float64).reshape(-1, 6)
+        if len(et) != len(states):
+            raise ValueError('numbers of times and states differ: %d, %d'
+                             % (len(et), len(states)))
+        if len(et) == 0:
+            return
+        if et[0] <= self._last_et or np.any(np.diff(et) <= 0.):
+            raise ValueError('times must be strictly increasing')
+
+        if self.segtype in (9, 13):
+            self._append(et, states)
+            self._flush_states(final=False)
+            return
+
+        # Split the chunk at every gap longer than a record
+        spacing = np.diff(np.concatenate([[self._last_et], et]))
+        gaps = np.flatnonzero(spacing > self.intlen)
+        for (k, indices) in enumerate(np.split(np.arange(len(et)), gaps)):
+            if k > 0:
+                self._end_segment()
+            if len(indices):
+                self._append(et[indices], states[indices])
+                self._flush_records(final=False)
+
+    def write_from(self, chunks):
+        """Add every (et, states) chunk from an iterable."""
+
+        for (et, states) in chunks:
+            self.write(et, states)
+
+    def close(self):
+        """Write the final segment and close the file."""
+
+        if self.handle is None:
+            return
+
+        try:
+            if self.segtype in (9, 13):
+                self._flush_states(final=True)
+            else:
+                self._flush_records(final=True)
+        finally:
+            cspyce.spkcls(self.handle)
+            self.handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _append(self, et, states):
+        """Add times and states to the buffer."""
+
+        self._last_et = et[-1]
+        self._et = np.concatenate([self._et, et])
+        self._states = np.concatenate([self._states, states])
+
+    def _min_states(self):
+        """The number of states needed for one segment (types 9 and 13) or to
+        fit one record (types 2 and 3).
+        """
+
+        if self.segtype in (3, 9):
+            return self.degree + 1
+        if self.segtype == 13:
+            return self.degree // 2 + 1
+
+        # Each state provides a position and a velocity for each component
+        return (self.degree + 2) // 2
+
+    ############################################################################
+    # Types 9 and 13
+    ############################################################################
+
+    def _flush_states(self, final):
+        """Write every complete segment of states in the buffer, or, if final,
+        whatever remains.
+        """
+
+        while True:
+            start = self._start
+            last = len(self._et) - 1
+            cut = self._cut_index(start, last)
+            if cut >= last:
+                # Everything remaining fits in one segment
+                if final and last > start:
+                    self._write_states(start, last)
+                return
+
+            if not final and self._window(start, cut)[1] > last + 1:
+                return              # wait for the states beyond the cut
+
+            self._write_states(start, cut)
+
+            # Keep the padding before the cut, or enough states for a short
+            # final segment; the next segment starts at the cut
+            keep = max(cut - max(self._pad, self._min_states() - 1), 0)
+            self._et = self._et[keep:]
+            self._states = self._states[keep:]
+            self._start = cut - keep
+
+    def _cut_index(self, start, last):
+        """The buffer index at which the segment beginning at start ends."""
+
+        cut = start + self.max_size - 1
+        if self.max_duration:
+            limit = self._et[start] + self.max_duration
+            cut = min(cut, np.searchsorted(self._et, limit, 'right') - 1)
+
+        return min(max(cut, start + 1), last)
+
+    def _window(self, start, stop):
+        """The range of buffer indices, lo to hi - 1, of the states stored in a
+        segment covering buffer indices start to stop. The range includes the
+        padding on either side and has at least the minimum number of states;
+        hi can exceed the number of states buffered so far.
+        """
+
+        needed = self._min_states()
+        lo = max(start - self._pad, 0)
+        hi = max(stop + self._pad + 1, lo + needed)
+        if hi > len(self._et):
+            lo = max(min(lo, len(self._et) - needed), 0)
+
+        return (lo, hi)
+
+    def _write_states(self, start, stop):
+        """Write a segment covering buffer indices start to stop."""
+
+        (lo, hi) = self._window(start, stop)
+        hi = min(hi, len(self._et))
+        if hi - lo < self._min_states():
+            raise ValueError('the SPK segment beginning at %s has %d states; '
+                             'at least %d are needed for degree %d'
+                             % (self._et[start], hi - lo, self._min_states(),
+                                self.degree))
+
+        et = self._et[lo:hi]
+        states = self._states[lo:hi]
+        writer = cspyce.spkw09 if self.segtype == 9 else cspyce.spkw13
+        writer(self.handle, self.body, self.center, self.frame,
+               self._et[start], self._et[stop], self.segid, self.degree,
+               len(et), states.ravel(), et)
+        self.segments += 1
+
+    ############################################################################
+    # Types 2 and 3
+    ############################################################################
+
+    def _flush_records(self, final):
+        """Fit every complete record in the buffer and write any complete
+        segments. If final, also fit and write whatever remains.
+        """
+
+        if len(self._et) == 0:
+            if final:
+                self._write_records()
+            return
+
+        if self._btime is None:
+            self._btime = self._et[0]
+            self._segment_btime = self._et[0]
+
+        # Records ending at or before the last buffered time are complete
+        count = int(np.floor((self._et[-1] - self._btime) / self.intlen))
+        if final and self._et[-1] > self._btime + count * self.intlen:
+            count += 1
+
+        if count > 0:
+            starts = self._btime + self.intlen * np.arange(count)
+            self._records += list(self._fit(starts, final))
+            self._btime = starts[-1] + self.intlen
+
+            # Keep the states of the last record, which includes the boundary
+            # state of the next one, in case the next one is partial
+            keep = np.searchsorted(self._et, self._btime - self.intlen, 'left')
+            self._et = self._et[keep:]
+            self._states = self._states[keep:]
+
+        per_segment = self.max_size
+        if self.max_duration:
+            per_segment = min(per_segment,
+                              max(int(self.max_duration // self.intlen), 1))
+
+        while len(self._records) >= per_segment:
+            self._write_records(per_segment)
+
+        if final:
+            self._write_records()
+
+    def _end_segment(self):
+        """Fit and write all the buffered states, so that the next state
+        begins a new segment.
+        """
+
+        self._flush_records(final=True)
+        self._et = np.empty(0)
+        self._states = np.empty((0, 6))
+        self._btime = None
+
+    def _fit(self, starts, final):
+        """The Chebyshev coefficients of the records beginning at each time, as
+        an array of shape (records, components, degree+1). If final, the last
+        record can extend beyond the last state.
+        """
+
+        radius = self.intlen / 2.
+        ends = starts + self.intlen
+        lo = np.searchsorted(self._et, starts, 'left')
+        hi = np.searchsorted(self._et, ends, 'right')
+
+        # A partial last record is fitted to the last record length of states,
+        # some of which precede the record
+        if final and ends[-1] > self._et[-1]:
+            lo[-1] = min(lo[-1], np.searchsorted(self._et,
+                                                 self._et[-1] - self.intlen,
+                                                 'left'))
+
+        needed = self._min_states()
+        counts = hi - lo
+        short = np.flatnonzero(counts < needed)
+        if len(short):
+            raise ValueError('the SPK record beginning at %s has %d states; '
+                             'at least %d are needed for degree %d'
+                             % (starts[short[0]], counts[short[0]], needed,
+                                self.degree))
+
+        if np.all(counts == counts[0]) and counts[0] > 0:
+            # Every record has the same number of samples; fit all at once
+            index = lo[:, np.newaxis] + np.arange(counts[0])
+            return self._fit_samples(self._et[index], self._states[index],
+                                     starts + radius, radius)
+
+        return np.concatenate([self._fit_samples(self._et[np.newaxis, a:b],
+                                                 self._states[np.newaxis, a:b],
+                                                 s + radius, radius)
+                               for (s, a, b) in zip(starts, lo, hi)])
+
+    def _fit_samples(self, et, states, mid, radius):
+        """Least-squares Chebyshev fit to samples of shape (records, m) and
+        states of shape (records, m, 6).
+        """
+
+        (nrecs, m) = et.shape
+        s = (et - np.reshape(mid, (-1, 1))) / radius
+        (t, dt) = _chebyshev(s.ravel(), self.degree)
+        t = t.reshape(nrecs, m, -1)
+        dt = dt.reshape(nrecs, m, -1) / radius
+
+        if self.segtype == 3:
+            # Separate fits for the positions and the velocities
+            coefs = np.linalg.pinv(t) @ states
+            return np.swapaxes(coefs, 1, 2)
+
+        # One fit per component, to the positions and the velocities together
+        design = np.concatenate([t, dt], axis=1)
+        values = np.concatenate([states[..., :3], states[..., 3:]], axis=1)
+        coefs = np.linalg.pinv(design) @ values
+        return np.swapaxes(coefs, 1, 2)
+
+    def _write_records(self, count=None):
+        """Write a segment from the first count fitted records, or from all of
+        them.
+        """
+
+        records = self._records if count is None else self._records[:count]
+        if not records:
+            return
+
+        btime = self._segment_btime
+        nrecs = len(records)
+        end = btime + nrecs * self.intlen
+        last = min(end, self._last_et)
+
+        writer = cspyce.spkw02 if self.segtype == 2 else cspyce.spkw03
+        writer(self.handle, self.body, self.center, self.frame, btime, last,
+               self.segid, self.intlen, nrecs, self.degree,
+               np.asarray(records).ravel(), btime)
+        self.segments += 1
+
+        self._records = self._records[nrecs:]
+        self._segment_btime = end
+
+################################################################################
@@ -0,0 +1,304 @@
+################################################################################
+# cspyce/windows.py
+#
+# Window algebra on NumPy arrays of intervals.
+#
+# A window is represented as an array of shape (n,2), where each row is the
+# [left, right] endpoints of one interval, as returned by
+# SpiceCell.as_intervals(). The functions here reproduce the results of the
+# SPICE window routines, but they operate on whole arrays at once rather than
+# looping over the intervals in C. Every operation is based on a sort, so it
+# runs in O(n log n) time.
+#
+# Each function has a "_batch" version that operates on a list of windows at
+# once and returns a list of results. Internally, the windows of a batch are
+# concatenated and tagged with the index of the window they came from, so the
+# cost of a batch is that of a single operation on the combined arrays.
+#
+# As with the SPICE routines, input windows are expected to be valid, i.e.,
+# sorted and not overlapping. Use wnvald to validate an arbitrary collection of
+# intervals.
+################################################################################
+
+import numpy as np
+
+from cspyce.spice_cell import SpiceCell
+
+def wnvald(window):
+    """Sort the intervals of a window and merge any that overlap or abut."""
+
+    return wnvald_batch([window])[0]
+
+def wnunid(a, b):
+    """The union of two windows."""
+
+    return wnunid_batch([a], [b])[0]
+
+def wnintd(a, b):
+    """The intersection of two windows."""
+
+    return wnintd_batch([a], [b])[0]
+
+def wndifd(a, b):
+    """The difference of two windows, a minus b."""
+
+    return wndifd_batch([a], [b])[0]
+
+def wnexpd(left, right, window):
+    """Expand each interval of a window by subtracting left from its left
+    endpoint and adding right to its right endpoint. Intervals that overlap as
+    a result are merged.
+    """
+
+    return wnexpd_batch(left, right, [window])[0]
+
+def wncond(left, right, window):
+    """Contract each interval of a window by adding left to its left endpoint
+    and subtracting right from its right endpoint. Intervals that vanish as a
+    result are removed.
+    """
+
+    return wncond_batch(left, right, [window])[0]
+
+def wnfild(small, window):
+    """Fill the gaps in a window that are no longer than small."""
+
+    return wnfild_batch(small, [window])[0]
+
+def wnfltd(small, window):
+    """Remove the intervals of a window that are no longer than small."""
+
+    return wnfltd_batch(small, [window])[0]
+
+################################################################################
+# Batch versions
+################################################################################
+
+def wnvald_batch(windows):
+    """Validate each window in a list."""
+
+    (intervals, ids, count) = _pack(windows)
+    return _unpack(*_merge(intervals, ids), count)
+
+def wnunid_batch(a_list, b_list):
+    """The union of each pair of windows in two lists."""
+
+    (a, a_ids, count) = _pack(a_list)
+    (b, b_ids, _) = _pack(b_list, count)
+    intervals = np.concatenate([a, b])
+    ids = np.concatenate([a_ids, b_ids])
+    order = np.lexsort((intervals[:, 0], ids))
+    return _unpack(*_merge(intervals[order], ids[order]), count)
+
+def wnintd_batch(a_list, b_list):
+    """The intersection of each pair of windows in two lists."""
+
+    (a, a_ids, count) = _pack(a_list)
+    (b, b_ids, _) = _pack(b_list, count)
+    return _unpack(*_intersect(a, a_ids, b, b_ids), count)
+
+def wndifd_batch(a_list, b_list):
+    """The difference, a minus b, of each pair of windows in two lists.
+
+    As in SPICE, the result is the closure of the set difference. The endpoints
+    of the intervals in b can appear in the result, but isolated points of a
+    that fall within b are removed.
+    """
+
+    (a, a_ids, count) = _pack(a_list)
+    (b, b_ids, _) = _pack(b_list, count)
+
+    # Intersect a with the gaps in b, including the unbounded ones at each end
+    (gaps, gap_ids) = _gaps(b, b_ids, count)
+    (result, ids) = _intersect(a, a_ids, gaps, gap_ids)
+
+    # Remove any singleton intervals that fall within b
+    singles = np.flatnonzero(result[:, 0] == result[:, 1])
+    if len(singles) and len(b):
+        values = np.unique(np.concatenate([b.ravel(), result[singles, 0]]))
+        b_left = _keys(b_ids, b[:, 0], values)
+        b_right = _keys(b_ids, b[:, 1], values)
+        x = _keys(ids[singles], result[singles, 0], values)
+        k = np.searchsorted(b_right, x)
+        k_ok = np.minimum(k, len(b) - 1)
+        inside = (k < len(b)) & (b_left[k_ok] <= x)
+        keep = np.ones(len(result), dtype=bool)
+        keep[singles[inside]] = False
+        (result, ids) = (result[keep], ids[keep])
+
+    return _unpack(result, ids, count)
+
+def wnexpd_batch(left, right, windows):
+    """Expand each window in a list. The left and right values can be scalars
+    or arrays with one value per window.
+    """
+
+    (intervals, ids, count) = _pack(windows)
+    left = np.broadcast_to(left, (count,))[ids]
+    right = np.broadcast_to(right, (count,))[ids]
+    intervals = np.stack([intervals[:, 0] - left, intervals[:, 1] + right],
+                         axis=-1)
+
+    keep = intervals[:, 0] <= intervals[:, 1]
+    (intervals, ids) = (intervals[keep], ids[keep])
+
+    # Expansion cannot change the order of the left endpoints, but contraction
+    # can if the values differ between intervals
+    order = np.lexsort((intervals[:, 0], ids))
+    return _unpack(*_merge(intervals[order], ids[order]), count)
+
+def wncond_batch(left, right, windows):
+    """Contract each window in a list. The left and right values can be scalars
+    or arrays with one value per window.
+    """
+
+    return wnexpd_batch(np.negative(left), np.negative(right), windows)
+
+def wnfild_batch(small, windows):
+    """Fill the small gaps in each window in a list. The small value can be a
+    scalar or an array with one value per window.
+    """
+
+    (intervals, ids, count) = _pack(windows)
+    small = np.broadcast_to(small, (count,))[ids]
+
+    gaps = intervals[1:, 0] - intervals[:-1, 1]
+    starts = np.ones(len(intervals), dtype=bool)
+    starts[1:] = (ids[1:] != ids[:-1]) | (gaps > small[1:]) | (small[1:] <= 0.)
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:], len(intervals)) - 1
+
+    result = np.stack([intervals[first, 0], intervals[last, 1]], axis=-1)
+    return _unpack(result, ids[first], count)
+
+def wnfltd_batch(small, windows):
+    """Remove the small intervals from each window in a list. The small value
+    can be a scalar or an array with one value per window.
+    """
+
+    (intervals, ids, count) = _pack(windows)
+    small = np.broadcast_to(small, (count,))[ids]
+
+    keep = (intervals[:, 1] - intervals[:, 0] > small) | (small <= 0.)
+    return _unpack(intervals[keep], ids[keep], count)
+
+################################################################################
+# Support functions
+################################################################################
+
+def _as_intervals(window):
+    """Return a window as an (n,2) array of float64."""
+
+    if isinstance(window, SpiceCell):
+        window = window.as_intervals()
+
+    return np.asarray(window, dtype=np.float64).reshape(-1, 2)
+
+def _pack(windows, count=None):
+    """Concatenate a list of windows into one array of intervals sorted by
+    window index and then by left endpoint. Return the array, the window index
+    of each interval, and the number of windows.
+    """
+
+    windows = [_as_intervals(w) for w in windows]
+    if count is not None and len(windows) != count:
+        raise ValueError('window lists have different lengths: %d, %d'
+                         % (count, len(windows)))
+
+    count = len(windows)
+    if count == 0:
+        return (np.empty((0, 2)), np.empty(0, dtype=np.intp), 0)
+
+    intervals = np.concatenate(windows)
+    ids = np.repeat(np.arange(count), [len(w) for w in windows])
+    order = np.lexsort((intervals[:, 0], ids))
+    return (intervals[order], ids[order], count)
+
+def _unpack(intervals, ids, count):
+    """Split an array of intervals sorted by window index into a list of
+    windows.
+    """
+
+    if count == 0:
+        return []
+
+    bounds = np.searchsorted(ids, np.arange(1, count))
+    return np.split(intervals, bounds)
+
+def _keys(ids, values, sorted_values):
+    """Integer sort keys for values tagged by window index.
+
+    Each value is replaced by its rank within sorted_values, offset by the
+    window index times the number of values. The keys sort in order of window
+    index and then value, exactly, so they can be used for searches across a
+    whole batch at once.
+    """
+
+    return ids * len(sorted_values) + np.searchsorted(sorted_values, values)
+
+def _merge(intervals, ids):
+    """Merge intervals that overlap or abut within each window. The intervals
+    must be sorted by window index and then by left endpoint.
+    """
+
+    if len(intervals) == 0:
+        return (intervals, ids)
+
+    # Running maximum of the right endpoints within each window
+    rights = np.sort(intervals[:, 1])
+    keys = _keys(ids, intervals[:, 1], rights)
+    running = np.maximum.accumulate(keys) - ids * len(rights)
+    reach = rights[running]
+
+    starts = np.ones(len(intervals), dtype=bool)
+    starts[1:] = (ids[1:] != ids[:-1]) | (intervals[1:, 0] > reach[:-1])
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:], len(intervals)) - 1
+
+    result = np.stack([intervals[first, 0], reach[last]], axis=-1)
+    return (result, ids[first])
+
+def _intersect(a, a_ids, b, b_ids):
+    """The intersection of the intervals of a and b within each window."""
+
+    if len(a) == 0 or len(b) == 0:
+        return (np.empty((0, 2)), np.empty(0, dtype=np.intp))
+
+    values = np.unique(np.concatenate([a.ravel(), b.ravel()]))
+    a_left = _keys(a_ids, a[:, 0], values)
+    a_right = _keys(a_ids, a[:, 1], values)
+    b_left = _keys(b_ids, b[:, 0], values)
+    b_right = _keys(b_ids, b[:, 1], values)
+
+    # For each interval of a, the intervals of b that overlap it or touch it
+    lo = np.searchsorted(b_right, a_left, side='left')
+    hi = np.searchsorted(b_left, a_right, side='right')
+    counts = np.maximum(hi - lo, 0)
+
+    a_index = np.repeat(np.arange(len(a)), counts)
+    offsets = np.arange(len(a_index)) - np.repeat(np.cumsum(counts) - counts,
+                                                  counts)
+    b_index = np.repeat(lo, counts) + offsets
+
+    result = np.stack([np.maximum(a[a_index, 0], b[b_index, 0]),
+                       np.minimum(a[a_index, 1], b[b_index, 1])], axis=-1)
+    return (result, a_ids[a_index])
+
+def _gaps(intervals, ids, count):
+    """The closed gaps between the intervals of each window, including the
+    unbounded gaps before the first interval and after the last.
+    """
+
+    sizes = np.bincount(ids, minlength=count)
+    gap_ids = np.repeat(np.arange(count), sizes + 1)
+    gaps = np.empty((len(gap_ids), 2))
+    gaps[:, 0] = -np.inf
+    gaps[:, 1] = np.inf
+
+    # Interval j of window k ends the gap before it and starts the gap after it
+    positions = np.arange(len(intervals)) + ids
+    gaps[positions, 1] = intervals[:, 0]
+    gaps[positions + 1, 0] = intervals[:, 1]
+    return (gaps, gap_ids)
+
+################################################################################
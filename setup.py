@@ -207,13 +207,30 @@ def get_extensions():
     else:
         cspyce_cflags = ["-DSWIG_PYTHON_CAST_MODE"]
 
+    # OpenMP for the parallel vector loops; see swig/make_vectorize.py. It is
+    # off unless CSPYCE_OPENMP=1 is set at build time, because the OpenMP
+    # runtime does not survive a fork() once its threads have started, so a
+    # program that forks after a large vector call could hang. The default
+    # macOS compiler does not support it.
+    use_openmp = os.environ.get("CSPYCE_OPENMP", "0") == "1"
+    if use_openmp and IS_WINDOWS:
+        openmp_cflags = ["/openmp"]
+        openmp_ldflags = []
+    elif use_openmp and IS_LINUX:
+        openmp_cflags = ["-fopenmp"]
+        openmp_ldflags = ["-fopenmp"]
+    else:
+        openmp_cflags = []
+        openmp_ldflags = []
+
     include_dirs = [os.path.join(cspice_directory, "include"), numpy.get_include()]
 
     cspyce0_module = Extension(
         "cspyce._cspyce0",
         sources=["swig/cspyce0_wrap.c"],
         include_dirs=include_dirs,
-        extra_compile_args=cspyce_cflags,
+        extra_compile_args=cspyce_cflags + openmp_cflags,
+        extra_link_args=openmp_ldflags,
         **extra_args)
 
     typemap_samples_module = Extension(
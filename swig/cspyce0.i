@@ -53,6 +53,21 @@ void *my_malloc_internal(int size, const char *fname) {
     return result;
 }
 
+/* Like my_malloc_internal, but safe to call without holding the GIL. Free the
+ * result with PyMem_RawFree. */
+void *my_raw_malloc_internal(int size, const char *fname) {
+    void *result = (void *) PyMem_RawMalloc(size);
+    if (!result) {
+        chkin_c(fname);
+        setmsg_c("Failed to allocate memory");
+        sigerr_c("SPICE(MALLOCFAILURE)");
+        chkout_c(fname);
+    }
+
+    return result;
+}
+
+#define my_raw_malloc(count, fname) ((SpiceDouble *)my_raw_malloc_internal((count) * sizeof(SpiceDouble), fname))
 #define my_malloc(count, fname)          ((SpiceDouble *)my_malloc_internal((count) * sizeof(SpiceDouble), fname))
 #define my_int_malloc(count, fname)         ((SpiceInt *)my_malloc_internal((count) * sizeof(SpiceInt), fname))
 #define my_boolean_malloc(count, fname) ((SpiceBoolean *)my_malloc_internal((count) * sizeof(SpiceBoolean), fname))
@@ -86,6 +101,9 @@ int my_assert_ge(int a, int b, const char *fname, const char *message) {
     return 1;
 }
 
+/* Vectorized loops with at least this many iterations release the GIL. */
+#define GIL_RELEASE_SIZE 1000
+
 // Prototypes
 
 void frmchg_(SpiceInt    *frame1,
@@ -128,6 +146,7 @@ void stlabx_(ConstSpiceDouble pobj[3],
 
 // From cspyce_typemaps.i
 void set_python_exception_flag(SpiceInt flag);
+void set_conversion_tracer(PyObject *tracer);
 int get_python_exception_flag(void);
 char *get_message_after_reset(SpiceInt option);
 void reset_messages(void);
@@ -147,10 +166,69 @@ void reset_messages(void);
         errdev_c("SET", 256, "NULL");   /* Suppresses default error messages */
         initialize_typemap_globals();
         initialize_swig_callback();
+        reinitialize_spice_lock();
 %}
 
 %feature("autodoc", "1");
 
+/* Every call into CSPICE holds the SPICE lock. A CSPICE error is converted to
+ * a Python exception and reset before the lock is released, so no other thread
+ * can see it or add to it. */
+%exception {
+    acquire_spice_lock();
+    $action
+    if (failed_c()) {
+        handle_swig_exception("$symname");
+        release_spice_lock();
+        SWIG_fail;
+    }
+    release_spice_lock();
+}
+
+/* Long-running functions also release the GIL while they run. These must not
+ * call the Python C API; helper functions that allocate memory with PyMem
+ * instead release the GIL themselves, around the CSPICE call only. */
+%define RELEASE_GIL(FUNC)
+%exception FUNC {
+    acquire_spice_lock();
+    Py_BEGIN_ALLOW_THREADS
+    $action
+    Py_END_ALLOW_THREADS
+    if (failed_c()) {
+        handle_swig_exception("$symname");
+        release_spice_lock();
+        SWIG_fail;
+    }
+    release_spice_lock();
+}
+%enddef
+
+RELEASE_GIL(furnsh_c)
+RELEASE_GIL(dskx02_c)
+RELEASE_GIL(gfdist_c)
+RELEASE_GIL(gfilum_c)
+RELEASE_GIL(gfoclt_c)
+RELEASE_GIL(gfpa_c)
+RELEASE_GIL(gfposc_c)
+RELEASE_GIL(gfrfov_c)
+RELEASE_GIL(gfrr_c)
+RELEASE_GIL(gfsep_c)
+RELEASE_GIL(gfsntc_c)
+RELEASE_GIL(gfsubc_c)
+RELEASE_GIL(gftfov_c)
+
+/* Called from Python after fork(); it must not wait for the lock itself. */
+%exception reinitialize_spice_lock {
+    $action
+}
+void reinitialize_spice_lock(void);
+
+/* Used by cspyce.conversions to trace copies of input arrays. */
+%exception set_conversion_tracer {
+    $action
+}
+void set_conversion_tracer(PyObject *tracer);
+
 
 /***********************************************************************
 * -Procedure axisar_c ( Axis and angle to rotation )
@@ -3455,6 +3533,62 @@ extern void gdpool_c(
 //CSPYCE_DEFAULT:name:""
 //CSPYCE_DEFAULT:start:0
 
+/* Internal routine used by cspyce.pool.pool_snapshot(). For each name, it
+ * returns the number of numeric values of the kernel pool variable, or -1 if
+ * the variable is missing or has string values. The numeric values of all the
+ * variables are returned concatenated, in order, so reading the whole pool
+ * does not require a call per variable, or per KERVALS values. */
+
+%rename (pool_numeric_values) my_pool_numeric_values_c;
+%apply (void RETURN_VOID) {void my_pool_numeric_values_c};
+%apply (ConstSpiceChar *IN_STRINGS, SpiceInt DIM1, SpiceInt DIM2)
+                {(ConstSpiceChar *names, SpiceInt nnames, SpiceInt namelen)};
+%apply (SpiceInt **OUT_ARRAY1, SpiceInt *SIZE1)
+                {(SpiceInt **counts, SpiceInt *ncounts)};
+%apply (SpiceDouble **OUT_ARRAY1, SpiceInt *SIZE1)
+                {(SpiceDouble **values, SpiceInt *nvalues)};
+
+%inline %{
+    void my_pool_numeric_values_c(
+        ConstSpiceChar *names, SpiceInt nnames, SpiceInt namelen,
+        SpiceInt **counts, SpiceInt *ncounts,
+        SpiceDouble **values, SpiceInt *nvalues)
+    {
+        SpiceInt     k, n, total = 0;
+        SpiceChar    vtype;
+        SpiceBoolean found;
+
+        *ncounts = 0;
+        *nvalues = 0;
+        *counts = my_int_malloc(nnames, "pool_numeric_values");
+        if (!*counts) return;
+        *ncounts = nnames;
+
+        for (k = 0; k < nnames; k++) {
+            dtpool_c(names + k * namelen, &found, &n, &vtype);
+            if (found && vtype == 'N') {
+                (*counts)[k] = n;
+                total += n;
+            } else {
+                (*counts)[k] = -1;
+            }
+        }
+
+        *values = my_malloc(total, "pool_numeric_values");
+        if (!*values) return;
+        *nvalues = total;
+
+        SpiceDouble *next = *values;
+        for (k = 0; k < nnames; k++) {
+            if ((*counts)[k] > 0) {
+                gdpool_c(names + k * namelen, 0, (*counts)[k], &n, next,
+                         &found);
+                next += (*counts)[k];
+            }
+        }
+    }
+%}
+
 /***********************************************************************
 * -Procedure georec_c ( Geodetic to rectangular coordinates )
 *
@@ -4571,7 +4705,9 @@ VECTORIZE_3d__dN(latrec, latrec_c, 3)
         *sdim2 = 3;
         *srfpts = my_malloc(npts * 3, "latsrf");
         if (*srfpts) {
+            Py_BEGIN_ALLOW_THREADS
             latsrf_c(method, target, et, fixref, npts, lonlat, (SpiceDouble (*)[3])*srfpts);
+            Py_END_ALLOW_THREADS
         }
     }
 %}
@@ -4743,9 +4879,11 @@ extern void ldpool_c(
         *tangts = my_malloc(maxn * 3, "limbpt");
 
         if (*npts && *points && *epochs && *tangts) {
+            Py_BEGIN_ALLOW_THREADS
             limbpt_c(method, target, et, fixref, abcorr, corloc, obsrvr, refvec,
                      rolstp, ncuts, schstp, soltol, maxn,
                      *npts, (SpiceDouble (*)[3])*points, *epochs, (SpiceDouble (*)[3])*tangts);
+            Py_END_ALLOW_THREADS
         }
 
     }
@@ -10208,9 +10346,11 @@ VECTORIZE_2s_d__dMN(sxform, sxform_c, 6, 6)
         *trmvcs = my_malloc(3 * maxn, "termpt");
 
         if (*npts && *points && *epochs && *trmvcs) {
+            Py_BEGIN_ALLOW_THREADS
             termpt_c(method, ilusrc, target, et, fixref, abcorr, corloc, obsrvr,
                      refvec, rolstp, ncuts, schstp, soltol, maxn,
                      *npts, (SpiceDouble (*)[3]) *points, *epochs, (SpiceDouble (*)[3]) *trmvcs);
+            Py_END_ALLOW_THREADS
         }
     }
 %}
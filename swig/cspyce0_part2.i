@@ -4067,8 +4067,10 @@ extern void dskx02_c(
         *fndarr = my_boolean_malloc(nrays, "dskxv");
         *xptarr =  my_malloc(nrays * 3, "dskxv");
         if (*fndarr && *xptarr) {
+            Py_BEGIN_ALLOW_THREADS
             dskxv_c(pri, target, nsurf, srflst, et, fixref, nrays,
                     vtxarr, dirarr, (SpiceDouble (*)[3]) *xptarr, *fndarr);
+            Py_END_ALLOW_THREADS
         }
     }
 %}
@@ -4366,7 +4368,8 @@ extern void ekacei_c(
                     {(SpiceInt ignore, SpiceInt vallen, ConstSpiceChar *cvals)};
 %apply (ConstSpiceInt     IN_ARRAY1[]) {ConstSpiceInt     entszs[]};
 %apply (ConstSpiceBoolean IN_ARRAY1[]) {ConstSpiceBoolean nlflgs[]};
-%apply (ConstSpiceInt     IN_ARRAY1[]) {ConstSpiceInt     rcptrs[]};
+%apply (ConstSpiceInt *IN_ARRAY1, SpiceInt DIM1)
+                {(ConstSpiceInt *rcptrs, SpiceInt nrows)};
 
 %inline %{
     void my_ekaclc_c(
@@ -4376,12 +4379,15 @@ extern void ekacei_c(
         SpiceInt          ignore, SpiceInt vallen, ConstSpiceChar *cvals,
         ConstSpiceInt     entszs[],
         ConstSpiceBoolean nlflgs[],
-        ConstSpiceInt     rcptrs[])
+        ConstSpiceInt     *rcptrs, SpiceInt nrows)
     {
-        SpiceInt wkindx[MAXROWS];
+        // The index workspace needs one element per row of the segment
+        SpiceInt *wkindx = my_int_malloc(nrows, "ekaclc");
+        if (!wkindx) return;
 
         ekaclc_c(handle, segno, column, vallen, cvals, entszs, nlflgs, rcptrs,
                  wkindx);
+        PyMem_Free(wkindx);
     }
 %}
 
@@ -4422,7 +4428,8 @@ extern void ekacei_c(
 %apply (ConstSpiceDouble  IN_ARRAY1[]) {ConstSpiceDouble  dvals[]};
 %apply (ConstSpiceInt     IN_ARRAY1[]) {ConstSpiceInt     entszs[]};
 %apply (ConstSpiceBoolean IN_ARRAY1[]) {ConstSpiceBoolean nlflgs[]};
-%apply (ConstSpiceInt     IN_ARRAY1[]) {ConstSpiceInt     rcptrs[]};
+%apply (ConstSpiceInt *IN_ARRAY1, SpiceInt DIM1)
+                {(ConstSpiceInt *rcptrs, SpiceInt nrows)};
 
 %inline %{
     void my_ekacld_c(
@@ -4432,12 +4439,15 @@ extern void ekacei_c(
         ConstSpiceDouble  dvals[],
         ConstSpiceInt     entszs[],
         ConstSpiceBoolean nlflgs[],
-        ConstSpiceInt     rcptrs[])
+        ConstSpiceInt     *rcptrs, SpiceInt nrows)
     {
-        SpiceInt wkindx[MAXROWS];
+        // The index workspace needs one element per row of the segment
+        SpiceInt *wkindx = my_int_malloc(nrows, "ekacld");
+        if (!wkindx) return;
 
         ekacld_c(handle, segno, column, dvals, entszs, nlflgs, rcptrs,
                  wkindx);
+        PyMem_Free(wkindx);
     }
 %}
 
@@ -4478,7 +4488,8 @@ extern void ekacei_c(
 %apply (ConstSpiceInt     IN_ARRAY1[]) {ConstSpiceInt     ivals[]};
 %apply (ConstSpiceInt     IN_ARRAY1[]) {ConstSpiceInt     entszs[]};
 %apply (ConstSpiceBoolean IN_ARRAY1[]) {ConstSpiceBoolean nlflgs[]};
-%apply (ConstSpiceInt     IN_ARRAY1[]) {ConstSpiceInt     rcptrs[]};
+%apply (ConstSpiceInt *IN_ARRAY1, SpiceInt DIM1)
+                {(ConstSpiceInt *rcptrs, SpiceInt nrows)};
 
 %inline %{
     void my_ekacli_c(
@@ -4488,12 +4499,15 @@ extern void ekacei_c(
         ConstSpiceInt     ivals[],
         ConstSpiceInt     entszs[],
         ConstSpiceBoolean nlflgs[],
-        ConstSpiceInt     rcptrs[])
+        ConstSpiceInt     *rcptrs, SpiceInt nrows)
     {
-        SpiceInt wkindx[MAXROWS];
+        // The index workspace needs one element per row of the segment
+        SpiceInt *wkindx = my_int_malloc(nrows, "ekacli");
+        if (!wkindx) return;
 
         ekacli_c(handle, segno, column, ivals, entszs, nlflgs, rcptrs,
                  wkindx);
+        PyMem_Free(wkindx);
     }
 %}
 
@@ -4973,9 +4987,11 @@ extern void ekgi_c(
 %apply (SpiceInt DIM1, SpiceInt DIM2, ConstSpiceChar *IN_STRINGS)
                     {(SpiceInt ignore, SpiceInt declen, ConstSpiceChar *decls)};
 %apply (SpiceInt *OUTPUT) {SpiceInt *segno};
-%apply (SpiceInt *SIZE1, SpiceInt OUT_ARRAY1[ANY])
-                    {(SpiceInt *nrows1, SpiceInt rcptrs[MAXROWS])};
+%apply (SpiceInt **OUT_ARRAY1, SpiceInt *SIZE1)
+                    {(SpiceInt **rcptrs, SpiceInt *nrows1)};
 
+// The record pointer array is allocated to fit, so a segment of any number of
+// rows can be loaded in one call.
 %inline %{
     void my_ekifld_c(
         SpiceInt       handle,
@@ -4984,11 +5000,16 @@ extern void ekgi_c(
         SpiceInt       ncols, SpiceInt cnamln, ConstSpiceChar *cnames,
         SpiceInt       ignore, SpiceInt declen, ConstSpiceChar *decls,
         SpiceInt       *segno,
-        SpiceInt       *nrows1, SpiceInt rcptrs[MAXROWS])
+        SpiceInt       **rcptrs, SpiceInt *nrows1)
     {
-        *nrows1 = nrows;
-        ekifld_c(handle, tabnam, ncols, nrows, cnamln, cnames, declen, decls,
-                 segno, rcptrs);
+        *nrows1 = 0;
+        if (!my_assert_ge(nrows, 1, "ekifld", "nrows (#) must be at least 1")) return;
+        *rcptrs = my_int_malloc(nrows, "ekifld");
+        if (*rcptrs) {
+            *nrows1 = nrows;
+            ekifld_c(handle, tabnam, ncols, nrows, cnamln, cnames, declen, decls,
+                     segno, *rcptrs);
+        }
     }
 %}
 
@@ -7272,11 +7293,11 @@ VECTORIZE_2d_di_d__2d(hrmesp, my_hrmesp_c)
             "Array dimension error in hrmint: "
             "second yvals dimension = #; should be 2")) return;
 
-        SpiceDouble *work = my_malloc(4 * n + 4, "hrmint");
+        SpiceDouble *work = my_raw_malloc(4 * n + 4, "hrmint");
         if (work) {
             hrmint_c(n, xvals, yvals, x, work, f, df);
         }
-        PyMem_Free(work);
+        PyMem_RawFree(work);
     }
 %}
 
@@ -7853,11 +7874,11 @@ VECTORIZE_2d_di_d__RETURN_d(lgresp, my_lgresp_c)
             "Array dimension mismatch in lgrind: "
             "xvals dimension = #; yvals dimension = #")) return;
 
-        SpiceDouble *work = my_malloc(2 * n + 2, "lgrind");
+        SpiceDouble *work = my_raw_malloc(2 * n + 2, "lgrind");
         if (work) {
             lgrind_c(n, xvals, yvals, work, x, p, dp);
         }
-        PyMem_Free(work);
+        PyMem_RawFree(work);
     }
 %}
 
@@ -11945,5 +11966,184 @@ extern void wnunid_c(
 );
 //CSPYCE_DEFAULT:c:2000
 
+/***********************************************************************
+* Bulk DAS readers
+*
+* These fill a caller-provided Numpy array from consecutive DAS addresses,
+* starting at address first, with one element per address. The number of
+* addresses read is the size of the array. Nothing is allocated or copied.
+* They are used by cspyce/das.py.
+***********************************************************************/
+
+%rename (dasrdd_inplace) my_dasrdd_inplace;
+%apply (void RETURN_VOID) {void my_dasrdd_inplace};
+%apply (SpiceDouble *INPLACE_ARRAY1, SpiceInt DIM1) {(SpiceDouble *data, SpiceInt size)};
+
+%rename (dasrdi_inplace) my_dasrdi_inplace;
+%apply (void RETURN_VOID) {void my_dasrdi_inplace};
+%apply (SpiceInt *INPLACE_ARRAY1, SpiceInt DIM1) {(SpiceInt *data, SpiceInt size)};
+
+%rename (dasrdc_inplace) my_dasrdc_inplace;
+%apply (void RETURN_VOID) {void my_dasrdc_inplace};
+%apply (SpiceChar *INPLACE_ARRAY1, SpiceInt DIM1) {(SpiceChar *data, SpiceInt size)};
+
+%inline %{
+    void my_dasrdd_inplace(
+        SpiceInt    handle,
+        SpiceInt    first,
+        SpiceDouble *data,
+        SpiceInt    size)
+    {
+        if (!my_assert_ge(first, 1, "dasrdd_inplace",
+                          "first (#) must be at least 1")) return;
+        if (size > 0) {
+            dasrdd_c(handle, first, first + size - 1, data);
+        }
+    }
+
+    void my_dasrdi_inplace(
+        SpiceInt    handle,
+        SpiceInt    first,
+        SpiceInt    *data,
+        SpiceInt    size)
+    {
+        if (!my_assert_ge(first, 1, "dasrdi_inplace",
+                          "first (#) must be at least 1")) return;
+        if (size > 0) {
+            dasrdi_c(handle, first, first + size - 1, data);
+        }
+    }
+
+    // The characters are read as a single string spanning the whole buffer,
+    // so no record structure is imposed on them.
+    void my_dasrdc_inplace(
+        SpiceInt    handle,
+        SpiceInt    first,
+        SpiceChar   *data,
+        SpiceInt    size)
+    {
+        if (!my_assert_ge(first, 1, "dasrdc_inplace",
+                          "first (#) must be at least 1")) return;
+        if (size > 0) {
+            dasrdc_c(handle, first, first + size - 1, 0, size - 1, size, data);
+        }
+    }
+%}
+
+/***********************************************************************
+* Bulk EK readers
+*
+* After a query by ekfind, these fill caller-provided Numpy arrays with one
+* element of one selected column, for consecutive rows starting at row first.
+* The number of rows is the size of the nulls array. On return, each entry
+* of nulls is 0 for a value, 1 for a null value, or 2 if the row's entry has
+* no such element. The character reader divides its data array equally among
+* the rows; each string is truncated or zero-padded to fit. They are used by
+* cspyce/ek.py.
+***********************************************************************/
+
+%rename (ekgd_inplace) my_ekgd_inplace;
+%apply (void RETURN_VOID) {void my_ekgd_inplace};
+%apply (SpiceDouble *INPLACE_ARRAY1, SpiceInt DIM1) {(SpiceDouble *data, SpiceInt size)};
+%apply (SpiceChar *INPLACE_ARRAY1, SpiceInt DIM1) {(SpiceChar *nulls, SpiceInt nrows)};
+
+%rename (ekgi_inplace) my_ekgi_inplace;
+%apply (void RETURN_VOID) {void my_ekgi_inplace};
+%apply (SpiceInt *INPLACE_ARRAY1, SpiceInt DIM1) {(SpiceInt *data, SpiceInt size)};
+
+%rename (ekgc_inplace) my_ekgc_inplace;
+%apply (void RETURN_VOID) {void my_ekgc_inplace};
+%apply (SpiceChar *INPLACE_ARRAY1, SpiceInt DIM1) {(SpiceChar *data, SpiceInt size)};
+
+%rename (eknelt_inplace) my_eknelt_inplace;
+%apply (void RETURN_VOID) {void my_eknelt_inplace};
+%apply (SpiceInt *INPLACE_ARRAY1, SpiceInt DIM1) {(SpiceInt *counts, SpiceInt ncounts)};
+
+%inline %{
+    void my_ekgd_inplace(
+        SpiceInt    selidx,
+        SpiceInt    first,
+        SpiceInt    elment,
+        SpiceDouble *data,  SpiceInt size,
+        SpiceChar   *nulls, SpiceInt nrows)
+    {
+        SpiceInt     i;
+        SpiceBoolean null, found;
+
+        if (!my_assert_eq(size, nrows, "ekgd_inplace",
+                          "data size (#) must equal nulls size (#)")) return;
+        for (i = 0; i < nrows; i++) {
+            ekgd_c(selidx, first + i, elment, data + i, &null, &found);
+            if (failed_c()) return;
+            nulls[i] = found ? (null ? 1 : 0) : 2;
+        }
+    }
+
+    void my_ekgi_inplace(
+        SpiceInt    selidx,
+        SpiceInt    first,
+        SpiceInt    elment,
+        SpiceInt    *data,  SpiceInt size,
+        SpiceChar   *nulls, SpiceInt nrows)
+    {
+        SpiceInt     i;
+        SpiceBoolean null, found;
+
+        if (!my_assert_eq(size, nrows, "ekgi_inplace",
+                          "data size (#) must equal nulls size (#)")) return;
+        for (i = 0; i < nrows; i++) {
+            ekgi_c(selidx, first + i, elment, data + i, &null, &found);
+            if (failed_c()) return;
+            nulls[i] = found ? (null ? 1 : 0) : 2;
+        }
+    }
+
+    void my_ekgc_inplace(
+        SpiceInt    selidx,
+        SpiceInt    first,
+        SpiceInt    elment,
+        SpiceChar   *data,  SpiceInt size,
+        SpiceChar   *nulls, SpiceInt nrows)
+    {
+        SpiceInt     i, width, length;
+        SpiceBoolean null, found;
+        SpiceChar    *buffer;
+
+        if (nrows == 0) return;
+        width = size / nrows;
+        if (!my_assert_eq(size, width * nrows, "ekgc_inplace",
+                          "data size (#) must be a multiple of nulls size "
+                          "times string width (#)")) return;
+
+        buffer = my_char_malloc(width + 1, "ekgc_inplace");
+        if (!buffer) return;
+
+        for (i = 0; i < nrows; i++) {
+            buffer[0] = 0;
+            ekgc_c(selidx, first + i, elment, width + 1, buffer, &null, &found);
+            if (failed_c()) break;
+            nulls[i] = found ? (null ? 1 : 0) : 2;
+
+            length = (SpiceInt) strlen(buffer);
+            memcpy(data + i * width, buffer, length);
+            memset(data + i * width + length, 0, width - length);
+        }
+
+        PyMem_Free(buffer);
+    }
+
+    void my_eknelt_inplace(
+        SpiceInt    selidx,
+        SpiceInt    first,
+        SpiceInt    *counts, SpiceInt ncounts)
+    {
+        SpiceInt i;
+
+        for (i = 0; i < ncounts; i++) {
+            counts[i] = eknelt_c(selidx, first + i);
+            if (failed_c()) return;
+        }
+    }
+%}
 
 /**********************************************************************/
@@ -31,6 +31,53 @@
 
 #define NO_ARRAY_DIMENSION -1
 
+/* Process-wide SPICE lock.
+ *
+ * CSPICE is not thread-safe, so every call into it is made while holding this
+ * lock, including the calls made by the error handlers of the typemaps below.
+ * Ordinarily the GIL already serializes the calls, but the long-running
+ * functions release the GIL while they run, so that other Python threads can
+ * continue; the lock keeps any of those threads out of CSPICE until the call
+ * is done. The lock is recursive within a thread, because a Python callback
+ * invoked by CSPICE may itself call cspyce. A thread that must wait for the
+ * lock releases the GIL while it waits.
+ */
+static PyThread_type_lock spice_lock = NULL;
+static unsigned long spice_lock_owner = 0;
+static int spice_lock_depth = 0;
+
+void acquire_spice_lock(void) {
+    unsigned long me = PyThread_get_thread_ident();
+    if (spice_lock_depth > 0 && spice_lock_owner == me) {
+        spice_lock_depth++;
+        return;
+    }
+
+    if (!PyThread_acquire_lock(spice_lock, NOWAIT_LOCK)) {
+        Py_BEGIN_ALLOW_THREADS
+        PyThread_acquire_lock(spice_lock, WAIT_LOCK);
+        Py_END_ALLOW_THREADS
+    }
+
+    spice_lock_owner = me;
+    spice_lock_depth = 1;
+}
+
+void release_spice_lock(void) {
+    if (--spice_lock_depth == 0) {
+        spice_lock_owner = 0;
+        PyThread_release_lock(spice_lock);
+    }
+}
+
+/* After fork(), a child process must not inherit a lock held by a thread that
+ * does not exist in the child. */
+void reinitialize_spice_lock(void) {
+    spice_lock = PyThread_allocate_lock();
+    spice_lock_owner = 0;
+    spice_lock_depth = 0;
+}
+
 /*******************************************************************************
 *******************************************************************************/
 
@@ -462,20 +509,33 @@ void initialize_swig_callback(void) {
 
 %define TEST_FOR_EXCEPTION
 {
-    if (failed_c()) {
-        handle_swig_exception("$symname");
+    if (test_for_exception("$symname")) {
         SWIG_fail;
     }
 }
 %enddef
 
 %{
+// The caller must hold the SPICE lock.
 void handle_swig_exception(const char *symname) {
     chkin_c(symname);
     set_python_exception(symname);
     chkout_c(symname);
     reset_c();
 }
+
+// Raise a Python exception if CSPICE has signaled an error; return 1 if so.
+int test_for_exception(const char *symname) {
+    int failed;
+
+    acquire_spice_lock();
+    failed = failed_c();
+    if (failed) {
+        handle_swig_exception(symname);
+    }
+    release_spice_lock();
+    return failed;
+}
 %}
 
 %define TEST_MALLOC_FAILURE(arg)
@@ -489,6 +549,7 @@ void handle_swig_exception(const char *symname) {
 
 %{
 void handle_malloc_failure(const char* symname) {
+    acquire_spice_lock();
     chkin_c(symname);
     setmsg_c("Failed to allocate memory");
     sigerr_c("SPICE(MALLOCFAILURE)");
@@ -496,6 +557,7 @@ void handle_malloc_failure(const char* symname) {
     PyErr_SetString(USE_RUNTIME_ERRORS ? PyExc_RuntimeError : PyExc_MemoryError,
                     get_exception_message(symname));
     reset_c();
+    release_spice_lock();
 }
 %}
 
@@ -519,6 +581,7 @@ void handle_malloc_failure(const char* symname) {
 
 %{
 void handle_bad_type_error(const char* symname, const char* typename) {
+    acquire_spice_lock();
     chkin_c(symname);
     setmsg_c("Expected #");
     errch_c( "#", typename);
@@ -528,6 +591,7 @@ void handle_bad_type_error(const char* symname, const char* typename) {
         USE_RUNTIME_ERRORS ? PyExc_RuntimeError : PyExc_ValueError,
         get_exception_message(symname));
     reset_c();
+    release_spice_lock();
 }
 %}
 
@@ -543,6 +607,7 @@ void handle_bad_type_error(const char* symname, const char* typename) {
 
 %{
 void handle_invalid_array_shape_1d(const char *symname, PyArrayObject *pyarr, int required) {
+    acquire_spice_lock();
     chkin_c(symname);
     setmsg_c("Invalid array shape (#) in module #; (#) is required");
     errint_c("#", (int) PyArray_DIM(pyarr, 0));
@@ -555,6 +620,7 @@ void handle_invalid_array_shape_1d(const char *symname, PyArrayObject *pyarr, in
         USE_RUNTIME_ERRORS ? PyExc_RuntimeError : PyExc_ValueError,
         get_exception_message(symname));
     reset_c();
+    release_spice_lock();
 }
 %}
 
@@ -569,6 +635,7 @@ void handle_invalid_array_shape_1d(const char *symname, PyArrayObject *pyarr, in
 
 %{
 void handle_invalid_array_shape_2d(const char *symname, PyArrayObject *pyarr, int req0, int req1) {
+    acquire_spice_lock();
     chkin_c(symname);
     setmsg_c("Invalid array shape (#,#) in module #; (#,#) is required");
     errint_c("#", (int) PyArray_DIM(pyarr, 0));
@@ -583,6 +650,7 @@ void handle_invalid_array_shape_2d(const char *symname, PyArrayObject *pyarr, in
         USE_RUNTIME_ERRORS ? PyExc_RuntimeError : PyExc_ValueError,
         get_exception_message(symname));
     reset_c();
+    release_spice_lock();
 }
 %}
 
@@ -597,6 +665,7 @@ void handle_invalid_array_shape_2d(const char *symname, PyArrayObject *pyarr, in
 
 %{
 void handle_invalid_array_shape_x2d(const char *symname, PyArrayObject *pyarr, int req1) {
+    acquire_spice_lock();
     chkin_c(symname);
     setmsg_c("Invalid array shape (#,#) in module #; (*,#) is required");
     errint_c("#", (int) PyArray_DIM(pyarr, 0));
@@ -610,10 +679,47 @@ void handle_invalid_array_shape_x2d(const char *symname, PyArrayObject *pyarr, i
         USE_RUNTIME_ERRORS ? PyExc_RuntimeError : PyExc_ValueError,
         get_exception_message(symname));
     reset_c();
+    release_spice_lock();
 }
 %}
 
 %{
+// If not NULL, a Python function called whenever an input array has to be
+// copied; see cspyce/conversions.py.
+PyObject *CONVERSION_TRACER = NULL;
+
+void set_conversion_tracer(PyObject *tracer) {
+    Py_XDECREF(CONVERSION_TRACER);
+    CONVERSION_TRACER = (tracer == Py_None) ? NULL : tracer;
+    Py_XINCREF(CONVERSION_TRACER);
+}
+
+void trace_conversion(const char *symname, const char *argname,
+                      PyObject *input, PyArrayObject *result) {
+    const char *reason;
+
+    // Conversions of Python and NumPy scalars are cheap and expected
+    if (PyArray_IsAnyScalar(input)) return;
+
+    if (!PyArray_Check(input)) {
+        reason = "sequence";
+    } else if (!PyArray_EquivTypenums(PyArray_TYPE((PyArrayObject *) input),
+                                      PyArray_TYPE(result))) {
+        reason = "dtype";
+    } else {
+        reason = "contiguity";
+    }
+
+    PyObject *value = PyObject_CallFunction(CONVERSION_TRACER, "sssn",
+                                            symname, argname, reason,
+                                            (Py_ssize_t) PyArray_NBYTES(result));
+    if (value) {
+        Py_DECREF(value);
+    } else {
+        PyErr_WriteUnraisable(CONVERSION_TRACER);
+    }
+}
+
 PyArrayObject*
 get_contiguous_array(int typecode, PyObject *input, int min, int max, int flags) {
     if (typecode == NPY_INT && PyArray_Check(input) && PyArray_ISINTEGER((PyArrayObject *)(input))) {
@@ -624,9 +730,12 @@ get_contiguous_array(int typecode, PyObject *input, int min, int max, int flags)
 }
 %}
 
-%define CONVERT_TO_CONTIGUOUS_ARRAY(typecode, input, min, max, result)
+%define CONVERT_TO_CONTIGUOUS_ARRAY(typecode, input, min, max, result, argname)
 {
     result = get_contiguous_array(typecode, input, min, max, NPY_ARRAY_CARRAY_RO);
+    if (CONVERSION_TRACER && result && (PyObject *) result != input) {
+        trace_conversion("$symname", argname, input, result);
+    }
     if (!result) {
         handle_bad_array_conversion("$symname", typecode, input, min, max);
         SWIG_fail;
@@ -666,6 +775,7 @@ get_contiguous_array(int typecode, PyObject *input, int min, int max, int flags)
 extern const char* typecode_string(int typecode);
 
 void handle_bad_array_conversion(const char* symname, int typecode, PyObject *input, int min, int max) {
+    acquire_spice_lock();
     if (!input || !PyArray_Check(input)) {
         setmsg_c("Array of type \"#\" required in module #; "
                  "input argument could not be converted");
@@ -689,6 +799,7 @@ void handle_bad_array_conversion(const char* symname, int typecode, PyObject *in
             USE_RUNTIME_ERRORS ? PyExc_RuntimeError : PyExc_ValueError,
             get_exception_message(symname));
         reset_c();
+        release_spice_lock();
         return;
     } else {
         setmsg_c("Array of type \"#\" required in module #; "
@@ -702,6 +813,7 @@ void handle_bad_array_conversion(const char* symname, int typecode, PyObject *in
     // so we modify it to be what we want.
     set_python_exception(symname);
     reset_c();
+    release_spice_lock();
 }
 %}
 
@@ -755,6 +867,7 @@ void handle_bad_array_conversion(const char* symname, int typecode, PyObject *in
 
 %{
 void handle_bad_sequence_to_list(const char *symname) {
+    acquire_spice_lock();
     chkin_c(symname);
     setmsg_c("Input argument must be a sequence in module #");
     errch_c( "#", symname);
@@ -764,6 +877,7 @@ void handle_bad_sequence_to_list(const char *symname) {
         USE_RUNTIME_ERRORS ? PyExc_RuntimeError : PyExc_TypeError,
         get_exception_message(symname));
     reset_c();
+    release_spice_lock();
 }
 
 void capsule_cleanup(PyObject *capsule) {
@@ -879,7 +993,7 @@ void debug_print_object(PyObject *object, FILE* file) {
 {
 //      $1_type $1_name
 //      (Type IN_ARRAY1[ANY])
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr, "$1_name")
     TEST_INVALID_ARRAY_SHAPE_1D(pyarr, $1_dim0);
 
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
@@ -897,7 +1011,7 @@ void debug_print_object(PyObject *object, FILE* file) {
 //       (Type IN_ARRAY1[ANY], SpiceInt DIM1)
 //       NOT CURRENTLY USED BY CSPICE
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr, "$1_name")
     TEST_INVALID_ARRAY_SHAPE_1D(pyarr, $1_dim0);
 
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
@@ -916,7 +1030,7 @@ void debug_print_object(PyObject *object, FILE* file) {
 //       (SpiceInt DIM1, Type IN_ARRAY1[ANY])
 //       NOT CURRENTLY USED BY CSPICE
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr, "$2_name")
     TEST_INVALID_ARRAY_SHAPE_1D(pyarr, $2_dim0);
 
     $2 = ($2_ltype) PyArray_DATA(pyarr);                        // ARRAY
@@ -936,7 +1050,7 @@ void debug_print_object(PyObject *object, FILE* file) {
 //       $1_type $1_name, $2_type $2_name
 //      (Type *IN_ARRAY1, SpiceInt DIM1)
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr, "$1_name")
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
     $2 = (SpiceInt) PyArray_DIM(pyarr, 0);                      // DIM1
 }
@@ -954,7 +1068,7 @@ void debug_print_object(PyObject *object, FILE* file) {
 //       $1_type $1_name, $2_type $2_name
 //      (SpiceInt DIM1, Type *IN_ARRAY1)
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr, "$2_name")
     $2 = ($2_ltype) PyArray_DATA(pyarr);                        // ARRAY
     $1 = (SpiceInt) PyArray_DIM(pyarr, 0);                      // DIM1
 }
@@ -972,7 +1086,7 @@ void debug_print_object(PyObject *object, FILE* file) {
 //       $1_type $1_name
 //       (Type *IN_ARRAY1), (Type IN_ARRAY1[]
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr, "$1_name")
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
 }
 
@@ -987,7 +1101,7 @@ void debug_print_object(PyObject *object, FILE* file) {
 //       $1_type $1_name, $2_type $2_name
 //      (Type *IN_ARRAY01, SpiceInt DIM1)
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 0, 1, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 0, 1, pyarr, "$1_name")
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
     if (PyArray_NDIM(pyarr) == 0) {
         $2 = NO_ARRAY_DIMENSION;                                // DIM1
@@ -1096,7 +1210,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //       $1_type $1_name
 //      (Type IN_ARRAY2[ANY][ANY])
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$1_name")
     TEST_INVALID_ARRAY_SHAPE_2D(pyarr, $1_dim0, $1_dim1);
 
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
@@ -1114,7 +1228,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //       (Type IN_ARRAY2[ANY][ANY], SpiceInt DIM1, SpiceInt DIM2)
 //       NOT CURRENTLY USED BY CSPICE
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$1_name")
     TEST_INVALID_ARRAY_SHAPE_2D(pyarr, $1_dim0, $1_dim1);
 
 
@@ -1135,7 +1249,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //       (SpiceInt DIM1, SpiceInt DIM2, Type IN_ARRAY2[ANY][ANY])
 //       NOT CURRENTLY USED
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$3_name")
     TEST_INVALID_ARRAY_SHAPE_2D(pyarr, $3_dim0, $3_dim1);
 
     $3 = ($3_ltype) PyArray_DATA(pyarr);		      // ARRAY
@@ -1154,7 +1268,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //       $1_type $1_name, $2_type $2_name, $3_type $3_name
 //      (Type *IN_ARRAY2, SpiceInt DIM1, SpiceInt DIM2)
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$1_name")
 
     $1 = ($1_ltype) PyArray_DATA(pyarr);		      // ARRAY
     $2 = (SpiceInt) PyArray_DIM(pyarr, 0);		      // DIM1
@@ -1173,7 +1287,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //      (SpiceInt DIM1, SpiceInt DIM2, Type *IN_ARRAY2)
 //  NOT CURRENTLY USED BY CSPICE
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$3_name")
 
     $3 = ($3_ltype) PyArray_DATA(pyarr);		         // ARRAY
     $1 = (SpiceInt) PyArray_DIM(pyarr, 0);		         // DIM1
@@ -1191,7 +1305,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 {
 //      (SpiceInt DIM1, Type IN_ARRAY2[][ANY])
 //      $1_type $1_name, $2_type $2_name
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$2_name")
     TEST_INVALID_ARRAY_SHAPE_x2D(pyarr, $2_dim1);
 
     $2 = ($2_ltype) PyArray_DATA(pyarr);		         // ARRAY
@@ -1210,7 +1324,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //      $1_type $1_name, $2_type $2_name
 //      (Type IN_ARRAY2[][ANY], SpiceInt DIM1)
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$1_name")
     TEST_INVALID_ARRAY_SHAPE_x2D(pyarr, $1_dim1);
 
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
@@ -1228,7 +1342,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //      $1_type $1_name
 //      (Type IN_ARRAY2[][ANY])
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$1_name")
     TEST_INVALID_ARRAY_SHAPE_x2D(pyarr, $1_dim1);
 
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
@@ -1249,7 +1363,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //      $1_type $1_name
 //      (SpiceInt DIM1, SpiceInt DIM2, Type *IN_ARRAY2)
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 2, pyarr, "$1_name")
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
 }
 
@@ -1265,7 +1379,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //      $1_type $1_name, $2_type $2_name, $3_type $3_name
 //      (Type *IN_ARRAY12, SpiceInt DIM1, SpiceInt DIM2)
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 2, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 2, pyarr, "$1_name")
 
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
     if (PyArray_NDIM(pyarr) == 1) {
@@ -1288,7 +1402,7 @@ TYPEMAP_IN(ConstSpiceDouble, NPY_DOUBLE)
 //      $1_type $1_name, $2_type $2_name, $3_type $3_name, $4_type $4_name
 //      (Type *IN_ARRAY23, SpiceInt DIM1, SpiceInt DIM2, SpiceInt DIM3)
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 3, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 2, 3, pyarr, "$1_name")
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
     if (PyArray_NDIM(pyarr) == 2) {
         $2 = NO_ARRAY_DIMENSION;                                // DIM1
@@ -2385,6 +2499,78 @@ TYPEMAP_INOUT(SpiceDouble,   NPY_DOUBLE)
 
 #undef TYPEMAP_INOUT
 
+/*******************************************************************************
+* In-place typemap for 1-dimensional buffers:
+*    (Type *INPLACE_ARRAY1, SpiceInt DIM1)
+*
+* The input must already be a writeable, contiguous Numpy array of exactly the
+* right type, in native byte order. The C function writes directly into its memory; nothing is copied
+* and nothing is returned. Any other input raises an exception, because a
+* converted copy would silently receive the results instead of the caller's
+* array. DIM1 is the total number of elements in the array, regardless of its
+* shape.
+*******************************************************************************/
+
+%{
+void handle_bad_inplace_array(const char *symname, int typecode, PyObject *input) {
+    acquire_spice_lock();
+    chkin_c(symname);
+    if (!PyArray_Check(input)) {
+        setmsg_c("Numpy array of type \"#\" required in module #");
+        errch_c("#", typecode_string(typecode));
+        errch_c("#", symname);
+        sigerr_c("SPICE(INVALIDTYPE)");
+    } else if (PyArray_TYPE((PyArrayObject *) input) != typecode) {
+        setmsg_c("Array of type \"#\" required in module #; "
+                 "array of type \"#\" cannot be filled in place");
+        errch_c("#", typecode_string(typecode));
+        errch_c("#", symname);
+        errch_c("#", typecode_string(PyArray_TYPE((PyArrayObject *) input)));
+        sigerr_c("SPICE(INVALIDARRAYTYPE)");
+    } else if (!PyArray_ISNOTSWAPPED((PyArrayObject *) input)) {
+        setmsg_c("Array in module # must be in native byte order "
+                 "to be filled in place");
+        errch_c("#", symname);
+        sigerr_c("SPICE(INVALIDARRAYTYPE)");
+    } else {
+        setmsg_c("Array in module # must be contiguous and writeable "
+                 "to be filled in place");
+        errch_c("#", symname);
+        sigerr_c("SPICE(NONCONTIGUOUSARRAY)");
+    }
+    chkout_c(symname);
+    set_python_exception(symname);
+    reset_c();
+    release_spice_lock();
+}
+%}
+
+%define TYPEMAP_INPLACE(Type, Typecode)
+
+%typemap(in)
+    (Type *INPLACE_ARRAY1, SpiceInt DIM1)
+{
+//      $1_type $1_name, $2_type $2_name
+//      (Type *INPLACE_ARRAY1, SpiceInt DIM1)
+    if (!PyArray_Check($input) ||
+            PyArray_TYPE((PyArrayObject *) $input) != Typecode ||
+            !PyArray_ISNOTSWAPPED((PyArrayObject *) $input) ||
+            !PyArray_ISCARRAY((PyArrayObject *) $input)) {
+        handle_bad_inplace_array("$symname", Typecode, $input);
+        SWIG_fail;
+    }
+    $1 = ($1_ltype) PyArray_DATA((PyArrayObject *) $input);     // ARRAY
+    $2 = (SpiceInt) PyArray_SIZE((PyArrayObject *) $input);     // DIM1
+}
+
+%enddef
+
+TYPEMAP_INPLACE(SpiceChar,   NPY_UBYTE )
+TYPEMAP_INPLACE(SpiceInt,    NPY_INT   )
+TYPEMAP_INPLACE(SpiceDouble, NPY_DOUBLE)
+
+#undef TYPEMAP_INPLACE
+
 
 /*******************************************************************************
 * Typemap for string input
@@ -3066,7 +3252,7 @@ TYPEMAP_RECORDS(ConstSpiceDSKDescr, SpiceDSKDescr)
 //      $1_type $1_name
 //      $1_type *INPUT
 
-    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr)
+    CONVERT_TO_CONTIGUOUS_ARRAY(Typecode, $input, 1, 1, pyarr, "$1_name")
     TEST_INVALID_ARRAY_SHAPE_1D(pyarr, size);
     $1 = ($1_ltype) PyArray_DATA(pyarr);                        // ARRAY
 }
@@ -30,6 +30,21 @@ IS_MACOS = platform.system() == "Darwin"
 IS_WINDOWS = platform.system() == "Windows"
 assert IS_LINUX or IS_MACOS or IS_WINDOWS
 
+# Vectorized functions whose loops may run in parallel under OpenMP. Each one
+# must be pure math that touches no SPICE global state. In particular, none may
+# call chkin or signal an error, because the CSPICE error subsystem and its
+# traceback are global and not thread-safe; that excludes, for example, m2q,
+# axisar, recgeo, and georec.
+PARALLEL_FUNCTIONS = {
+    'cylrec', 'cyllat', 'cylsph', 'det', 'dvdot', 'dvhat', 'latcyl', 'latrec',
+    'latsph', 'mequ', 'mtxm', 'mtxv', 'mxm', 'mxmt', 'mxv', 'q2m', 'qxq',
+    'reccyl', 'reclat', 'recsph', 'rotate', 'rotmat', 'rotvec', 'sphcyl',
+    'sphlat', 'sphrec', 'trace', 'ucrss', 'unorm', 'vadd', 'vcrss', 'vdist',
+    'vdot', 'vequ', 'vhat', 'vlcom', 'vlcom3', 'vminus', 'vnorm', 'vpack',
+    'vperp', 'vproj', 'vrel', 'vscl', 'vsep', 'vsub', 'vtmv', 'vupack',
+    'vzero', 'xpose', 'xpose6',
+}
+
 
 class Indent:
     spaces: int
@@ -263,12 +278,30 @@ class MacroGenerator:
         self.generate_initialize_output_vars()
         # Allocate output arrays
         self.generate_output_buffer_allocation()
-        # Loop through values
-        out('for (int i = 0; i < size; i++) {')
+        # Long loops release the GIL; the caller holds the SPICE lock
+        out('PyThreadState *thread_state = '
+            '(size >= GIL_RELEASE_SIZE) ? PyEval_SaveThread() : NULL;')
+        # Parallel loop for the functions in PARALLEL_FUNCTIONS
+        out('#if defined(_OPENMP)', indent=False)
+        out('if (VECTORIZE_PARALLEL_ ## NAME && size >= PARALLEL_MIN_SIZE) {')
+        with self.indent:
+            out('#pragma omp parallel for schedule(static)', indent=False)
+            out('for (int i = 0; i < size; i++) {')
+            with self.indent:
+                self.generate_cspice_call()
+            out('}')
+        out('} else', )
+        out('#endif', indent=False)
+        out('{')
         with self.indent:
-            self.generate_cspice_call()
-        # End of loop
+            # Loop through values
+            out('for (int i = 0; i < size; i++) {')
+            with self.indent:
+                self.generate_cspice_call()
+            # End of loop
+            out('}')
         out('}')
+        out('if (thread_state) PyEval_RestoreThread(thread_state);')
         # And we're done.
 
     def get_maxdim_and_size(self):
@@ -406,6 +439,7 @@ def create_vectorize_header_file(output_file, input_files=None):
             f.write("\n")
 
         seen = set()
+        func_names = set()
         for input_file in input_files:
             # Print a macro for each line starting with VECTORIZE found in the file
             with open(input_file) as g:
@@ -415,6 +449,23 @@ def create_vectorize_header_file(output_file, input_files=None):
                         if name not in seen:
                             MacroGenerator(name, f).generate_code()
                             seen.add(name)
+                        func_names.add(line[line.index('(') + 1:].split(',')[0]
+                                                                 .strip())
+
+        # Flag the functions whose loops may run in parallel
+        unknown = PARALLEL_FUNCTIONS - func_names
+        if unknown:
+            raise ValueError('Unknown parallel functions: '
+                             + ', '.join(sorted(unknown)))
+
+        f.write('\n%{\n')
+        f.write('/* Vectorized loops of at least this size run in parallel, if '
+                'compiled with OpenMP */\n')
+        f.write('#define PARALLEL_MIN_SIZE 10000\n\n')
+        for func_name in sorted(func_names):
+            flag = int(func_name in PARALLEL_FUNCTIONS)
+            f.write(f'#define VECTORIZE_PARALLEL_{func_name} {flag}\n')
+        f.write('%}\n')
 
 
 if __name__ == '__main__':
@@ -21,6 +21,7 @@
     errdev_c("SET", 256, "NULL");   /* Suppresses default error messages */
     initialize_typemap_globals();
     initialize_swig_callback();
+    reinitialize_spice_lock();
 %}
 
 %typemap(in, numinputs=0)
@@ -0,0 +1,67 @@
+import asyncio
+
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from cspyce.aio import AsyncSpice
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def test_coalescing():
+    times = np.linspace(0., 1.e8, 50)
+
+    async def main():
+        async with AsyncSpice(window=0.05) as aspice:
+            rotations = await asyncio.gather(
+                *[aspice.pxform('J2000', 'ECLIPJ2000', et) for et in times])
+            meters = await asyncio.gather(
+                *[aspice.call('convrt', float(x), 'KM', 'METERS')
+                  for x in range(20)])
+            return (rotations, meters, aspice.requests, aspice.batches)
+
+    (rotations, meters, requests, batches) = asyncio.run(main())
+    assert requests == 70
+    assert batches == 2
+    for (et, rotation) in zip(times, rotations):
+        npt.assert_allclose(rotation, cs.pxform('J2000', 'ECLIPJ2000', et),
+                            atol=1.e-15)
+    npt.assert_allclose(meters, 1000. * np.arange(20))
+
+
+def test_multiple_returns_and_direct_calls():
+    async def main():
+        async with AsyncSpice(window=0.01) as aspice:
+            lat = await asyncio.gather(aspice.reclat([1., 0., 0.]),
+                                       aspice.reclat([0., 2., 0.]))
+
+            # Array-valued requests are submitted on their own
+            vector = await aspice.reclat_vector(np.eye(3))
+            return (lat, vector, aspice.batches)
+
+    (lat, vector, batches) = asyncio.run(main())
+    assert batches == 1
+    npt.assert_allclose(lat[0], [1., 0., 0.])
+    npt.assert_allclose(lat[1], [2., np.pi / 2., 0.])
+    npt.assert_allclose(vector[0], [1., 1., 1.])
+
+
+def test_errors_reach_each_caller():
+    async def main():
+        async with AsyncSpice(window=0.01) as aspice:
+            return await asyncio.gather(
+                aspice.convrt(1., 'KM', 'NOT_A_UNIT'),
+                aspice.convrt(2., 'KM', 'NOT_A_UNIT'),
+                return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, Exception) for result in results)
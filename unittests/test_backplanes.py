@@ -0,0 +1,102 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from cspyce.backplanes import backplanes, fov_directions
+from gettestkernels import CoreKernels, CassiniKernels, download_kernels
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    cs.furnsh(CoreKernels.testMetaKernel)
+    cs.furnsh(CassiniKernels.cassSclk)
+    cs.furnsh(CassiniKernels.cassFk)
+    cs.furnsh(CassiniKernels.cassPck)
+    cs.furnsh(CassiniKernels.cassIk)
+    cs.furnsh(CassiniKernels.satSpk)
+    cs.furnsh(CassiniKernels.cassTourSpk)
+    cs.furnsh(CassiniKernels.cassCk)
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def setup_module(module):
+    download_kernels()
+
+
+ARGS = ('CASSINI_ISS_NAC', None, 'ENCELADUS', 'IAU_ENCELADUS', 'CASSINI')
+
+
+def test_fov_directions():
+    (_, _, bsight, bounds) = cs.getfov(cs.bodn2c('CASSINI_ISS_NAC'))
+    dvecs = fov_directions('CASSINI_ISS_NAC', (4, 6))
+    assert dvecs.shape == (4, 6, 3)
+
+    # The grid is symmetric about the boresight
+    center = dvecs[1:3, 2:4].sum(axis=(0, 1))
+    npt.assert_allclose(cs.vhat(center), cs.vhat(bsight), atol=1.e-12)
+
+
+def test_backplanes():
+    et = cs.str2et('2013 FEB 25 11:50:00 UTC')
+    args = (ARGS[0], et) + ARGS[2:]
+    dvecs = fov_directions('CASSINI_ISS_NAC', (5, 4))
+    planes = backplanes(*args, dvecs=dvecs, method='ELLIPSOID', chunk=7)
+    assert planes['found'].shape == (5, 4)
+    assert planes['intercept'].shape == (5, 4, 3)
+    assert np.any(planes['found'])
+
+    (_, dref, _, _) = cs.getfov(cs.bodn2c('CASSINI_ISS_NAC'))
+    for index in np.ndindex(5, 4):
+        (spoint, _, srfvec, found) = cs.sincpt('ELLIPSOID', 'ENCELADUS', et,
+                                               'IAU_ENCELADUS', 'CN+S',
+                                               'CASSINI', dref, dvecs[index])
+        assert planes['found'][index] == found
+        if not found:
+            assert np.isnan(planes['phase'][index])
+            continue
+
+        (_, _, phase, incdnc, emissn, visibl, lit) = cs.illumf(
+            'ELLIPSOID', 'ENCELADUS', 'SUN', et, 'IAU_ENCELADUS', 'CN+S',
+            'CASSINI', spoint)
+        (radius, lon, lat) = cs.reclat(spoint)
+        npt.assert_allclose(planes['intercept'][index], spoint)
+        assert planes['range'][index] == pytest.approx(cs.vnorm(srfvec))
+        assert planes['longitude'][index] == pytest.approx(lon)
+        assert planes['latitude'][index] == pytest.approx(lat)
+        assert planes['radius'][index] == pytest.approx(radius)
+        assert planes['phase'][index] == pytest.approx(phase)
+        assert planes['incidence'][index] == pytest.approx(incdnc)
+        assert planes['emission'][index] == pytest.approx(emissn)
+        assert planes['visible'][index] == visibl
+        assert planes['lit'][index] == lit
+
+
+def test_backplanes_in_processes():
+    et = cs.str2et('2013 FEB 25 11:50:00 UTC')
+    args = (ARGS[0], et) + ARGS[2:]
+    serial = backplanes(*args, shape=(6, 6), method='ELLIPSOID', chunk=10)
+    pooled = backplanes(*args, shape=(6, 6), method='ELLIPSOID', chunk=10,
+                        processes=2)
+    for name in serial:
+        npt.assert_array_equal(serial[name], pooled[name])
+
+
+def test_backplanes_ignore_use_errors():
+    et = cs.str2et('2013 FEB 25 11:50:00 UTC')
+    args = (ARGS[0], et) + ARGS[2:]
+    expected = backplanes(*args, shape=(6, 6), method='ELLIPSOID')
+    assert not np.all(expected['found'])
+
+    saved = dict(cs.__dict__)
+    try:
+        cs.use_errors()
+        planes = backplanes(*args, shape=(6, 6), method='ELLIPSOID')
+    finally:
+        cs.__dict__.update(saved)
+    for name in expected:
+        npt.assert_array_equal(planes[name], expected[name])
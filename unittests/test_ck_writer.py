@@ -0,0 +1,88 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from cspyce.ck_writer import CkWriter
+from cspyce.daf import DafFile
+
+INST = -999000
+RATE = 1.e-4            # radians per tick; ticks are treated as seconds
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def cmats(sclkdp):
+    return cs.rotate_vector(RATE * np.asarray(sclkdp), 3)
+
+
+def avvs(sclkdp):
+    return np.tile([0., 0., RATE], (len(sclkdp), 1))
+
+
+def chunks(sclkdp, size):
+    for k in range(0, len(sclkdp), size):
+        sclk = sclkdp[k:k + size]
+        yield (sclk, cmats(sclk), avvs(sclk))
+
+
+def test_ck_writer(tmp_path):
+    path = tmp_path / 'attitude.bc'
+
+    # Two runs of data separated by a gap
+    sclkdp = np.concatenate([np.arange(0., 5000., 10.),
+                             np.arange(8000., 12000., 10.)])
+    with CkWriter(path, INST, max_records=300) as writer:
+        writer.write_from(chunks(sclkdp, 77))
+    assert writer.segments > 2
+
+    # Segments meet at shared records, except at the gap
+    with DafFile(path) as daf:
+        dc = daf.summaries()['dc']
+    assert len(dc) == writer.segments
+    assert dc[0, 0] == sclkdp[0]
+    assert dc[-1, 1] == sclkdp[-1]
+    npt.assert_array_equal(dc[1:, 0], dc[:-1, 1])
+
+    # Coverage has exactly one hole, at the gap
+    cover = cs.ckcov(path, INST, False, 'INTERVAL', 0., 'SCLK')
+    npt.assert_array_equal(cover.as_intervals(),
+                           [[0., 4990.], [8000., 11990.]])
+
+    cs.furnsh(path)
+    for sclk in (0., 1234.5, 2990., 4990., 9999.5, 11990.):
+        (cmat, clkout) = cs.ckgp(INST, sclk, 0., 'J2000')
+        assert clkout == sclk
+        npt.assert_allclose(cmat, cs.rotate(RATE * sclk, 3), atol=1.e-12)
+
+
+def test_ck_writer_quaternions(tmp_path):
+    path = tmp_path / 'quats.bc'
+    sclkdp = np.arange(0., 1000., 10.)
+    with CkWriter(path, INST, avflag=False) as writer:
+        writer.write(sclkdp, quats=cs.m2q_vector(cmats(sclkdp)))
+    assert writer.segments == 1
+
+    cs.furnsh(path)
+    (cmat, _) = cs.ckgp(INST, 505., 0., 'J2000')
+    npt.assert_allclose(cmat, cs.rotate(RATE * 505., 3), atol=1.e-12)
+
+
+def test_ck_writer_errors(tmp_path):
+    with pytest.raises(ValueError):
+        CkWriter(tmp_path / 'bad.bc', INST, max_records=1)
+
+    with CkWriter(tmp_path / 'order.bc', INST) as writer:
+        sclkdp = np.array([0., 10., 20.])
+        writer.write(sclkdp, cmats(sclkdp), avvs(sclkdp))
+        with pytest.raises(ValueError):
+            writer.write([15.], cmats([15.]), avvs([15.]))
+        with pytest.raises(ValueError):
+            writer.write([30.], cmats([30.]))
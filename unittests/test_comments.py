@@ -0,0 +1,59 @@
+import cspyce as cs
+import os
+import pytest
+from pathlib import Path
+
+from cspyce.comments import (dafec_lines, dasec_lines, dafac_lines,
+                             dasac_lines, file_comments)
+
+PATH_ = Path(os.path.realpath(__file__)).parent.parent / "unittest_support"
+CK = PATH_ / '17257_17262ra.bc'
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def test_dafec_lines():
+    handle = cs.dafopr(CK)
+    expected = cs.dafec(handle)
+    cs.dafcls(handle)
+
+    handle = cs.dafopr(CK)
+    lines = dafec_lines(handle)
+    assert next(lines) == expected[0]
+    assert [expected[0]] + list(lines) == expected
+    cs.dafcls(handle)
+
+    assert list(file_comments(CK)) == expected
+
+
+def test_dafac_lines(tmp_path):
+    path = tmp_path / 'comments.bc'
+    lines = ['line %d\n' % k for k in range(250)]
+    handle = cs.ckopn(path, 'comments', 140)
+    assert dafac_lines(handle, iter(lines), bufsize=100) == 250
+    assert dafac_lines(handle, 'one more\nand another') == 2
+    cs.dafcls(handle)
+
+    expected = [line.rstrip() for line in lines] + ['one more', 'and another']
+    assert list(file_comments(path)) == expected
+
+
+def test_dasac_lines(tmp_path):
+    path = tmp_path / 'comments.das'
+    lines = ['spice', 'naif', 'python'] * 50
+    handle = cs.dasonw(path, 'TEST', 'comments', 140)
+    assert dasac_lines(handle, lines, bufsize=7) == 150
+    cs.dascls(handle)
+
+    handle = cs.dasopr(path)
+    assert list(dasec_lines(handle)) == lines
+    cs.dascls(handle)
+
+    assert list(file_comments(path)) == lines
@@ -0,0 +1,49 @@
+import warnings
+
+import cspyce as cs
+import numpy as np
+import pytest
+
+from cspyce import conversions
+from cspyce.conversions import ConversionWarning
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    conversions.disable()
+    conversions.reset()
+    cs.kclear()
+    cs.reset()
+
+
+def test_conversions():
+    v = np.array([1., 2., 3.])
+    m = np.arange(9.).reshape(3, 3)
+
+    conversions.enable()
+    cs.vadd(v, v)                                   # no copies
+    cs.vadd([1., 2., 3.], v)                        # sequence
+    cs.vadd(v, v.astype('float32'))                 # dtype
+    cs.mxv(m.T, v)                                  # contiguity
+    cs.vscl(2., v)                                  # scalars are not counted
+    conversions.disable()
+    cs.vadd([1., 2., 3.], [1., 2., 3.])             # not traced
+
+    stats = conversions.stats()
+    assert stats[('vadd', 'v1')].reasons == {'sequence': 1}
+    assert stats[('vadd', 'v2')].reasons == {'dtype': 1}
+    assert stats[('vadd', 'v2')].nbytes == 24
+    assert stats[('mxv', 'm1')] == (1, 72, {'contiguity': 1})
+    assert sum(s.count for s in stats.values()) == 3
+
+
+def test_conversion_warnings():
+    conversions.enable(warn=True, warn_bytes=100)
+    with pytest.warns(ConversionWarning):
+        cs.vadd_vector(np.zeros((10, 3), dtype='float32'), [1., 2., 3.])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', ConversionWarning)
+        cs.vadd([1., 2., 3.], [1., 2., 3.])         # below warn_bytes
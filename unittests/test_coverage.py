@@ -0,0 +1,74 @@
+import cspyce as cs
+import numpy.testing as npt
+import os
+import pytest
+from pathlib import Path
+
+from cspyce.coverage import CoverageIndex
+
+PATH_ = Path(os.path.realpath(__file__)).parent.parent / "unittest_support"
+CK = PATH_ / '17257_17262ra.bc'
+BPC = PATH_ / 'earth_000101_180317_171224.bpc'
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    cs.furnsh(PATH_ / 'naif0012.tls')
+    cs.furnsh(PATH_ / 'cas00171.tsc')
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def test_loaded_kernels(tmp_path):
+    cs.furnsh(CK)
+    cs.furnsh(BPC)
+    index = CoverageIndex()
+    assert len(index.update()) == 2
+    assert index.ids('CK') == [-82000]
+    assert index.ids('PCK') == [3000]
+
+    expected = cs.ckcov(CK, -82000, False, 'INTERVAL', 0., 'TDB')
+    npt.assert_array_equal(index.coverage('CK', -82000),
+                           expected.as_intervals())
+    npt.assert_array_equal(index.coverage('PCK', 3000),
+                           cs.pckcov(BPC, 3000).as_intervals())
+    assert index.coverage('SPK', 699).shape == (0, 2)
+
+    et = expected.as_intervals()[0, 0]
+    assert index.sources('CK', -82000, et) == [os.path.realpath(CK)]
+    assert index.sources('CK', -82000, et - 1.e6) == []
+
+
+def test_loaded_kernels_use_flags():
+    cs.furnsh(CK)
+    saved = dict(cs.__dict__)
+    try:
+        cs.use_flags()
+        index = CoverageIndex()
+        assert len(index.update()) == 1
+    finally:
+        cs.__dict__.update(saved)
+    assert index.ids('CK') == [-82000]
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / 'coverage.json')
+    index = CoverageIndex(path)
+    assert index.update([CK]) == [os.fspath(CK)]
+    index.save()
+
+    index = CoverageIndex(path)
+    assert index.update([CK, BPC]) == [os.fspath(BPC)]
+    npt.assert_array_equal(index.coverage('PCK', 3000),
+                           cs.pckcov(BPC, 3000).as_intervals())
+
+    index.remove(BPC)
+    assert index.ids('PCK') == []
+
+
+def test_not_binary():
+    with pytest.raises(ValueError):
+        CoverageIndex().update([PATH_ / 'pck00010.tpc'])
@@ -0,0 +1,81 @@
+import cspyce as cs
+import numpy.testing as npt
+import os
+import pytest
+from pathlib import Path
+
+import cspyce.daf
+from cspyce.daf import DafFile, daf_summaries, loaded_daf_summaries
+
+PATH_ = Path(os.path.realpath(__file__)).parent.parent / "unittest_support"
+SPKS = [PATH_ / 'de432s.bsp', PATH_ / 'sat164.bsp']
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+@pytest.mark.parametrize("path", SPKS + [PATH_ / '17257_17262ra.bc'])
+def test_daf_summaries(path):
+    summaries = DafFile(path).summaries()
+    handle = cs.dafopr(path)
+    try:
+        cs.dafbfs(handle)
+        k = 0
+        while cs.daffna():
+            (dc, ic) = cs.dafus(cs.dafgs(), 2, 6)
+            npt.assert_array_equal(summaries['dc'][k], dc)
+            npt.assert_array_equal(summaries['ic'][k], ic)
+            assert summaries['name'][k].decode() == cs.dafgn().rstrip()
+            k += 1
+        assert k == len(summaries)
+    finally:
+        cs.dafcls(handle)
+
+
+def test_daf_summary_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('CSPYCE_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(cspyce.daf, '_SUMMARY_CACHE', {})
+    expected = DafFile(SPKS[0]).summaries()
+    npt.assert_array_equal(daf_summaries(SPKS[0]), expected)
+    assert len(list(tmp_path.glob('*.npz'))) == 1
+
+    # A fresh process would read the summaries back from disk
+    monkeypatch.setattr(cspyce.daf, '_SUMMARY_CACHE', {})
+    npt.assert_array_equal(daf_summaries(SPKS[0]), expected)
+
+    for spk in SPKS:
+        cs.furnsh(spk)
+    summaries = loaded_daf_summaries()
+    assert list(summaries) == [str(spk) for spk in SPKS]
+
+
+def test_summary_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('CSPYCE_CACHE_DIR', str(tmp_path))
+    assert cspyce.daf.summary_cache_dir() == str(tmp_path)
+
+    # By default, the cache is private to the user
+    monkeypatch.delenv('CSPYCE_CACHE_DIR')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert cspyce.daf.summary_cache_dir() == str(tmp_path / 'cspyce')
+    monkeypatch.delenv('XDG_CACHE_HOME')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    assert cspyce.daf.summary_cache_dir() == str(tmp_path / '.cache' /
+                                                 'cspyce')
+
+
+def test_loaded_daf_summaries_use_flags(tmp_path, monkeypatch):
+    monkeypatch.setenv('CSPYCE_CACHE_DIR', str(tmp_path))
+    cs.furnsh(SPKS[0])
+    saved = dict(cs.__dict__)
+    try:
+        cs.use_flags()
+        summaries = loaded_daf_summaries()
+    finally:
+        cs.__dict__.update(saved)
+    assert list(summaries) == [str(SPKS[0])]
@@ -88,3 +88,55 @@ def test_read_works_with_file(tmp_path):
     assert list(cs.dasrdd(handle, 1, 6)) == [100., 200., 300., 400., 500., 600.]
     assert cs.dasrdc(handle, 1, 10, 0, 9) == ['abcdefghij']
     cs.dascls(handle)
+
+def test_bulk_reads_into_buffers(das_handle):
+    from cspyce.das import dasrdd_into, dasrdi_into, dasrdc_into
+
+    cs.dasadi(das_handle, np.arange(1000))
+    cs.dasadd(das_handle, np.arange(1000) / 4.)
+    cs.dasadc(das_handle, 20, 0, 9, ['abcdefghij', 'ABCDEFGHIJ'])
+
+    ints = np.zeros(990, dtype=np.int32)
+    assert dasrdi_into(das_handle, 11, ints) is ints
+    npt.assert_array_equal(ints, np.arange(10, 1000))
+
+    doubles = np.zeros(1000)
+    dasrdd_into(das_handle, 1, doubles)
+    npt.assert_array_equal(doubles, np.arange(1000) / 4.)
+
+    chars = np.zeros(4, dtype='S5')
+    dasrdc_into(das_handle, 1, chars)
+    assert list(chars) == [b'abcde', b'fghij', b'ABCDE', b'FGHIJ']
+
+    # Arrays that cannot be filled in place are rejected, not copied
+    with pytest.raises(ValueError):
+        dasrdd_into(das_handle, 1, np.zeros(10, dtype=np.float32))
+    with pytest.raises(ValueError):
+        dasrdi_into(das_handle, 1, np.zeros(20, dtype=np.int32)[::2])
+    with pytest.raises(ValueError):
+        swapped = np.dtype(np.float64).newbyteorder()
+        dasrdd_into(das_handle, 1, np.zeros(10, dtype=swapped))
+
+    # A string buffer is filled by bytes, up to the last address only
+    from cspyce.das import dasrd_array
+    chars = np.full(3, b'*****', dtype='S5')
+    result = dasrd_array(das_handle, 'C', 1, 7, chars)
+    assert bytes(result) == b'abcdefg'
+    assert list(chars) == [b'abcde', b'fg***', b'*****']
+    with pytest.raises(ValueError):
+        dasrd_array(das_handle, 'C', 1, 16, chars)
+
+def test_chunked_reads(das_handle):
+    from cspyce.das import dasrd_chunks
+
+    cs.dasadd(das_handle, np.arange(1000.))
+    chunks = list(dasrd_chunks(das_handle, 'D', chunk=300))
+    assert [address for (address, _) in chunks] == [1, 301, 601, 901]
+    assert [len(array) for (_, array) in chunks] == [300, 300, 300, 100]
+    npt.assert_array_equal(np.concatenate([array for (_, array) in chunks]),
+                           np.arange(1000.))
+
+    total = 0.
+    for (_, array) in dasrd_chunks(das_handle, 'D', 101, 200, chunk=30, reuse=True):
+        total += array.sum()
+    assert total == np.arange(100., 200.).sum()
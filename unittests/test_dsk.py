@@ -0,0 +1,67 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from cspyce.dsk import dsk02_mesh, dsk02_vertex_chunks, dsk02_plate_chunks
+from gettestkernels import ExtraKernels, download_kernels
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def setup_module(module):
+    download_kernels()
+
+
+@pytest.fixture
+def segment():
+    handle = cs.dasopr(ExtraKernels.phobosDsk)
+    dladsc = cs.dlabfs(handle)
+    yield (handle, dladsc)
+    cs.dascls(handle)
+
+
+def test_dsk02_mesh(segment):
+    (handle, dladsc) = segment
+    (nv, np_) = cs.dskz02(handle, dladsc)
+    (vertices, plates) = dsk02_mesh(handle, dladsc)
+    assert vertices.shape == (nv, 3)
+    assert plates.shape == (np_, 3)
+    npt.assert_array_equal(vertices, cs.dskv02(handle, dladsc, 1, nv))
+    npt.assert_array_equal(plates, cs.dskp02(handle, dladsc, 1, np_))
+
+    with pytest.raises(ValueError):
+        dsk02_mesh(handle, dladsc, vertices=np.empty((nv, 3), dtype='f4'))
+
+
+def test_dsk02_mesh_memmap(segment, tmp_path):
+    (handle, dladsc) = segment
+    (vertices, plates) = dsk02_mesh(handle, dladsc)
+    dsk02_mesh(handle, dladsc, filename=tmp_path / 'phobos')
+    npt.assert_array_equal(np.load(tmp_path / 'phobos_vertices.npy',
+                                   mmap_mode='r'), vertices)
+    npt.assert_array_equal(np.load(tmp_path / 'phobos_plates.npy',
+                                   mmap_mode='r'), plates)
+
+
+def test_dsk02_chunks(segment):
+    (handle, dladsc) = segment
+    (vertices, plates) = dsk02_mesh(handle, dladsc)
+
+    chunks = list(dsk02_vertex_chunks(handle, dladsc, chunk=1000))
+    assert [start for (start, _) in chunks] == list(range(1, len(vertices) + 1,
+                                                          1000))
+    npt.assert_array_equal(np.concatenate([c for (_, c) in chunks]), vertices)
+
+    result = np.empty_like(plates)
+    for (start, chunk) in dsk02_plate_chunks(handle, dladsc, chunk=777,
+                                             reuse=True):
+        result[start - 1:start - 1 + len(chunk)] = chunk
+    npt.assert_array_equal(result, plates)
@@ -0,0 +1,165 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from cspyce.ek import EK_TIME, ekfetch, ekfetch_chunks, write_ek_table
+
+TABLE = 'TEST_TABLE_EKFETCH'
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+@pytest.fixture
+def ek_file(tmp_path):
+    path = tmp_path / 'ekfetch.ek'
+    handle = cs.ekopn(path, 'ekfetch', 0)
+    decls = ['DATATYPE = DOUBLE PRECISION, NULLS_OK = TRUE',
+             'DATATYPE = INTEGER, NULLS_OK = TRUE',
+             'DATATYPE = CHARACTER*(8), NULLS_OK = TRUE',
+             'DATATYPE = INTEGER, SIZE = VARIABLE']
+    segno = cs.ekbseg(handle, TABLE, ['D1', 'I1', 'C1', 'V1'], decls)
+    for row in range(10):
+        recno = cs.ekappr(handle, segno)
+        cs.ekaced(handle, segno, recno, 'D1', [row / 2.], row == 3)
+        cs.ekacei(handle, segno, recno, 'I1', [row * 10], row == 5)
+        cs.ekacec(handle, segno, recno, 'C1', ['row%d' % row], False)
+        cs.ekacei(handle, segno, recno, 'V1', list(range(row % 3 + 1)), False)
+
+    cs.ekcls(handle)
+    cs.furnsh(path)
+    yield path
+    cs.kclear()
+
+
+QUERY = 'SELECT D1, I1, C1, V1 FROM %s ORDER BY I1' % TABLE
+
+
+def test_ekfetch(ek_file):
+    columns = ekfetch(QUERY)
+    assert list(columns) == ['D1', 'I1', 'C1', 'V1']
+
+    # Nulls sort first
+    rows = [5] + [r for r in range(10) if r != 5]
+    npt.assert_array_equal(columns['I1'].mask, [r == 5 for r in rows])
+    npt.assert_array_equal(columns['I1'].compressed(),
+                           [10 * r for r in rows if r != 5])
+    npt.assert_array_equal(columns['D1'].mask, [r == 3 for r in rows])
+    npt.assert_array_equal(columns['D1'].compressed(),
+                           [r / 2. for r in rows if r != 3])
+    assert columns['C1'].dtype == np.dtype('S8')
+    assert list(columns['C1']) == [b'row%d' % r for r in rows]
+
+    assert columns['V1'].shape == (10, 3)
+    for (k, r) in enumerate(rows):
+        count = r % 3 + 1
+        assert list(columns['V1'][k].compressed()) == list(range(count))
+
+    # Compare against the element-by-element readers
+    nmrows = cs.ekfind(QUERY)
+    for row in range(nmrows):
+        (value, null) = cs.ekgi(1, row, 0)
+        assert null == columns['I1'].mask[row]
+        if not null:
+            assert value == columns['I1'][row]
+
+
+def test_ekfetch_use_flags(ek_file):
+    expected = ekfetch(QUERY)
+    saved = dict(cs.__dict__)
+    try:
+        cs.use_flags()
+        columns = ekfetch(QUERY)
+    finally:
+        cs.__dict__.update(saved)
+    npt.assert_array_equal(columns['I1'], expected['I1'])
+
+
+def test_ekfetch_unmasked(ek_file):
+    columns = ekfetch(QUERY, masked=False)
+    assert not isinstance(columns['I1'], np.ma.MaskedArray)
+    assert columns['I1'][0] == 0
+    assert columns['V1'][1, 2] == 0
+
+
+def test_ekfetch_chunks(ek_file):
+    columns = ekfetch(QUERY)
+    chunks = list(ekfetch_chunks(QUERY, chunk=4))
+    assert [len(chunk['D1']) for chunk in chunks] == [4, 4, 2]
+    for name in ('D1', 'I1', 'C1'):
+        merged = np.ma.concatenate([chunk[name] for chunk in chunks])
+        npt.assert_array_equal(merged, columns[name])
+        npt.assert_array_equal(np.ma.getmaskarray(merged),
+                               np.ma.getmaskarray(columns[name]))
+
+
+def test_write_ek_table(tmp_path):
+    path = tmp_path / 'written.ek'
+    counts = np.ma.MaskedArray(np.arange(25) * 3, mask=(np.arange(25) == 7))
+    columns = {'ET': np.linspace(0., 1.e6, 25),
+               'COUNT': counts,
+               'NAME': np.array(['item%d' % k for k in range(25)]),
+               'VEC': np.arange(75.).reshape(25, 3)}
+    assert write_ek_table(path, 'WRITTEN', columns, segment_rows=10,
+                          time_columns=['ET'], indexed=['COUNT']) == 3
+
+    cs.furnsh(path)
+    fetched = ekfetch('SELECT ET, COUNT, NAME, VEC FROM WRITTEN ORDER BY ET')
+    npt.assert_array_equal(fetched['ET'], columns['ET'])
+    npt.assert_array_equal(fetched['COUNT'].mask, counts.mask)
+    npt.assert_array_equal(fetched['COUNT'].compressed(), counts.compressed())
+    assert list(fetched['NAME']) == [name.encode() for name in columns['NAME']]
+    npt.assert_array_equal(fetched['VEC'], columns['VEC'])
+
+    # Structured arrays are accepted too
+    records = np.zeros(4, dtype=[('x', 'f8'), ('n', 'i4')])
+    records['x'] = [1., 2., 3., 4.]
+    records['n'] = [4, 3, 2, 1]
+    write_ek_table(tmp_path / 'records.ek', 'RECORDS', records)
+    cs.furnsh(tmp_path / 'records.ek')
+    fetched = ekfetch('SELECT X, N FROM RECORDS ORDER BY N', masked=False)
+    npt.assert_array_equal(fetched['X'], [4., 3., 2., 1.])
+
+
+def test_write_ek_table_large_indexed_segment(tmp_path):
+    # The column index workspace must hold every row of the segment
+    path = tmp_path / 'large.ek'
+    nrows = 2500
+    rng = np.random.default_rng(1)
+    columns = {'ET': rng.permutation(nrows) * 10.,
+               'COUNT': rng.permutation(nrows).astype('int32'),
+               'NAME': np.array(['n%05d' % k for k in rng.permutation(nrows)])}
+    assert write_ek_table(path, 'LARGE', columns,
+                          indexed=['ET', 'COUNT', 'NAME']) == 1
+
+    cs.furnsh(path)
+    fetched = ekfetch('SELECT ET, COUNT, NAME FROM LARGE ORDER BY COUNT',
+                      masked=False)
+    order = np.argsort(columns['COUNT'])
+    npt.assert_array_equal(fetched['COUNT'], np.arange(nrows))
+    npt.assert_array_equal(fetched['ET'], columns['ET'][order])
+    assert list(fetched['NAME']) == [name.encode()
+                                     for name in columns['NAME'][order]]
+
+
+def test_write_ek_table_column_options(tmp_path):
+    # Column names are case-insensitive in every argument
+    path = tmp_path / 'options.ek'
+    write_ek_table(path, 'OPTIONS', {'time': np.arange(5.), 'n': np.arange(5)},
+                   time_columns=['time'], indexed=['time'])
+    cs.furnsh(path)
+    (column, _, dtype, _, _, indexd, _) = cs.ekcii('OPTIONS', 0)
+    assert column == 'TIME'
+    assert dtype == EK_TIME
+    assert indexd
+
+    with pytest.raises(ValueError):
+        write_ek_table(tmp_path / 'bad.ek', 'BAD', {'n': np.arange(5)},
+                       indexed=['m'])
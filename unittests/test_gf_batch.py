@@ -0,0 +1,139 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from gettestkernels import (
+    CoreKernels,
+    CassiniKernels,
+    download_kernels,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    # yield for test
+    yield
+    # clear kernel pool again
+    cs.kclear()
+    cs.reset()
+
+
+def setup_module(module):
+    download_kernels()
+
+
+def test_gfoclt_batch():
+    cs.furnsh(CoreKernels.testMetaKernel)
+    et0 = cs.str2et("2001 DEC 01 00:00:00 TDB")
+    et1 = cs.str2et("2002 JAN 01 00:00:00 TDB")
+    cnfine = cs.SpiceCell(typeno=1, size=2)
+    cnfine = cs.wninsd(et0, et1, cnfine)
+    backs = ["sun", "mars"]
+    results = cs.gfoclt_batch("any", "moon", "ellipsoid", "iau_moon",
+                              backs, "ellipsoid", ["iau_sun", "iau_mars"],
+                              "lt", "earth", 180.0, cnfine)
+    assert list(results) == backs
+    for back, frame in zip(backs, ["iau_sun", "iau_mars"]):
+        expected = cs.gfoclt("any", "moon", "ellipsoid", "iau_moon",
+                             back, "ellipsoid", frame, "lt", "earth", 180.0,
+                             cnfine)
+        assert len(results[back]) == len(expected)
+        npt.assert_array_almost_equal(results[back].as_array(),
+                                      expected.as_array(), decimal=3)
+
+
+def test_gftfov_batch():
+    cs.furnsh(CoreKernels.testMetaKernel)
+    cs.furnsh(CassiniKernels.cassCk)
+    cs.furnsh(CassiniKernels.cassFk)
+    cs.furnsh(CassiniKernels.cassIk)
+    cs.furnsh(CassiniKernels.cassPck)
+    cs.furnsh(CassiniKernels.cassSclk)
+    cs.furnsh(CassiniKernels.cassTourSpk)
+    cs.furnsh(CassiniKernels.satSpk)
+    cnfine = np.array([[cs.str2et("2013-FEB-25 07:20:00.000"),
+                        cs.str2et("2013-FEB-25 11:45:00.000")],
+                       [cs.str2et("2013-FEB-25 11:55:00.000"),
+                        cs.str2et("2013-FEB-26 14:25:00.000")]])
+    targets = ["ENCELADUS", "TITAN"]
+    frames = ["IAU_ENCELADUS", "IAU_TITAN"]
+    results = cs.gftfov_batch("CASSINI_ISS_NAC", targets, "ELLIPSOID", frames,
+                              "LT", "CASSINI", 10.0, cnfine)
+    sTimout = "YYYY-MON-DD HR:MN:SC UTC ::RND"
+    result = results["ENCELADUS"]
+    assert len(result) == 4
+    assert cs.timout(result[0], sTimout) == "2013-FEB-25 10:42:33 UTC"
+    assert cs.timout(result[1], sTimout) == "2013-FEB-25 11:45:00 UTC"
+    assert cs.timout(result[2], sTimout) == "2013-FEB-25 11:55:00 UTC"
+    assert cs.timout(result[3], sTimout) == "2013-FEB-25 12:04:30 UTC"
+
+    # The pre-scan must not change the answer
+    unscanned = cs.gftfov_batch("CASSINI_ISS_NAC", targets, "ELLIPSOID",
+                                frames, "LT", "CASSINI", 10.0, cnfine,
+                                prescan=False)
+    for target in targets:
+        npt.assert_array_almost_equal(results[target].as_array(),
+                                      unscanned[target].as_array(), decimal=3)
+
+
+def test_gfsep_batch_in_processes():
+    cs.furnsh(CoreKernels.testMetaKernel)
+    et0 = cs.str2et("2007 JAN 01")
+    et1 = cs.str2et("2007 JUL 01")
+    cnfine = cs.SpiceCell(typeno=1, size=2)
+    cnfine = cs.wninsd(et0, et1, cnfine)
+    targs2 = ["SUN", "SSB"]
+    results = cs.gfsep_batch("MOON", "SPHERE", "NULL", targs2, "POINT", "NULL",
+                             "NONE", "EARTH", "LOCMAX", 0.0, 0.0, 6.0 * 86400.0,
+                             1000, cnfine, processes=2)
+    for targ2 in targs2:
+        expected = cs.gfsep("MOON", "SPHERE", "NULL", targ2, "POINT", "NULL",
+                            "NONE", "EARTH", "LOCMAX", 0.0, 0.0, 6.0 * 86400.0,
+                            1000, cnfine)
+        npt.assert_array_equal(results[targ2].as_array(), expected.as_array())
+
+
+def test_gf_batch_prescan_tolerance():
+    from cspyce.gf_batch import _candidate_window, ANGLE_TOLERANCE
+    times = np.arange(10.)
+    interval_ids = np.zeros(10, dtype=int)
+
+    # A grazing approach, just outside the FOV by less than the aberration
+    excess = np.full(10, 0.5 * ANGLE_TOLERANCE)
+    excess[5] = 0.2 * ANGLE_TOLERANCE
+    window = _candidate_window(times, interval_ids, excess)
+    npt.assert_array_equal(window, [[0., 9.]])
+
+    # A target that stays well outside is still excluded
+    excess = np.full(10, 10. * ANGLE_TOLERANCE)
+    assert len(_candidate_window(times, interval_ids, excess)) == 0
+
+
+@pytest.mark.parametrize("use", ["use_errors", "use_flags"])
+def test_gf_batch_ignores_use_errors(use):
+    cs.furnsh(CoreKernels.testMetaKernel)
+    et0 = cs.str2et("2001 DEC 01 00:00:00 TDB")
+    et1 = cs.str2et("2002 JAN 01 00:00:00 TDB")
+    cnfine = np.array([[et0, et1]])
+    expected = cs.gfoclt_batch("any", "moon", "ellipsoid", "iau_moon",
+                               ["sun"], "ellipsoid", "iau_sun", "lt", "earth",
+                               180.0, cnfine)
+    saved = dict(cs.__dict__)
+    try:
+        getattr(cs, use)()
+        results = cs.gfoclt_batch("any", "moon", "ellipsoid", "iau_moon",
+                                  ["sun"], "ellipsoid", "iau_sun", "lt",
+                                  "earth", 180.0, cnfine)
+        # The worker processes are given the loaded kernels
+        in_processes = cs.gfoclt_batch("any", "moon", "ellipsoid", "iau_moon",
+                                       ["sun"], "ellipsoid", "iau_sun", "lt",
+                                       "earth", 180.0, cnfine, processes=1)
+    finally:
+        cs.__dict__.update(saved)
+    npt.assert_array_equal(results["sun"].as_array(),
+                           expected["sun"].as_array())
+    npt.assert_array_equal(in_processes["sun"].as_array(),
+                           expected["sun"].as_array())
@@ -0,0 +1,63 @@
+import io
+
+import cspyce as cs
+import numpy as np
+import pytest
+
+from cspyce import instrument
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    instrument.disable()
+    instrument.reset()
+    cs.kclear()
+    cs.reset()
+
+
+def test_instrument():
+    original = cs.reclat
+    with instrument.instrumented():
+        assert instrument.is_enabled()
+        assert cs.reclat is not original
+        cs.reclat([1., 0., 0.])
+        cs.reclat([0., 1., 0.])
+        cs.reclat.vector(np.eye(3))
+        with pytest.raises(KeyError):
+            cs.bodn2c.error('NOT_A_BODY_NAME')
+
+    assert not instrument.is_enabled()
+    assert cs.reclat is original
+    cs.reclat([1., 0., 0.])                 # not counted
+
+    stats = instrument.stats()
+    assert stats['reclat'].calls == 2
+    assert stats['reclat_vector'].calls == 1
+    assert stats['bodn2c_error'].calls == 1
+    assert sum(stats['reclat'].histogram) == 2
+    assert 0. < stats['reclat'].inner <= stats['reclat'].total
+    assert stats['reclat'].overhead == pytest.approx(stats['reclat'].total -
+                                                     stats['reclat'].inner)
+    assert instrument.stats(inner=True)['reclat'].calls == 2
+
+    output = io.StringIO()
+    instrument.report(file=output)
+    assert 'reclat_vector' in output.getvalue()
+
+    instrument.reset()
+    assert instrument.stats() == {}
+
+
+def test_instrument_restores_switched_versions():
+    original = cs.bodn2c
+    try:
+        instrument.enable()
+        cs.use_flags(cs.bodn2c)
+        instrument.disable()
+        assert cs.bodn2c is original.flag
+        assert not hasattr(cs.bodn2c, 'ORIGINAL')
+    finally:
+        cs.bodn2c = original
@@ -0,0 +1,120 @@
+import cspyce as cs
+import numpy as np
+import pytest
+
+from cspyce.kernel_cache import use_kernel_cache
+
+KERNEL1 = """KPL/PCK
+
+A test kernel.
+
+\\begindata
+
+BODY999_RADII = ( 1.0 2.0
+                  3.0 )
+CACHE_NAMES   = ( 'A = B', 'TWO' )
+CACHE_INT     = 7
+
+\\begintext
+"""
+
+KERNEL2 = """KPL/FK
+\\begindata
+CACHE_OTHER = 5
+"""
+
+KERNEL3 = """KPL/FK
+\\begindata
+CACHE_OTHER += 6
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    use_kernel_cache(None)
+    cs.kclear()
+    cs.reset()
+
+
+def test_kernel_cache(tmp_path):
+    paths = []
+    for (k, text) in enumerate([KERNEL1, KERNEL2, KERNEL3]):
+        paths.append(tmp_path / ('kernel%d.tk' % k))
+        paths[-1].write_text(text)
+
+    cache = use_kernel_cache(tmp_path / 'cache')
+    cs.furnsh(paths[0])
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    cs.kclear()
+    cs.furnsh(paths[0])
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert list(cs.gdpool('BODY999_RADII')) == [1., 2., 3.]
+    assert list(cs.gcpool('CACHE_NAMES')) == ['A = B', 'TWO']
+    assert list(cs.gipool('CACHE_INT')) == [7]
+    assert cs.ktotal('TEXT') == 1
+    assert cache.source(cs.kdata(0, 'TEXT')[0]) == str(paths[0])
+
+    # Unloading another text kernel keeps the cached variables
+    cs.furnsh(paths[1])
+    cs.unload(paths[1])
+    assert not cs.dtpool.flag('CACHE_OTHER')[0]
+    assert list(cs.gdpool('BODY999_RADII')) == [1., 2., 3.]
+
+    cs.unload(paths[0])
+    assert not cs.dtpool.flag('BODY999_RADII')[0]
+    assert cs.ktotal('TEXT') == 0
+
+    # A kernel using "+=" is never cached
+    cs.furnsh(paths[1])
+    cs.furnsh(paths[2])
+    cs.furnsh(paths[2])
+    assert list(cs.gdpool('CACHE_OTHER')) == [5., 6.]
+    assert cache.hits == 2                  # paths[1] was reloaded
+
+
+def test_kernel_cache_reload(tmp_path):
+    path = tmp_path / 'kernel.tk'
+    path.write_text(KERNEL1)
+    cache = use_kernel_cache(tmp_path / 'cache')
+
+    # The second furnsh replaces the original with the stub
+    cs.furnsh(path)
+    cs.furnsh(path)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cs.ktotal('TEXT') == 1
+    assert list(cs.gdpool('BODY999_RADII')) == [1., 2., 3.]
+
+    cs.unload(path)
+    assert cs.ktotal('TEXT') == 0
+    assert not cs.dtpool.flag('BODY999_RADII')[0]
+
+    # The cache file holds no pickled objects
+    (cache_file,) = (tmp_path / 'cache').glob('*.npz')
+    with np.load(cache_file, allow_pickle=False) as saved:
+        assert list(saved['names']) == ['BODY999_RADII', 'CACHE_NAMES',
+                                        'CACHE_INT']
+
+
+def worker_gdpool(name):
+    return list(cs.gdpool(name))
+
+
+def test_kernel_cache_in_workers(tmp_path):
+    from cspyce.parallel import Executor, loaded_kernels
+
+    path = tmp_path / 'kernel.tk'
+    path.write_text(KERNEL1)
+    use_kernel_cache(tmp_path / 'cache')
+    cs.furnsh(path)
+    cs.kclear()
+    cs.furnsh(path)                         # loaded from the cache
+
+    # Workers have no cache; they are given the original kernel
+    assert loaded_kernels() == [str(path)]
+    with Executor(processes=1) as executor:
+        values = executor.submit(worker_gdpool, 'BODY999_RADII').result()
+    assert values == [1., 2., 3.]
@@ -0,0 +1,134 @@
+import cspyce as cs
+import pytest
+
+from cspyce.memoize import memoize, unmemoize, cache_info
+from gettestkernels import CoreKernels, download_kernels
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    unmemoize()
+    cs.kclear()
+    cs.reset()
+
+
+def setup_module(module):
+    download_kernels()
+
+
+def test_pool_generation():
+    generation = cs.pool_generation()
+    cs.pdpool('MEMOIZE_TEST', [1., 2.])
+    assert cs.pool_generation() == generation + 1
+    cs.gdpool('MEMOIZE_TEST')
+    assert cs.pool_generation() == generation + 1
+    cs.kclear()
+    assert cs.pool_generation() == generation + 2
+
+
+def test_memoize_gdpool():
+    memoize('gdpool', maxsize=2)
+    cs.pdpool('MEMOIZE_TEST', [1., 2.])
+
+    values = cs.gdpool('MEMOIZE_TEST')
+    assert list(values) == [1., 2.]
+    values[0] = 99.                         # results are copies
+    assert list(cs.gdpool('MEMOIZE_TEST')) == [1., 2.]
+    assert cache_info()['gdpool'] == (1, 1, 1, 2)
+
+    # Writing to the pool invalidates the cache
+    cs.pdpool('MEMOIZE_TEST', [3.])
+    assert list(cs.gdpool('MEMOIZE_TEST')) == [3.]
+    assert cache_info()['gdpool'].size == 1
+
+    # Least recently used results are dropped
+    cs.pdpool('MEMOIZE_A', [1.])
+    cs.pdpool('MEMOIZE_B', [2.])
+    cs.gdpool('MEMOIZE_A')
+    cs.gdpool('MEMOIZE_B')
+    cs.gdpool('MEMOIZE_TEST')
+    assert cache_info()['gdpool'].size == 2
+
+    # Exceptions are not cached
+    cs.kclear()
+    with pytest.raises(KeyError):
+        cs.gdpool('MEMOIZE_TEST')
+    cs.pdpool('MEMOIZE_TEST', [4.])
+    assert list(cs.gdpool('MEMOIZE_TEST')) == [4.]
+
+
+def test_memoize_bodies():
+    memoize()
+    assert cs.bodn2c('MARS') == 499
+    cs.boddef('MEMOIZE_BODY', -999999)
+    assert cs.bodn2c('MEMOIZE_BODY') == -999999
+    assert cs.bodc2n.vector is cs.bodc2n.MEMOIZED.vector
+
+    unmemoize('bodn2c')
+    assert 'bodn2c' not in cache_info()
+    assert 'bodc2n' in cache_info()
+
+    with pytest.raises(ValueError):
+        memoize('spkezr')
+
+
+def test_memoize_str2et_timdef():
+    cs.furnsh(CoreKernels.lsk)
+    memoize('str2et')
+    system = cs.timdef('GET', 'SYSTEM')
+    try:
+        cs.timdef('SET', 'SYSTEM', 'UTC')
+        utc = cs.str2et('2000 JAN 01 12:00:00')
+        assert utc != 0.
+
+        # Setting a time default invalidates the cache
+        generation = cs.pool_generation()
+        cs.timdef('SET', 'SYSTEM', 'TDB')
+        assert cs.pool_generation() == generation + 1
+        assert cs.str2et('2000 JAN 01 12:00:00') == 0.
+
+        cs.timdef('GET', 'SYSTEM')
+        assert cs.pool_generation() == generation + 1
+    finally:
+        cs.timdef('SET', 'SYSTEM', system)
+
+
+def test_memoize_linked_versions():
+    memoize('bodn2c')
+    assert hasattr(cs.bodn2c.flag, 'CACHE')
+    assert hasattr(cs.bodn2c.error, 'CACHE')
+    assert cs.bodn2c.flag.error.flag is cs.bodn2c.flag
+
+    assert cs.bodn2c.flag('MARS') == [499, True]
+    assert cs.bodn2c.flag('MARS') == [499, True]
+    assert cs.bodn2c.flag.CACHE.info().hits == 1
+
+    unmemoize()
+    assert not hasattr(cs.bodn2c, 'CACHE')
+    assert not hasattr(cs.bodn2c.flag, 'CACHE')
+
+
+def test_memoize_body_aliases():
+    import cspyce.aliases
+
+    saved = dict(cs.__dict__)
+    try:
+        cs.use_aliases()
+        memoize('bodn2c')
+        cs.boddef('MEMOIZE_ALIAS_A', -999998)
+        assert cs.bodn2c('MEMOIZE_ALIAS_A') == -999998
+        assert cs.bodn2c('MEMOIZE_ALIAS_A') == -999998
+        assert cache_info()['bodn2c'].hits == 1
+
+        # New aliases invalidate the cache, even without a boddef
+        generation = cs.pool_generation()
+        cs.define_body_aliases('MEMOIZE_ALIAS_A', 'MEMOIZE_ALIAS_B')
+        assert cs.pool_generation() > generation
+        cs.bodn2c('MEMOIZE_ALIAS_A')
+        assert cache_info()['bodn2c'].hits == 1
+    finally:
+        unmemoize()
+        cs.__dict__.update(saved)
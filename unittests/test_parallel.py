@@ -0,0 +1,96 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from cspyce.parallel import Executor
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def worker_state(name, body):
+    return (list(cs.gdpool(name)), cs.bodn2c(body), cs.erract())
+
+
+def test_executor_replays_state():
+    action = cs.erract()
+    try:
+        with Executor(processes=2) as executor:
+            executor.pdpool('EXECUTOR_TEST', [1., 2., 3.])
+            executor.boddef('EXECUTOR_BODY', -999999)
+            executor.erract('RUNTIME')
+            assert cs.erract() == 'RUNTIME'
+
+            (values, code, worker_action) = executor.submit(
+                    worker_state, 'EXECUTOR_TEST', 'EXECUTOR_BODY').result()
+            assert values == [1., 2., 3.]
+            assert code == -999999
+            assert worker_action == 'RUNTIME'
+
+            # A later change retires the workers; new ones see it
+            executor.pdpool('EXECUTOR_TEST', [4.])
+            (values, _, _) = executor.submit(
+                    worker_state, 'EXECUTOR_TEST', 'EXECUTOR_BODY').result()
+            assert values == [4.]
+    finally:
+        cs.erract(action)
+
+
+def test_executor_map():
+    rectan = np.random.default_rng(1).normal(size=(5, 7, 3))
+    with Executor(processes=2, chunk=4) as executor:
+        results = executor.map(cs.reclat_vector, rectan)
+        expected = cs.reclat_vector(rectan.reshape(-1, 3))
+        assert len(results) == 3
+        for (result, value) in zip(results, expected):
+            assert result.shape == (5, 7)
+            npt.assert_array_equal(result.ravel(), value)
+
+        # Scalar inputs and names are accepted
+        results = executor.map('reclat', [1., 0., 0.])
+        npt.assert_allclose([float(r) for r in results], [1., 0., 0.])
+
+        with pytest.raises(ValueError):
+            executor.map(cs.furnsh, 'missing.tm')
+
+
+def test_executor_record_errors():
+    with Executor(processes=1) as executor:
+        with pytest.raises(ValueError):
+            executor.record('spkezr', 'MARS', 0., 'J2000', 'NONE', 'EARTH')
+        with pytest.raises(AttributeError):
+            executor.spkezr
+
+
+def test_workers_are_not_forked():
+    # The OpenMP runtime of the vectorized loops does not survive fork()
+    from cspyce.parallel import _mp_context
+    assert _mp_context().get_start_method() in ('forkserver', 'spawn')
+
+
+def worker_bodn2c(name):
+    return cs.bodn2c(name)
+
+
+def test_executor_captures_prior_state():
+    # State set before the Executor exists is captured as well
+    saved = dict(cs.__dict__)
+    try:
+        cs.pdpool('EXECUTOR_PRIOR', [5., 6.])
+        cs.pcpool('EXECUTOR_PRIOR_TEXT', ['a', 'b'])
+        cs.use_flags('bodn2c')
+        with Executor(processes=1) as executor:
+            (values, _, _) = executor.submit(worker_state, 'EXECUTOR_PRIOR',
+                                             'MARS').result()
+            assert values == [5., 6.]
+            assert executor.submit(worker_bodn2c, 'NOT_A_BODY').result() \
+                == cs.bodn2c('NOT_A_BODY')
+    finally:
+        cs.__dict__.update(saved)
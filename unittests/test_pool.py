@@ -0,0 +1,128 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from cspyce.pool import generation, PoolWatch, subscribe
+from cspyce.pool import pool_snapshot, pool_restore, pool_diff
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def test_generation():
+    gen = generation()
+    for (func, args) in [(cs.pdpool, ('POOL_D', [1.])),
+                         (cs.pipool, ('POOL_I', [1])),
+                         (cs.pcpool, ('POOL_C', 'ONE')),
+                         (cs.lmpool, (['POOL_L = 1'],)),
+                         (cs.boddef, ('POOL_BODY', -999999)),
+                         (cs.clpool, ()),
+                         (cs.kclear, ())]:
+        func(*args)
+        gen += 1
+        assert generation() == gen
+
+    cs.gdpool.flag('POOL_D')
+    assert generation() == gen
+
+
+def test_pool_watch():
+    watch = PoolWatch(['POOL_A', 'POOL_B'])
+    assert watch.changed()
+    assert not watch.changed()
+
+    cs.pdpool('POOL_OTHER', [1.])
+    assert not watch.changed()
+
+    cs.pdpool('POOL_B', [2.])
+    assert watch.changed()
+    assert not watch.changed()
+
+
+def test_subscribe():
+    everything = []
+    selected = []
+    sub1 = subscribe(everything.append)
+    sub2 = subscribe(selected.append, names='POOL_A')
+    try:
+        cs.pdpool('POOL_OTHER', [1.])
+        cs.pdpool('POOL_A', [1.])
+        assert len(everything) == 2
+        assert selected == [generation()]
+
+        sub1.cancel()
+        assert not sub1.active
+        cs.pdpool('POOL_A', [2.])
+        assert len(everything) == 2
+        assert len(selected) == 2
+
+        # Exceptions in callbacks become warnings
+        sub3 = subscribe(lambda gen: 1/0)
+        with pytest.warns(RuntimeWarning):
+            cs.pdpool('POOL_OTHER', [1.])
+        sub3.cancel()
+    finally:
+        sub1.cancel()
+        sub2.cancel()
+
+
+def test_subscription_agents_reused():
+    # Cancelled subscriptions give their CSPICE agents back for reuse
+    sub = subscribe(lambda gen: None, names=['POOL_A', 'POOL_B'])
+    agent = sub.watch.agent
+    sub.cancel()
+    assert not sub.active
+
+    for _ in range(3):
+        selected = []
+        sub = subscribe(selected.append, names=['POOL_B', 'POOL_A'])
+        assert sub.watch.agent == agent
+        cs.pdpool('POOL_OTHER', [1.])
+        assert selected == []
+        cs.pdpool('POOL_A', [1.])
+        assert selected == [generation()]
+        sub.cancel()
+
+    # A reused watch reports a change on its first call
+    cs.pdpool('POOL_B', [3.])
+    watch = PoolWatch(['POOL_A', 'POOL_B'])
+    assert watch.agent == agent
+    assert watch.changed()
+    assert not watch.changed()
+
+
+def test_snapshot_and_restore():
+    cs.pdpool('SNAP_D', np.arange(100.))       # more than one page of values
+    cs.pipool('SNAP_I', [1, 2, 3])
+    cs.pcpool('SNAP_C', ['ONE', 'TWO'])
+    for k in range(50):                         # more than one page of names
+        cs.pdpool('SNAP_N%02d' % k, [float(k)])
+
+    snapshot = pool_snapshot()
+    assert len(snapshot) == 53
+    npt.assert_array_equal(snapshot['SNAP_D'], np.arange(100.))
+    npt.assert_array_equal(snapshot['SNAP_I'], [1., 2., 3.])
+    assert snapshot['SNAP_C'] == ['ONE', 'TWO']
+    assert snapshot['SNAP_N49'][0] == 49.
+    assert sorted(pool_snapshot('SNAP_N0*')) == ['SNAP_N%02d' % k
+                                                  for k in range(10)]
+
+    cs.kclear()
+    assert pool_snapshot() == {}
+    pool_restore(snapshot)
+    assert list(cs.gcpool('SNAP_C')) == ['ONE', 'TWO']
+    assert list(cs.gipool('SNAP_I')) == [1, 2, 3]
+    assert pool_diff(snapshot, pool_snapshot()) == ([], [], [])
+
+    cs.pdpool('SNAP_D', [0.])
+    cs.pdpool('SNAP_NEW', [0.])
+    cs.dvpool('SNAP_C')
+    assert pool_diff(snapshot, pool_snapshot()) == (['SNAP_NEW'], ['SNAP_C'],
+                                                    ['SNAP_D'])
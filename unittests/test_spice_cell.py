@@ -0,0 +1,123 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import os
+import pickle
+import pytest
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from cspyce import SpiceCell
+
+
+def test_from_buffer_shares_memory():
+    buffer = SpiceCell.allocate_buffer(6)
+    buffer[SpiceCell.CONTROL_SIZE:] = [1.0, 3.0, 7.0, 11.0, 23.0, 27.0]
+    cell = SpiceCell.from_buffer(buffer)
+    assert len(cell) == 6
+    assert cell.size == 6
+    assert np.shares_memory(cell.as_array(), buffer)
+    assert np.shares_memory(cell.as_intervals(), buffer)
+
+    # SPICE sees the caller's data, and its results are written in place
+    cell = cs.wncond(2.0, 1.0, cell)
+    npt.assert_array_equal(cell.as_intervals(), [[9, 10], [25, 26]])
+    npt.assert_array_equal(buffer[SpiceCell.CONTROL_SIZE:][:4], [9, 10, 25, 26])
+
+
+def test_from_buffer_card():
+    buffer = SpiceCell.allocate_buffer(10, cs.SPICE_CELL_INT)
+    buffer[SpiceCell.CONTROL_SIZE:][:3] = [1, 2, 3]
+    cell = SpiceCell.from_buffer(buffer, card=3)
+    assert list(cell) == [1, 2, 3]
+    assert cell.size == 10
+
+
+def test_from_buffer_growth_leaves_buffer_alone():
+    buffer = SpiceCell.allocate_buffer(2)
+    buffer[SpiceCell.CONTROL_SIZE:] = [1.0, 2.0]
+    cell = SpiceCell.from_buffer(buffer)
+    cell.append([3.0, 4.0])
+    assert list(cell) == [1.0, 2.0, 3.0, 4.0]
+    assert len(buffer) == SpiceCell.CONTROL_SIZE + 2
+    assert not np.shares_memory(cell.as_array(), buffer)
+
+
+def test_from_buffer_errors():
+    with pytest.raises(ValueError):
+        SpiceCell.from_buffer(np.zeros(10, dtype=np.float32))
+    with pytest.raises(ValueError):
+        SpiceCell.from_buffer(np.zeros(20)[::2])
+    with pytest.raises(ValueError):
+        SpiceCell.from_buffer(np.zeros(SpiceCell.CONTROL_SIZE))
+
+
+def test_reserve():
+    cell = SpiceCell(typeno=cs.SPICE_CELL_DOUBLE, size=4)
+    cell.append([1.0, 2.0])
+    cell.reserve(100)
+    assert cell.size == 100
+    assert list(cell) == [1.0, 2.0]
+    cell.reserve(10)
+    assert cell.size == 100
+
+
+@pytest.mark.parametrize("data", [[1.0, 3.0, 7.0, 11.0], [1, 2, 3], ["a", "bc"]])
+def test_pickle(data):
+    cell = SpiceCell(data)
+    copy = pickle.loads(pickle.dumps(cell))
+    assert copy.size == cell.size
+    assert list(copy) == list(cell)
+    assert copy._header._data == copy.as_array().ctypes.data
+
+
+def test_shared_memory():
+    cell = SpiceCell([1.0, 3.0, 7.0, 11.0]).share()
+    try:
+        assert cell.shared_memory is not None
+        attached = pickle.loads(pickle.dumps(cell))
+        assert attached.shared_memory.name == cell.shared_memory.name
+        assert attached._header._data != cell._header._data
+
+        # Both cells see the same data, and SPICE can operate on either one
+        attached = cs.wncond(2.0, 1.0, attached)
+        npt.assert_array_equal(cell.as_array()[:2], [9.0, 10.0])
+        del attached
+    finally:
+        cell.shared_memory.unlink()
+
+
+def _double_cell(cell):
+    cell.as_array()[:] *= 2.0
+    return len(cell)
+
+
+def test_shared_memory_in_worker_processes():
+    cell = SpiceCell([1.0, 3.0, 7.0, 11.0]).share()
+    try:
+        # Workers started by multiprocessing share this process's tracker
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(_double_cell, cell).result() == 4
+        npt.assert_array_equal(cell.as_array(), [2.0, 6.0, 14.0, 22.0])
+
+        # An unrelated process has its own tracker, which must not unlink the
+        # block or report it as leaked when the process exits
+        script = ("import pickle, sys\n"
+                  "cell = pickle.loads(sys.stdin.buffer.read())\n"
+                  "cell.as_array()[:] += 1.0\n")
+        cspyce_dir = os.path.dirname(os.path.dirname(cs.__file__))
+        env = dict(os.environ, PYTHONPATH=cspyce_dir)
+        result = subprocess.run([sys.executable, "-c", script],
+                                input=pickle.dumps(cell), env=env,
+                                capture_output=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        assert b"leaked" not in result.stderr
+        npt.assert_array_equal(cell.as_array(), [3.0, 7.0, 15.0, 23.0])
+
+        # The block still exists
+        attached = pickle.loads(pickle.dumps(cell))
+        npt.assert_array_equal(attached.as_array(), [3.0, 7.0, 15.0, 23.0])
+        del attached
+    finally:
+        cell.shared_memory.unlink()
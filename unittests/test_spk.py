@@ -0,0 +1,44 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import os
+import pytest
+from pathlib import Path
+
+from cspyce.spk import SpkEphemeris
+
+PATH_ = Path(os.path.realpath(__file__)).parent.parent / "unittest_support"
+SPKS = [PATH_ / 'de432s.bsp', PATH_ / 'sat164.bsp']
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+@pytest.mark.parametrize("target,observer", [(399, 0), (301, 399), (602, 6),
+                                             (699, 10), (606, 399)])
+def test_spk_state(target, observer):
+    for spk in SPKS:
+        cs.furnsh(spk)
+    ephemeris = SpkEphemeris(SPKS)
+
+    et = np.linspace(0., 4.e8, 101)
+    (expected, _) = cs.spkgeo_vector(target, et, 'J2000', observer)
+    state = ephemeris.state(target, et, observer)
+    assert state.shape == (101, 6)
+    npt.assert_allclose(state[:, :3], expected[:, :3], rtol=0, atol=1.e-6)
+    npt.assert_allclose(state[:, 3:], expected[:, 3:], rtol=0, atol=1.e-9)
+
+    npt.assert_allclose(ephemeris.position(target, et[0], observer),
+                        expected[0, :3], rtol=0, atol=1.e-6)
+
+
+def test_spk_missing_data():
+    ephemeris = SpkEphemeris(SPKS[1:])
+    with pytest.raises(IOError):
+        ephemeris.state(602, 0., 399)
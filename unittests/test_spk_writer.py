@@ -0,0 +1,135 @@
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from cspyce.daf import DafFile
+from cspyce.spk_writer import SpkWriter
+
+BODY = -999
+CENTER = 399
+RADIUS = 7000.
+RATE = 2. * np.pi / 86400.
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def orbit(et):
+    (c, s) = (np.cos(RATE * et), np.sin(RATE * et))
+    return np.stack([RADIUS * c, RADIUS * s, 0. * et,
+                     -RADIUS * RATE * s, RADIUS * RATE * c, 0. * et], axis=-1)
+
+
+def chunks(et, size):
+    for k in range(0, len(et), size):
+        yield (et[k:k + size], orbit(et[k:k + size]))
+
+
+@pytest.mark.parametrize("segtype,kwargs,tol",
+                         [(9, dict(degree=7, max_size=1000), 1.e-6),
+                          (13, dict(degree=7, max_size=1000), 1.e-6),
+                          (2, dict(degree=12, max_size=20, intlen=3600.), 1.e-6),
+                          (3, dict(degree=12, max_size=20, intlen=3600.), 1.e-6)])
+def test_spk_writer(tmp_path, segtype, kwargs, tol):
+    path = tmp_path / ('type%d.bsp' % segtype)
+    et = np.arange(0., 3 * 86400. + 1., 60.)
+    with SpkWriter(path, BODY, CENTER, segtype=segtype, **kwargs) as writer:
+        writer.write_from(chunks(et, 377))
+    assert writer.segments > 1
+
+    # The segments are contiguous and cover the whole trajectory
+    with DafFile(path) as daf:
+        summaries = daf.summaries()
+    assert len(summaries) == writer.segments
+    assert np.all(summaries['ic'][:, 3] == segtype)
+    npt.assert_array_equal(summaries['dc'][1:, 0], summaries['dc'][:-1, 1])
+    assert summaries['dc'][0, 0] == et[0]
+    assert summaries['dc'][-1, 1] == et[-1]
+
+    cs.furnsh(path)
+    times = np.linspace(et[0], et[-1], 1001)
+    (states, _) = cs.spkgeo_vector(BODY, times, 'J2000', CENTER)
+    npt.assert_allclose(states[:, :3], orbit(times)[:, :3], atol=tol)
+    npt.assert_allclose(states[:, 3:], orbit(times)[:, 3:], atol=tol)
+
+
+def test_spk_writer_duration(tmp_path):
+    path = tmp_path / 'duration.bsp'
+    et = np.arange(0., 86400. + 1., 60.)
+    with SpkWriter(path, BODY, CENTER, max_duration=21600.) as writer:
+        writer.write(et, orbit(et))
+
+    with DafFile(path) as daf:
+        dc = daf.summaries()['dc']
+    assert len(dc) == 4
+    assert np.all(dc[:, 1] - dc[:, 0] <= 21600.)
+
+
+def test_spk_writer_errors(tmp_path):
+    with pytest.raises(ValueError):
+        SpkWriter(tmp_path / 'bad.bsp', BODY, CENTER, segtype=5)
+    with pytest.raises(ValueError):
+        SpkWriter(tmp_path / 'bad.bsp', BODY, CENTER, segtype=2)
+
+    with SpkWriter(tmp_path / 'order.bsp', BODY, CENTER, degree=1) as writer:
+        writer.write([0., 60., 120.], orbit(np.array([0., 60., 120.])))
+        with pytest.raises(ValueError):
+            writer.write([100.], orbit(np.array([100.])))
+
+
+@pytest.mark.parametrize("segtype", [2, 3])
+def test_spk_writer_gaps(tmp_path, segtype):
+    path = tmp_path / ('gaps%d.bsp' % segtype)
+    et = np.concatenate([np.arange(0., 86400. + 1., 60.),
+                         np.arange(100000., 150000., 60.)])
+    with SpkWriter(path, BODY, CENTER, segtype=segtype, degree=12,
+                   intlen=3600.) as writer:
+        writer.write_from(chunks(et, 377))
+
+    # No record spans the gap, and the partial last record is still accurate
+    with DafFile(path) as daf:
+        dc = daf.summaries()['dc']
+    npt.assert_array_equal(dc[:, :2], [[0., 86400.], [100000., et[-1]]])
+
+    cs.furnsh(path)
+    times = np.linspace(100000., et[-1], 1001)
+    (states, _) = cs.spkgeo_vector(BODY, times, 'J2000', CENTER)
+    npt.assert_allclose(states[:, :3], orbit(times)[:, :3], atol=1.e-6)
+
+
+def test_spk_writer_too_few_states(tmp_path):
+    et = np.arange(0., 86400., 1200.)
+    writer = SpkWriter(tmp_path / 'sparse.bsp', BODY, CENTER, segtype=3,
+                       degree=12, intlen=3600.)
+    try:
+        with pytest.raises(ValueError):
+            writer.write(et, orbit(et))
+    finally:
+        cs.spkcls(writer.handle)
+
+
+@pytest.mark.parametrize("segtype", [9, 13])
+def test_spk_writer_short_tail(tmp_path, segtype):
+    # The last segment holds only two states beyond the previous cut
+    path = tmp_path / ('tail%d.bsp' % segtype)
+    et = np.arange(1002) * 60.
+    with SpkWriter(path, BODY, CENTER, segtype=segtype, degree=7,
+                   max_size=1000) as writer:
+        writer.write_from(chunks(et, 100))
+    assert writer.segments == 2
+
+    with DafFile(path) as daf:
+        dc = daf.summaries()['dc']
+    npt.assert_array_equal(dc[:, :2], [[et[0], et[999]], [et[999], et[-1]]])
+
+    cs.furnsh(path)
+    times = np.linspace(et[995], et[-1], 101)
+    (states, _) = cs.spkgeo_vector(BODY, times, 'J2000', CENTER)
+    npt.assert_allclose(states[:, :3], orbit(times)[:, :3], atol=1.e-6)
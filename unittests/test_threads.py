@@ -0,0 +1,98 @@
+################################################################################
+# test_threads.py: Unit tests for calls made from several Python threads.
+################################################################################
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cspyce as cs
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_pool_and_reset():
+    cs.kclear()
+    cs.reset()
+    yield
+    cs.kclear()
+    cs.reset()
+
+
+def test_vector_calls_in_threads():
+    # Long vector loops release the GIL; the results must not interfere
+    rng = np.random.default_rng(3)
+    inputs = [rng.normal(size=(200000, 3)) for _ in range(4)]
+    expected = [cs.reclat_vector(rectan) for rectan in inputs]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(cs.reclat_vector, inputs))
+
+    for (result, values) in zip(results, expected):
+        for (r, v) in zip(result, values):
+            npt.assert_array_equal(r, v)
+
+
+def test_errors_in_threads():
+    # Each thread sees its own errors, and the error state stays consistent
+    barrier = threading.Barrier(4)
+
+    def work(k):
+        rng = np.random.default_rng(k)
+        barrier.wait()
+        for _ in range(50):
+            if k % 2:
+                with pytest.raises(KeyError):
+                    cs.bodn2c('NOT_A_BODY_NAME')
+            else:
+                cs.reclat_vector(rng.normal(size=(5000, 3)))
+        return cs.failed()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert not any(executor.map(work, range(4)))
+
+
+def test_parallel_vector_loops():
+    # Loops this long may run under OpenMP; the results must match NumPy
+    rng = np.random.default_rng(5)
+    (v1, v2) = rng.normal(size=(2, 50000, 3))
+    npt.assert_allclose(cs.vadd_vector(v1, v2), v1 + v2)
+    npt.assert_allclose(cs.vcrss_vector(v1, v2), np.cross(v1, v2))
+
+    matrices = rng.normal(size=(50000, 3, 3))
+    npt.assert_allclose(cs.mxv_vector(matrices, v1),
+                        np.einsum('nij,nj->ni', matrices, v1))
+
+    (radius, lon, lat) = cs.reclat_vector(v1)
+    npt.assert_allclose(radius, np.linalg.norm(v1, axis=-1))
+    npt.assert_allclose(cs.latrec_vector(radius, lon, lat), v1, atol=1.e-12)
+
+
+def test_typemap_errors_in_threads(tmp_path):
+    # Errors raised by the typemaps must not leak into a call that has released
+    # the GIL
+    kernel = tmp_path / 'values.tpc'
+    kernel.write_text('\\begindata\nTHREAD_VALUES = ( 1, 2, 3 )\n\\begintext\n')
+    barrier = threading.Barrier(2)
+
+    def load(_):
+        barrier.wait()
+        for _ in range(200):
+            cs.furnsh(str(kernel))
+            assert list(cs.gdpool('THREAD_VALUES', 0, 3)) == [1., 2., 3.]
+            cs.unload(str(kernel))
+        return cs.failed()
+
+    def misuse(_):
+        barrier.wait()
+        for _ in range(200):
+            with pytest.raises(ValueError):
+                cs.vadd([1., 2.], [1., 2., 3.])
+            with pytest.raises(ValueError):
+                cs.mxv(np.zeros((2, 3)), [1., 2., 3.])
+        return cs.failed()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(load, 0), executor.submit(misuse, 1)]
+        assert not any(future.result() for future in futures)
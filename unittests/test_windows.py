@@ -0,0 +1,75 @@
+import cspyce as cs
+import cspyce.windows as wn
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+
+def make_window(intervals):
+    window = cs.SpiceCell(typeno=1, size=max(2 * len(intervals), 2))
+    for left, right in intervals:
+        window = cs.wninsd(left, right, window)
+    return window
+
+
+def random_windows(rng, count):
+    # Distinct integer endpoints, so that no intervals overlap or abut
+    windows = []
+    for _ in range(count):
+        n = rng.integers(0, 10)
+        values = np.sort(rng.choice(200, 2 * n, replace=False))
+        windows.append(values.astype(float).reshape(-1, 2))
+    return windows
+
+
+def test_examples():
+    a = [[1.0, 3.0], [7.0, 11.0], [23.0, 27.0]]
+    b = [[2.0, 6.0], [8.0, 10.0], [16.0, 18.0]]
+    npt.assert_array_equal(wn.wndifd(a, b),
+                           [[1, 2], [7, 8], [10, 11], [23, 27]])
+    npt.assert_array_equal(wn.wncond(2.0, 1.0, a), [[9, 10], [25, 26]])
+    c = a + [[29.0, 29.0]]
+    npt.assert_array_equal(wn.wnexpd(2.0, 1.0, c), [[-1, 4], [5, 12], [21, 30]])
+    npt.assert_array_equal(wn.wnfild(3.0, c), [[1, 3], [7, 11], [23, 29]])
+    npt.assert_array_equal(wn.wnfltd(3.0, c), [[7, 11], [23, 27]])
+    npt.assert_array_equal(wn.wnunid([[1, 3]], [[3, 5]]), [[1, 5]])
+    npt.assert_array_equal(wn.wnintd([[1, 3]], [[3, 5]]), [[3, 3]])
+
+
+def test_cell_input():
+    window = make_window([[1.0, 3.0], [7.0, 11.0]])
+    npt.assert_array_equal(wn.wnexpd(1.0, 1.0, window), [[0, 12]])
+
+
+@pytest.mark.parametrize("name", ["wnunid", "wnintd", "wndifd"])
+def test_binary_matches_spice(name):
+    rng = np.random.default_rng(1234)
+    a_list = random_windows(rng, 50)
+    b_list = random_windows(rng, 50)
+    results = getattr(wn, name + "_batch")(a_list, b_list)
+    for a, b, result in zip(a_list, b_list, results):
+        expected = getattr(cs, name)(make_window(a), make_window(b))
+        npt.assert_array_equal(result, expected.as_intervals())
+
+
+@pytest.mark.parametrize("name", ["wnexpd", "wncond"])
+def test_expand_contract_matches_spice(name):
+    rng = np.random.default_rng(5678)
+    windows = random_windows(rng, 50)
+    left = rng.integers(-3, 4, 50).astype(float)
+    right = rng.integers(-3, 4, 50).astype(float)
+    results = getattr(wn, name + "_batch")(left, right, windows)
+    for window, l, r, result in zip(windows, left, right, results):
+        expected = getattr(cs, name)(l, r, make_window(window))
+        npt.assert_array_equal(result, expected.as_intervals())
+
+
+@pytest.mark.parametrize("name", ["wnfild", "wnfltd"])
+def test_fill_filter_matches_spice(name):
+    rng = np.random.default_rng(9012)
+    windows = random_windows(rng, 50)
+    small = rng.integers(1, 10, 50).astype(float)
+    results = getattr(wn, name + "_batch")(small, windows)
+    for window, s, result in zip(windows, small, results):
+        expected = getattr(cs, name)(s, make_window(window))
+        npt.assert_array_equal(result, expected.as_intervals())